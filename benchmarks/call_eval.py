@@ -0,0 +1,92 @@
+"""
+Mede o tempo de verificação por fato de ``:init`` em problemas grid-visit-all
+(veja ``generate.py``), isolando a verificação das chamadas do restante
+da avaliação. Compara a avaliação fato a fato com `Call.eval` e a verificação
+vetorizada de `pddl.batch` (se o NumPy estiver instalado), com e sem o tempo
+de importação do NumPy, medido em um processo novo. A última coluna marca o
+modo que `eval_facts` escolhe em um processo que ainda não importou o NumPy.
+
+Uso:
+
+    $ uv run python benchmarks/call_eval.py [TAMANHO ...]
+"""
+
+import contextlib
+import io
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from pddl import parse
+from pddl.batch import MIN_FACTS_IMPORT, eval_facts, has_numpy
+from pddl.runner import domain_ctx
+
+sys.path.insert(0, str(Path(__file__).parent))
+from generate import GRID_DOMAIN, grid_problem  # noqa: E402
+
+REPEAT = 20
+
+IMPORT_NUMPY = "import time; t = time.perf_counter(); import numpy; print(time.perf_counter() - t)"
+
+
+def numpy_import_time() -> float:
+    """
+    Menor tempo, em segundos, de importação do NumPy em um processo novo.
+    """
+    return min(
+        float(subprocess.run([sys.executable, "-c", IMPORT_NUMPY], capture_output=True, text=True, check=True).stdout)
+        for _ in range(5)
+    )
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [30, 100]
+    ctx = domain_ctx()
+    with contextlib.redirect_stdout(io.StringIO()):
+        parse(GRID_DOMAIN.read_text()).eval(ctx)
+
+    import_time = 0.0
+    if has_numpy():
+        import_time = numpy_import_time()
+        print(f"importação do NumPy: {import_time * 1000:.1f}ms")
+        # Com o NumPy já importado, `eval_facts` usa a verificação vetorizada
+        import numpy  # noqa: F401
+
+    print(f"{'grade':>7} {'fatos':>8} {'modo':>18} {'total':>9} {'por fato':>9} {'escolhido':>9}")
+    for n in sizes:
+        problem = parse(grid_problem(n)).source
+        scope = ctx.snapshot()
+        for obj in problem.objects:
+            scope.var_def(obj.name.name, obj)
+        calls = list(problem.init)
+
+        def scalar():
+            for call in calls:
+                call.eval(scope)
+
+        modes = {"escalar": scalar}
+        if has_numpy():
+            modes["vetorizado"] = lambda: eval_facts(problem.init, scope)
+
+        chosen = "vetorizado+import" if has_numpy() and len(calls) >= MIN_FACTS_IMPORT else "escalar"
+        results = {}
+        for mode, func in modes.items():
+            best = float("inf")
+            for _ in range(REPEAT):
+                start = time.perf_counter()
+                func()
+                best = min(best, time.perf_counter() - start)
+            results[mode] = best
+        if "vetorizado" in results:
+            results["vetorizado+import"] = results["vetorizado"] + import_time
+        for mode, best in results.items():
+            mark = "*" if mode == chosen else ""
+            print(
+                f"{n:>3}x{n:<3} {len(calls):>8} {mode:>18} {best * 1000:>7.1f}ms"
+                f" {best / len(calls) * 1e9:>7.0f}ns {mark:>9}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Compara as duas implementações da tabela de símbolos, `Ctx` (escopos
+encadeados) e `FlatCtx` (tabela plana), em profundidades de escopo realistas.
+
+Em domínios PDDL, a profundidade típica é 2 (global + parâmetros da ação) e
+raramente passa de 4 a 6 com ``forall`` aninhados. Para cada profundidade,
+medimos o tempo de consultas a nomes globais (predicados, tipos), a nomes
+locais (parâmetros) e o custo de ``push``/``pop`` de um escopo.
+
+Uso:
+
+    $ uv run python benchmarks/ctx_lookup.py [PROFUNDIDADE ...]
+"""
+
+import sys
+import timeit
+
+from pddl.ctx import Ctx
+
+GLOBALS = 200
+LOCALS = 3
+NUMBER = 200_000
+
+
+def build(flat: bool, depth: int) -> Ctx:
+    """
+    Cria um contexto com `GLOBALS` nomes globais e `depth` escopos locais com
+    `LOCALS` nomes cada.
+    """
+    ctx = Ctx.from_dict({f"g{i}": i for i in range(GLOBALS)}, flat=flat)
+    for d in range(depth):
+        ctx = ctx.push({})
+        for i in range(LOCALS):
+            ctx.var_def(f"l{d}-{i}", i)
+    return ctx
+
+
+def bench(flat: bool, depth: int) -> dict[str, float]:
+    """
+    Retorna o tempo médio, em nanossegundos, de cada operação.
+    """
+    ctx = build(flat, depth)
+    local = f"l{depth - 1}-0" if depth else "g0"
+
+    def push_pop():
+        scope = ctx.push({"x": 1})
+        scope.pop()
+
+    results = {
+        "global": timeit.timeit(lambda: ctx["g100"], number=NUMBER),
+        "local": timeit.timeit(lambda: ctx[local], number=NUMBER),
+        "push/pop": timeit.timeit(push_pop, number=NUMBER),
+    }
+    return {name: t / NUMBER * 1e9 for name, t in results.items()}
+
+
+def main():
+    depths = [int(arg) for arg in sys.argv[1:]] or [1, 2, 4, 8]
+    print(f"{'prof.':>5} {'operação':>9} {'chain':>9} {'flat':>9} {'ganho':>7}")
+    for depth in depths:
+        chain = bench(False, depth)
+        flat = bench(True, depth)
+        for op in chain:
+            print(
+                f"{depth:>5} {op:>9} {chain[op]:>7.0f}ns {flat[op]:>7.0f}ns"
+                f" {chain[op] / flat[op]:>6.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
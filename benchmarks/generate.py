@@ -0,0 +1,144 @@
+"""
+Gera variantes sintéticas, em escala, dos domínios de ``exemplos/``:
+
+- ``grid N``: problema grid-visit-all com uma grade N x N (domínio de
+  ``exemplos/valido2_visit_all_sequential``);
+- ``entregas K``: problema fcte-entregas com K pedidos (domínio de
+  ``exemplos/valido3_fcte_entregas``);
+- ``aninhado D``: domínio com ações cujas precondições e efeitos aninham
+  ``forall`` e ``when`` até a profundidade D, com um problema pequeno.
+
+Cada variante é gravada em um diretório com um ``domain.pddl`` e um
+``problem.pddl``, no mesmo formato de ``exemplos/``, de modo que também pode
+ser verificada com ``pddl verify-tree``.
+
+Uso:
+
+    $ uv run python benchmarks/generate.py DIRETÓRIO [--grid N ...] [--entregas K ...] [--aninhado D ...]
+"""
+
+import argparse
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+GRID_DOMAIN = ROOT / "exemplos" / "valido2_visit_all_sequential" / "domain.pddl"
+ENTREGAS_DOMAIN = ROOT / "exemplos" / "valido3_fcte_entregas" / "domain.pddl"
+
+# Número de ações do domínio aninhado. Cada uma tem a profundidade pedida.
+NESTED_ACTIONS = 8
+
+
+def grid_problem(n: int) -> str:
+    """
+    Gera um problema grid-visit-all com uma grade n x n.
+    """
+    lines = [f"(define (problem grid-{n})", "(:domain grid-visit-all)", "(:objects"]
+    lines.extend(f"\tloc-x{x}-y{y}" for x in range(n) for y in range(n))
+    lines.append("- place\n)\n(:init\n\t(at-robot loc-x0-y0)\n\t(visited loc-x0-y0)")
+    for x in range(n):
+        for y in range(n):
+            for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+                if 0 <= x + dx < n and 0 <= y + dy < n:
+                    lines.append(f"\t(connected loc-x{x}-y{y} loc-x{x + dx}-y{y + dy})")
+    lines.append(")\n(:goal\n(and")
+    lines.extend(f"\t(visited loc-x{x}-y{y})" for x in range(n) for y in range(n))
+    lines.append(")\n)\n)")
+    return "\n".join(lines)
+
+
+def entregas_problem(k: int) -> str:
+    """
+    Gera um problema fcte-entregas com k pedidos, 2k pontos e um entregador
+    para cada 10 pedidos.
+    """
+    men = max(1, k // 10)
+    lines = [f"(define (problem entregas-{k})", "(:domain dom)", "(:objects"]
+    lines.append("\t" + " ".join(f"d{i}" for i in range(men)) + " - delivery-man")
+    lines.append("\t" + " ".join(f"a{i}" for i in range(2 * k)) + " - point")
+    lines.append("\t" + " ".join(f"o{i}" for i in range(k)) + " - order")
+    lines.append(")\n(:init\n\t(visited origin)\n\t(max-capacity n2)\n\t(sequence n0 n1)\n\t(sequence n1 n2)")
+    for i in range(men):
+        lines.append(f"\t(at d{i} origin)\n\t(capacity d{i} n0)")
+    for i in range(k):
+        lines.append(f"\t(pickup o{i} a{2 * i})\n\t(destination o{i} a{2 * i + 1})\n\t(pending o{i})")
+    lines.append(")\n(:goal\n(and")
+    lines.extend(f"\t(not (pending o{i}))" for i in range(k))
+    lines.extend(f"\t(visited a{i})" for i in range(2 * k))
+    lines.append(")\n)\n)")
+    return "\n".join(lines)
+
+
+def nested_domain(depth: int) -> str:
+    """
+    Gera um domínio em que cada ação tem uma precondição com `depth` níveis de
+    ``forall`` e um efeito com `depth` níveis de ``when``.
+    """
+    lines = [
+        f"(define (domain aninhado-{depth})",
+        "(:requirements :strips :typing :conditional-effects)",
+        "(:types node)",
+        "(:predicates (edge ?a ?b - node) (mark ?a - node))",
+    ]
+    for action in range(NESTED_ACTIONS):
+        precondition = f"(edge ?a ?x{depth - 1})" if depth else "(edge ?a ?a)"
+        for level in reversed(range(depth)):
+            precondition = f"(forall (?x{level} - node) {precondition})"
+        effect = "(mark ?a)"
+        for _ in range(depth):
+            effect = f"(when (edge ?a ?a) {effect})"
+        lines.append(
+            f"(:action act{action}\n\t:parameters (?a - node)\n"
+            f"\t:precondition {precondition}\n\t:effect {effect})"
+        )
+    lines.append(")")
+    return "\n".join(lines)
+
+
+def nested_problem(depth: int) -> str:
+    """
+    Problema pequeno para o domínio de `nested_domain`.
+    """
+    return "\n".join([
+        f"(define (problem aninhado-{depth})",
+        f"(:domain aninhado-{depth})",
+        "(:objects n0 n1 n2 - node)",
+        "(:init (edge n0 n1) (edge n1 n2) (mark n0))",
+        "(:goal (and (mark n2)))",
+        ")",
+    ])
+
+
+def cases(grid=(), entregas=(), aninhado=()) -> list[tuple[str, str, str]]:
+    """
+    Retorna as variantes pedidas como triplas (nome, domínio, problema).
+    """
+    result = []
+    grid_domain = GRID_DOMAIN.read_text()
+    for n in grid:
+        result.append((f"grid-{n}", grid_domain, grid_problem(n)))
+    entregas_domain = ENTREGAS_DOMAIN.read_text()
+    for k in entregas:
+        result.append((f"entregas-{k}", entregas_domain, entregas_problem(k)))
+    for d in aninhado:
+        result.append((f"aninhado-{d}", nested_domain(d), nested_problem(d)))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera variantes sintéticas dos exemplos.")
+    parser.add_argument("directory", help="Diretório onde as variantes serão gravadas")
+    parser.add_argument("--grid", type=int, nargs="*", default=[], metavar="N")
+    parser.add_argument("--entregas", type=int, nargs="*", default=[], metavar="K")
+    parser.add_argument("--aninhado", type=int, nargs="*", default=[], metavar="D")
+    args = parser.parse_args()
+
+    for name, domain, problem in cases(args.grid, args.entregas, args.aninhado):
+        path = Path(args.directory) / name
+        path.mkdir(parents=True, exist_ok=True)
+        (path / "domain.pddl").write_text(domain)
+        (path / "problem.pddl").write_text(problem)
+        print(path)
+
+
+if __name__ == "__main__":
+    main()
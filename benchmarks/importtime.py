@@ -0,0 +1,106 @@
+"""
+Verifica o orçamento de tempo de inicialização do pacote `pddl`.
+
+O script mede a importação de `pddl.cli` com `python -X importtime` e falha
+(código de saída 1) se:
+
+- o tempo acumulado de importação ultrapassar o orçamento;
+- algum módulo pesado (lark, rich, ipdb, numpy), ou do pacote que só é usado ao
+  verificar arquivos (`LAZY_PDDL_MODULES`), for importado só por carregar o CLI;
+- uma verificação simples construir o parser de CST ou carregar rich/ipdb.
+
+Uso:
+
+    $ uv run python benchmarks/importtime.py [--budget MS] [-n REPETIÇÕES]
+"""
+
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+EXAMPLE = ROOT / "exemplos" / "valido1_simples"
+LAZY_MODULES = ("lark", "rich", "ipdb", "numpy")
+LAZY_PDDL_MODULES = ("pddl.parallel", "pddl.stream", "pddl.runner", "pddl.profiling")
+
+# Executa uma verificação completa em processo e informa quais módulos e
+# parsers foram carregados.
+CHECK_RUN = f"""
+import sys
+sys.argv = ["pddl", {str(EXAMPLE / "domain.pddl")!r}, {str(EXAMPLE / "problem.pddl")!r}]
+from pddl import cli, parser
+cli.main()
+print("LOADED", *sorted(m for m in {LAZY_MODULES!r} if m in sys.modules))
+print("PARSERS", parser.get_parser.cache_info().currsize)
+"""
+
+
+def import_time(module: str) -> tuple[int, set[str]]:
+    """
+    Importa `module` em um processo novo e retorna o tempo acumulado de
+    importação (em microssegundos) e o conjunto de módulos importados.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total = 0
+    modules = set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        name = name.strip()
+        modules.add(name)
+        if name == module:
+            total = int(cumulative)
+    return total, modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--budget", type=float, default=150.0, help="orçamento em ms")
+    parser.add_argument("-n", "--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    failures = []
+
+    samples = [import_time("pddl.cli") for _ in range(args.repeat)]
+    best = min(total for total, _ in samples) / 1000
+    modules = samples[0][1]
+    print(f"import pddl.cli: {best:.1f}ms (orçamento: {args.budget:.1f}ms)")
+    if best > args.budget:
+        failures.append(f"importação levou {best:.1f}ms, acima de {args.budget:.1f}ms")
+
+    for name in LAZY_MODULES + LAZY_PDDL_MODULES:
+        if name in modules:
+            failures.append(f"{name} é importado junto com pddl.cli")
+
+    proc = subprocess.run(
+        [sys.executable, "-c", CHECK_RUN],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    for line in proc.stdout.splitlines():
+        if line.startswith("LOADED"):
+            loaded = set(line.split()[1:]) - {"lark"}
+            if loaded:
+                failures.append(f"verificação simples carregou {', '.join(sorted(loaded))}")
+        elif line.startswith("PARSERS"):
+            count = int(line.split()[1])
+            if count != 1:
+                failures.append(f"verificação simples construiu {count} parsers")
+
+    for failure in failures:
+        print(f"FALHA: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
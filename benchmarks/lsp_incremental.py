@@ -0,0 +1,88 @@
+"""
+Mede a latência da verificação incremental de ``pddl lsp`` (veja `pddl.lsp`)
+após edições típicas em um problema grande, comparando com a verificação do
+documento inteiro.
+
+O problema é um grid-visit-all N x N gerado por ``generate.py``. Cada edição é
+aplicada como faria o editor, por ``textDocument/didChange`` com um trecho, e
+os erros obtidos são comparados com os de um documento novo com o mesmo texto.
+
+Uso:
+
+    $ uv run python benchmarks/lsp_incremental.py [N] [-n REPETIÇÕES]
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from pddl.lsp import Document, Workspace, path_to_uri
+
+sys.path.insert(0, str(Path(__file__).parent))
+from generate import GRID_DOMAIN, grid_problem  # noqa: E402
+
+
+def position(text: str, offset: int) -> dict:
+    line = text.count("\n", 0, offset)
+    return {"line": line, "character": offset - (text.rfind("\n", 0, offset) + 1)}
+
+
+def replace(text: str, old: str, new: str) -> dict:
+    """
+    Mudança do LSP que troca a primeira ocorrência de `old` por `new`.
+    """
+    start = text.index(old)
+    end = start + len(old)
+    return {"range": {"start": position(text, start), "end": position(text, end)}, "text": new}
+
+
+def errors(document: Document, workspace: Workspace) -> list:
+    return [(e.line, e.column, e.msg) for e in document.check(workspace)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mede a verificação incremental do servidor LSP.")
+    parser.add_argument("n", type=int, nargs="?", default=60, help="Tamanho da grade")
+    parser.add_argument("-n", "--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    workspace = Workspace()
+    domain = Document(path_to_uri(str(GRID_DOMAIN)), GRID_DOMAIN.read_text())
+    workspace.documents[domain.uri] = domain
+    domain.check(workspace)
+
+    source = grid_problem(args.n)
+    uri = "file:///grid/problem.pddl"
+    start = time.perf_counter()
+    document = Document(uri, source)
+    workspace.documents[uri] = document
+    document.check(workspace)
+    full = time.perf_counter() - start
+    print(f"grid-{args.n}: {len(source) / 2**20:.1f} MB, {len(document.entries)} formas")
+    print(f"  {'documento inteiro':<28}{full * 1000:9.1f}ms")
+
+    # Cada edição é desfeita em seguida, de modo que as repetições partem do
+    # mesmo texto
+    edits = {
+        "fato de :init": ("(visited loc-x0-y0)", "(visited loc-x0-yy)"),
+        "linha no início": ("(define", "; comentário\n(define"),
+        ":goal": ("(and", "(and (visited loc-x1-y1)"),
+        "objeto": ("(:objects", "(:objects extra - place"),
+    }
+    for name, (old, new) in edits.items():
+        times = []
+        for _ in range(args.repeat):
+            for a, b in ((old, new), (new, old)):
+                document.apply_change(replace(document.text, a, b))
+                start = time.perf_counter()
+                result = errors(document, workspace)
+                times.append(time.perf_counter() - start)
+                assert result == errors(Document(uri, document.text), workspace), name
+        median = statistics.median(times)
+        print(f"  {name:<28}{median * 1000:9.1f}ms{full / median:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Mede a memória ocupada pelos nós da AST do problema grande de exemplo
+(``exemplos/valido2_visit_all_sequential``).
+
+Para cada classe de nó, mostra quantos nós existem na árvore e o tamanho
+médio de cada instância, incluindo o ``__dict__`` quando a classe não usa
+``__slots__``. Também mede, com ``tracemalloc``, a memória alocada para
+materializar todos os nós da árvore (os fatos de ``:init`` e ``:goal`` são
+guardados em arrays e só viram nós quando acessados).
+
+Uso:
+
+    $ uv run python benchmarks/node_memory.py [ARQUIVO]
+"""
+
+import sys
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+
+from pddl import parse
+
+ROOT = Path(__file__).parent.parent
+PROBLEM = ROOT / "exemplos" / "valido2_visit_all_sequential" / "problem.pddl"
+
+
+def node_size(node) -> int:
+    """
+    Tamanho raso de um nó: a instância e, se houver, seu ``__dict__``.
+    """
+    size = sys.getsizeof(node)
+    if hasattr(node, "__dict__"):
+        size += sys.getsizeof(node.__dict__)
+    return size
+
+
+def main():
+    path = Path(sys.argv[1]) if len(sys.argv) > 1 else PROBLEM
+    tree = parse(path.read_text())
+
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    nodes = list(tree.descendants())
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    allocated = after - before - sys.getsizeof(nodes)
+
+    counts: Counter[str] = Counter()
+    sizes: Counter[str] = Counter()
+    for node in nodes:
+        name = type(node).__name__
+        counts[name] += 1
+        sizes[name] += node_size(node)
+
+    print(f"{'classe':>12} {'nós':>8} {'bytes/nó':>9}")
+    for name, count in counts.most_common():
+        print(f"{name:>12} {count:>8} {sizes[name] / count:>9.1f}")
+    total = sum(counts.values())
+    print(f"{'total':>12} {total:>8} {sum(sizes.values()) / total:>9.1f}")
+    print(f"memória alocada ao materializar os nós: {allocated / 2**20:.2f}MB"
+          f" ({allocated / total:.1f} bytes/nó)")
+
+
+if __name__ == "__main__":
+    main()
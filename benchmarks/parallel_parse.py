@@ -0,0 +1,59 @@
+"""
+Mede a análise de um problema grande com ``--parallel`` (veja
+`pddl.parallel`) em função do número de processos, comparando com a análise
+em um único processo por `pddl.parser.parse`.
+
+O problema é um grid-visit-all N x N gerado por ``generate.py`` e gravado em
+um arquivo temporário. Para cada número de processos, verifica também que a
+árvore produzida é igual à da análise normal.
+
+Uso:
+
+    $ uv run python benchmarks/parallel_parse.py [N] [-j PROCESSOS ...] [--engine {lark,fast}]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from pddl.parallel import parse_problem
+from pddl.parser import parse, set_engine
+
+sys.path.insert(0, str(Path(__file__).parent))
+from generate import grid_problem  # noqa: E402
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mede a análise paralela de :init.")
+    parser.add_argument("n", type=int, nargs="?", default=200, help="Tamanho da grade")
+    parser.add_argument("-j", "--jobs", type=int, nargs="*", default=[1, 2, 4, os.cpu_count() or 1])
+    parser.add_argument("--engine", choices=["lark", "fast"], default="lark")
+    args = parser.parse_args()
+    set_engine(args.engine)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "problem.pddl"
+        path.write_text(grid_problem(args.n))
+        size = path.stat().st_size
+        print(f"grid-{args.n}: {size / 2**20:.1f} MB, {os.cpu_count()} CPUs, analisador {args.engine}")
+
+        expected, serial = timed(lambda: parse(path.read_text()))
+        print(f"{'parse':<12}{serial:>9.2f}s{size / serial / 2**20:>9.2f} MB/s")
+        for jobs in sorted(set(args.jobs)):
+            result, elapsed = timed(lambda: parse_problem(str(path), jobs))
+            assert result == expected, f"árvores diferentes com {jobs} processos"
+            row = f"{'-j ' + str(jobs):<12}{elapsed:>9.2f}s{size / elapsed / 2**20:>9.2f} MB/s"
+            print(row + f"{serial / elapsed:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Compara a vazão da análise sintática com os analisadores ``lark`` e ``fast``
+(veja `pddl.fastparser`) nas variantes sintéticas de ``generate.py``.
+
+Os dois produzem a mesma AST (veja ``parser_diff.py``); a medida inclui a
+análise léxica, a análise sintática e a construção dos nós, mas não a
+validação com `process_tree`, que é igual nos dois casos.
+
+Uso:
+
+    $ uv run python benchmarks/parse_engines.py [--grid N ...] [--entregas K ...] [--aninhado D ...] [-r REPETIÇÕES]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from pddl.parser import parse_text
+
+sys.path.insert(0, str(Path(__file__).parent))
+from generate import cases  # noqa: E402
+
+ENGINES = ("lark", "fast")
+
+
+def best_of(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara a vazão dos analisadores lark e fast.")
+    parser.add_argument("--grid", type=int, nargs="*", default=[10, 30, 60], metavar="N")
+    parser.add_argument("--entregas", type=int, nargs="*", default=[100, 1000], metavar="K")
+    parser.add_argument("--aninhado", type=int, nargs="*", default=[10, 100], metavar="D")
+    parser.add_argument("-r", "--repeat", type=int, default=5, help="Repetições de cada medida")
+    args = parser.parse_args()
+
+    print(f"{'caso':<14}{'bytes':>10}" + "".join(f"{engine + ' MB/s':>14}" for engine in ENGINES) + f"{'ganho':>9}")
+    for name, domain, problem in cases(args.grid, args.entregas, args.aninhado):
+        sources = (domain, problem)
+        size = sum(len(source.encode()) for source in sources)
+        times = {}
+        for engine in ENGINES:
+            # Constrói o parser do Lark antes da medida
+            parse_text(domain, engine=engine)
+            times[engine] = best_of(lambda: [parse_text(source, engine=engine) for source in sources], args.repeat)
+        row = f"{name:<14}{size:>10}"
+        row += "".join(f"{size / times[engine] / 2**20:>14.2f}" for engine in ENGINES)
+        row += f"{times['lark'] / times['fast']:>8.1f}x"
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
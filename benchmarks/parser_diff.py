@@ -0,0 +1,162 @@
+"""
+Teste diferencial do analisador ``fast`` (`pddl.fastparser`) contra o Lark.
+
+Para cada entrada (os arquivos de ``exemplos/``, as variantes sintéticas de
+``generate.py`` e mutações aleatórias desses arquivos: tokens removidos,
+duplicados, trocados ou inseridos), verifica que:
+
+- quando o `FastParser` aceita o código, a AST produzida é igual à do Lark,
+  incluindo linhas e colunas de todos os identificadores;
+- quando o Lark rejeita o código, o `FastParser` também o rejeita (e
+  `parse_fast` recorre ao Lark, reproduzindo o mesmo erro);
+- a verificação completa do par domínio/problema, nos modos normal e
+  streaming, termina com o mesmo resultado (ou a mesma mensagem de erro) com
+  os dois analisadores.
+
+Qualquer divergência é impressa e o script termina com código 1.
+
+Uso:
+
+    $ uv run python benchmarks/parser_diff.py [-n MUTAÇÕES] [--seed SEMENTE]
+"""
+
+import argparse
+import contextlib
+import io
+import random
+import re
+import sys
+from collections import Counter
+from pathlib import Path
+
+from pddl.fastparser import FastParser, Unsupported
+from pddl.parser import get_parser, parse, set_engine
+from pddl.runner import domain_ctx
+from pddl.stream import eval_problem as stream_eval
+
+sys.path.insert(0, str(Path(__file__).parent))
+from generate import cases  # noqa: E402
+
+ROOT = Path(__file__).parent.parent
+
+# Tokens usados nas mutações, incluindo construções que o `FastParser` deixa
+# para o Lark e caracteres inválidos
+TOKEN_RE = re.compile(r"\s+|;[^\n]*|[()?:-]|[a-z0-9_]+|.")
+VOCABULARY = [
+    "(", ")", "-", "?", ":", "x", "either", "when", "forall", "and", "not",
+    "define", ":init", ":types", " ", "\n", "\t", ";c\n", "A", "1",
+]
+
+
+def inputs(mutations: int, seed: int) -> list[tuple[str, str, str]]:
+    """
+    Retorna as entradas como triplas (nome, domínio, problema).
+    """
+    result = []
+    for path in sorted((ROOT / "exemplos").iterdir()):
+        result.append((path.name, (path / "domain.pddl").read_text(), (path / "problem.pddl").read_text()))
+    result.extend(cases(grid=[3, 10], entregas=[20], aninhado=[0, 1, 4]))
+
+    rng = random.Random(seed)
+    originals = list(result)
+    for i in range(mutations):
+        name, domain, problem = rng.choice(originals)
+        if rng.random() < 0.5:
+            result.append((f"{name}~d{i}", mutate(domain, rng), problem))
+        else:
+            result.append((f"{name}~p{i}", domain, mutate(problem, rng)))
+    return result
+
+
+def mutate(src: str, rng: random.Random) -> str:
+    tokens = TOKEN_RE.findall(src)
+    for _ in range(rng.randint(1, 3)):
+        i = rng.randrange(len(tokens))
+        match rng.randrange(4):
+            case 0:
+                del tokens[i]
+            case 1:
+                tokens.insert(i, tokens[i])
+            case 2:
+                j = min(i + 1, len(tokens) - 1)
+                tokens[i], tokens[j] = tokens[j], tokens[i]
+            case 3:
+                tokens.insert(i, rng.choice(VOCABULARY))
+    return "".join(tokens)
+
+
+def compare_ast(src: str) -> str | None:
+    """
+    Compara as ASTs dos dois analisadores. Retorna a classificação da entrada
+    ou levanta `AssertionError` em caso de divergência.
+    """
+    try:
+        expected = get_parser("ast").parse(src, start="start")
+    except Exception as e:
+        expected = e
+    try:
+        result = FastParser(src).parse("start")
+    except Unsupported:
+        return "recurso ao Lark (erro)" if isinstance(expected, Exception) else "recurso ao Lark"
+
+    assert not isinstance(expected, Exception), f"fast aceitou código rejeitado pelo Lark: {expected!r}"
+    assert result == expected, f"ASTs diferentes:\n  lark: {expected!r}\n  fast: {result!r}"
+    return "idênticos"
+
+
+def outcome(domain: str, problem: str, engine: str, stream: bool) -> str:
+    """
+    Resultado da verificação completa com o analisador `engine`.
+    """
+    set_engine(engine)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            ctx = parse(domain).eval(domain_ctx())
+            if stream:
+                stream_eval(io.StringIO(problem), ctx)
+            else:
+                parse(problem).eval(ctx)
+        return "ok"
+    except Exception as e:
+        return describe(e)
+    finally:
+        set_engine("lark")
+
+
+def describe(exc: Exception) -> str:
+    # A mensagem de alguns erros do Lark falha ao calcular os tokens esperados
+    try:
+        return f"{type(exc).__name__}: {exc}"
+    except Exception:
+        return f"{type(exc).__name__} ({getattr(exc, 'line', '?')}:{getattr(exc, 'column', '?')})"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara os analisadores lark e fast.")
+    parser.add_argument("-n", "--mutations", type=int, default=2000, help="Número de entradas mutadas")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    stats = Counter()
+    failures = 0
+    for name, domain, problem in inputs(args.mutations, args.seed):
+        try:
+            for src in (domain, problem):
+                stats[compare_ast(src)] += 1
+            for stream in (False, True):
+                expected = outcome(domain, problem, "lark", stream)
+                result = outcome(domain, problem, "fast", stream)
+                assert result == expected, f"resultados diferentes (stream={stream}):\n  lark: {expected}\n  fast: {result}"
+        except AssertionError as e:
+            failures += 1
+            print(f"❌ {name}: {e}")
+
+    for kind, count in sorted(stats.items()):
+        print(f"{kind:<24}{count:>8}")
+    print(f"{failures} divergência(s).")
+    if failures:
+        exit(1)
+
+
+if __name__ == "__main__":
+    main()
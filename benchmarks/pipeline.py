@@ -0,0 +1,67 @@
+"""
+Mede o custo de cada etapa da verificação do maior exemplo
+(``exemplos/valido2_visit_all_sequential``): análise sintática pelo Lark,
+passada de validação/remoção de açúcar sintático e avaliação semântica.
+
+A linha "travessia completa" mostra quanto custaria uma única passada com
+cursores sobre a árvore inteira, que era o custo pago por cada chamada a
+`validate_tree` e `desugar_tree` antes de os ganchos não sobrescritos serem
+detectados (três passadas por verificação).
+
+Uso:
+
+    $ uv run python benchmarks/pipeline.py [REPETIÇÕES]
+"""
+
+import contextlib
+import io
+import sys
+import time
+from pathlib import Path
+
+from pddl.parser import get_parser
+from pddl.runner import domain_ctx
+
+ROOT = Path(__file__).parent.parent
+EXAMPLE = ROOT / "exemplos" / "valido2_visit_all_sequential"
+
+
+def best_of(func, repeat: int) -> float:
+    """
+    Menor tempo, em segundos, entre `repeat` execuções de `func`.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    parser = get_parser("ast")
+    domain = parser.parse((EXAMPLE / "domain.pddl").read_text(), start="start")
+    source = (EXAMPLE / "problem.pddl").read_text()
+    tree = parser.parse(source, start="start")
+
+    ctx = domain_ctx()
+    with contextlib.redirect_stdout(io.StringIO()):
+        domain.eval(ctx)
+
+        def evaluate():
+            tree.eval(ctx.snapshot())
+
+        times = {
+            "lark": best_of(lambda: parser.parse(source, start="start"), repeat),
+            "process_tree": best_of(tree.process_tree, repeat),
+            "travessia completa": best_of(lambda: list(tree.cursor().descendants()), repeat),
+            "eval": best_of(evaluate, repeat),
+        }
+
+    for name, elapsed in times.items():
+        print(f"{name:>20} {elapsed * 1000:>9.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Compara a latência de uma verificação feita pelo CLI em um processo novo com a
+mesma verificação feita por um servidor já no ar (``pddl serve``), tanto por
+``pddl --client`` quanto por uma requisição direta ao socket, como faria um
+editor que mantém a conexão aberta.
+
+O servidor é iniciado em um socket temporário e encerrado ao final. Uso:
+
+    $ uv run python benchmarks/server_latency.py [-n REPETIÇÕES] [EXEMPLO]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from pddl.server import request
+
+ROOT = Path(__file__).parent.parent
+
+
+def measure(func, repeat: int) -> list[float]:
+    """
+    Executa `func` `repeat` vezes e retorna os tempos de parede, em segundos.
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def wait_for(address: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            request(address, {"op": "ping"})
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.05)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("example", nargs="?", default="valido1_simples")
+    parser.add_argument("-n", "--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    example = ROOT / "exemplos" / args.example
+    files = [str(example / "domain.pddl"), str(example / "problem.pddl")]
+    cli = [sys.executable, "-m", "pddl", *files]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        address = os.path.join(tmp, "pddl.sock")
+        env = {**os.environ, "PDDL_CACHE_DIR": tmp}
+        server = subprocess.Popen(
+            [sys.executable, "-m", "pddl", "serve", "--listen", address, "-j", "1"],
+            env=env,
+            cwd=ROOT,
+            stdout=subprocess.DEVNULL,
+        )
+        try:
+            wait_for(address)
+            payload = {"domain": files[0], "problems": files[1:]}
+            scenarios = {
+                "pddl": lambda: subprocess.run(cli, env=env, check=True, stdout=subprocess.DEVNULL),
+                "pddl --client": lambda: subprocess.run(
+                    cli[:3] + ["--client", "--server", address] + files,
+                    env=env,
+                    check=True,
+                    stdout=subprocess.DEVNULL,
+                ),
+                "requisição": lambda: request(address, payload),
+            }
+            # Aquece o cache em disco e os domínios do servidor
+            for func in scenarios.values():
+                func()
+
+            print(f"{args.example}:")
+            for name, func in scenarios.items():
+                times = measure(func, args.repeat)
+                print(
+                    f"  {name:<15} mediana={statistics.median(times) * 1000:7.1f}ms"
+                    f"  min={min(times) * 1000:7.1f}ms"
+                )
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Mede o tempo de inicialização do verificador com e sem o cache das tabelas do
+parser LALR.
+
+Cada amostra executa o verificador em um processo novo, como acontece quando o
+CLI é chamado repetidamente por um script de CI. Uso:
+
+    $ uv run python benchmarks/startup.py [-n REPETIÇÕES]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+EXAMPLE = ROOT / "exemplos" / "valido1_simples"
+
+COMMANDS = {
+    "import pddl.parser": [sys.executable, "-c", "import pddl.parser"],
+    "pddl valido1_simples": [
+        sys.executable,
+        "-m",
+        "pddl",
+        str(EXAMPLE / "domain.pddl"),
+        str(EXAMPLE / "problem.pddl"),
+    ],
+}
+
+
+def measure(cmd: list[str], env: dict[str, str], repeat: int) -> list[float]:
+    """
+    Executa o comando `repeat` vezes e retorna os tempos de parede, em segundos.
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(cmd, env=env, cwd=ROOT, check=True, stdout=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("-n", "--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        base = {**os.environ, "PDDL_CACHE_DIR": tmp}
+        base.pop("PDDL_NO_CACHE", None)
+        scenarios = {
+            "sem cache": {**base, "PDDL_NO_CACHE": "1"},
+            "com cache": base,
+        }
+
+        # Aquece o cache antes das medições
+        subprocess.run(COMMANDS["import pddl.parser"], env=base, cwd=ROOT, check=True)
+
+        for name, cmd in COMMANDS.items():
+            print(f"{name}:")
+            medians = {}
+            for scenario, env in scenarios.items():
+                times = measure(cmd, env, args.repeat)
+                medians[scenario] = statistics.median(times)
+                print(
+                    f"  {scenario:<10} mediana={medians[scenario] * 1000:7.1f}ms"
+                    f"  min={min(times) * 1000:7.1f}ms"
+                )
+            speedup = medians["sem cache"] / medians["com cache"]
+            print(f"  ganho: {speedup:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
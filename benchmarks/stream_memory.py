@@ -0,0 +1,70 @@
+"""
+Compara o pico de memória e o tempo da verificação completa e da verificação
+em modo streaming (``--stream``) para problemas do domínio grid-visit-all de
+tamanhos crescentes.
+
+Uso:
+
+    $ uv run python benchmarks/stream_memory.py [TAMANHO ...]
+"""
+
+import contextlib
+import io
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from pddl import parse
+from pddl.runner import domain_ctx
+from pddl.stream import eval_problem
+
+sys.path.insert(0, str(Path(__file__).parent))
+from generate import GRID_DOMAIN, grid_problem  # noqa: E402
+
+
+def full(path: Path, ctx):
+    parse(path.read_text()).eval(ctx, str(path))
+
+
+def stream(path: Path, ctx):
+    with path.open() as fd:
+        eval_problem(fd, ctx, str(path))
+
+
+def measure(func, path: Path) -> tuple[float, int]:
+    """
+    Retorna o tempo gasto e o pico de memória alocada durante a verificação.
+    """
+    ctx = domain_ctx()
+    with contextlib.redirect_stdout(io.StringIO()):
+        parse(GRID_DOMAIN.read_text()).eval(ctx)
+        tracemalloc.start()
+        start = time.perf_counter()
+        func(path, ctx)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10, 30, 60]
+    print(f"{'grade':>7} {'fatos':>8} {'modo':>9} {'tempo':>9} {'pico':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            path = Path(tmp) / f"grid-{n}.pddl"
+            source = grid_problem(n)
+            path.write_text(source)
+            facts = source.count("(connected") + 2
+            for name, func in (("completo", full), ("streaming", stream)):
+                elapsed, peak = measure(func, path)
+                print(
+                    f"{n:>3}x{n:<3} {facts:>8} {name:>9} {elapsed:>8.2f}s"
+                    f" {peak / 2**20:>8.1f}MB"
+                )
+
+
+if __name__ == "__main__":
+    main()
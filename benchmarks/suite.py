@@ -0,0 +1,171 @@
+"""
+Executa a verificação sobre as variantes sintéticas de ``generate.py`` e mede,
+para cada uma:
+
+- o tempo de análise sintática pelo Lark (árvore concreta), de transformação
+  pelo `PDDLTransformer`, de validação (`process_tree`) e de avaliação do
+  domínio e do problema, como o menor tempo entre as repetições;
+- a vazão em bytes/s (análise e transformação) e em fatos/s (avaliação);
+- o pico de memória alocada durante uma verificação completa.
+
+Os resultados são gravados em um arquivo JSON (por padrão, em
+``benchmarks/results/<commit>.json``) junto com as versões do Python e do
+Lark e o commit atual. Com ``--compare``, cada medida é comparada com a de um
+arquivo anterior, para encontrar regressões entre versões.
+
+Uso:
+
+    $ uv run python benchmarks/suite.py [--grid N ...] [--entregas K ...] [--aninhado D ...]
+        [-r REPETIÇÕES] [-o ARQUIVO] [--compare ARQUIVO]
+"""
+
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import lark
+
+from pddl import parse
+from pddl.batch import has_numpy
+from pddl.parser import get_parser
+from pddl.runner import domain_ctx
+from pddl.transformer import PDDLTransformer
+
+sys.path.insert(0, str(Path(__file__).parent))
+from generate import cases  # noqa: E402
+
+RESULTS = Path(__file__).parent / "results"
+PHASES = ("parse", "transform", "validate", "eval", "total")
+
+
+def best_of(func, repeat: int, setup=None) -> float:
+    """
+    Menor tempo, em segundos, entre `repeat` execuções de `func`. Se `setup`
+    for dado, seu resultado é passado para `func` e não entra na medida.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        args = () if setup is None else (setup(),)
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def measure(domain: str, problem: str, repeat: int) -> dict:
+    """
+    Mede as fases da verificação de um par domínio/problema.
+    """
+    cst_parser = get_parser("cst")
+    sources = (domain, problem)
+    csts = [cst_parser.parse(source, start="start") for source in sources]
+    domain_ast, problem_ast = (parse(source) for source in sources)
+
+    def transform():
+        return [PDDLTransformer().transform(cst) for cst in csts]
+
+    def validate(trees):
+        for tree in trees:
+            tree.process_tree()
+
+    def evaluate():
+        ctx = domain_ast.eval(domain_ctx())
+        problem_ast.eval(ctx.snapshot())
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        times = {
+            "parse": best_of(lambda: [cst_parser.parse(source, start="start") for source in sources], repeat),
+            "transform": best_of(transform, repeat),
+            "validate": best_of(validate, repeat, setup=transform),
+            "eval": best_of(evaluate, repeat),
+        }
+        times["total"] = sum(times.values())
+
+        tracemalloc.start()
+        ctx = parse(domain).eval(domain_ctx())
+        parse(problem).eval(ctx)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    problem_node = problem_ast.source
+    return {
+        "bytes": sum(len(source.encode()) for source in sources),
+        "facts": len(problem_node.init) + len(problem_node.goal),
+        "times": times,
+        "peak": peak,
+    }
+
+
+def metadata() -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True, cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "date": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "lark": lark.__version__,
+        "numpy": has_numpy(),
+    }
+
+
+def print_results(results: dict, previous: dict | None = None):
+    header = f"{'caso':<14}{'bytes':>10}{'fatos':>8}" + "".join(f"{name:>11}" for name in PHASES)
+    print(header + f"{'MB/s':>8}{'fatos/s':>10}{'pico':>9}")
+    for name, case in results.items():
+        times = case["times"]
+        row = f"{name:<14}{case['bytes']:>10}{case['facts']:>8}"
+        row += "".join(f"{times[phase] * 1000:>9.1f}ms" for phase in PHASES)
+        row += f"{case['bytes'] / (times['parse'] + times['transform']) / 2**20:>8.2f}"
+        row += f"{case['facts'] / times['eval']:>10.0f}"
+        row += f"{case['peak'] / 2**20:>7.1f}MB"
+        print(row)
+
+        old = (previous or {}).get(name)
+        if old is not None:
+            ratios = [times[phase] / old["times"][phase] - 1 for phase in PHASES]
+            row = f"{'  vs. anterior':<32}" + "".join(f"{ratio:>+11.0%}" for ratio in ratios)
+            row += f"{'':>18}{case['peak'] / old['peak'] - 1:>+9.0%}"
+            print(row)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mede a vazão da verificação em variantes sintéticas.")
+    parser.add_argument("--grid", type=int, nargs="*", default=[10, 30, 60], metavar="N")
+    parser.add_argument("--entregas", type=int, nargs="*", default=[100, 1000], metavar="K")
+    parser.add_argument("--aninhado", type=int, nargs="*", default=[10, 100], metavar="D")
+    parser.add_argument("-r", "--repeat", type=int, default=5, help="Repetições de cada medida")
+    parser.add_argument("-o", "--output", help="Arquivo de resultados (padrão: benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", help="Arquivo de resultados anterior para comparação")
+    args = parser.parse_args()
+
+    meta = metadata()
+    results = {}
+    for name, domain, problem in cases(args.grid, args.entregas, args.aninhado):
+        results[name] = measure(domain, problem, args.repeat)
+
+    previous = None
+    if args.compare:
+        previous = json.loads(Path(args.compare).read_text())["cases"]
+    print_results(results, previous)
+
+    output = Path(args.output) if args.output else RESULTS / f"{meta['commit'] or 'resultados'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps({"meta": meta, "cases": results}, indent=2) + "\n")
+    print(f"\nResultados gravados em {output}")
+
+
+if __name__ == "__main__":
+    main()
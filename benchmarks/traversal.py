@@ -0,0 +1,64 @@
+"""
+Mede as travessias de `pddl.node` em árvores sintéticas profundas, formadas
+por fórmulas ``(and (and (and ... (at ?x ?l))))`` aninhadas, e compara com
+uma implementação recursiva equivalente à antiga.
+
+A versão recursiva passa cada nó por um gerador por nível da árvore (custo
+quadrático na profundidade) e falha com ``RecursionError`` em árvores mais
+profundas que o limite de recursão do Python.
+
+Uso:
+
+    $ uv run python benchmarks/traversal.py [PROFUNDIDADE ...]
+"""
+
+import sys
+import time
+
+from pddl.ast import Call, Identifier
+from pddl.node import Node
+
+
+def deep_tree(depth: int) -> Node:
+    """
+    Cria uma cadeia de `depth` chamadas ``and`` aninhadas.
+    """
+    node: Node = Call(Identifier("at", 1, 1), [Identifier("x", 1, 1), Identifier("l", 1, 1)])
+    for _ in range(depth):
+        node = Call(Identifier("and", 1, 1), [node])
+    return node
+
+
+def recursive_descendants(node: Node):
+    yield node
+    for child in node.children():
+        yield from recursive_descendants(child)
+
+
+def measure(func) -> str:
+    start = time.perf_counter()
+    try:
+        func()
+    except RecursionError:
+        return f"{'RecursionError':>16}"
+    return f"{(time.perf_counter() - start) * 1000:>14.2f}ms"
+
+
+def main():
+    depths = [int(arg) for arg in sys.argv[1:]] or [100, 500, 2000, 10000]
+    cases = {
+        "recursivo": lambda tree: sum(1 for _ in recursive_descendants(tree)),
+        "pré-ordem": lambda tree: sum(1 for _ in tree.descendants()),
+        "pós-ordem": lambda tree: sum(1 for _ in tree.descendants(postorder=True)),
+        "cursores": lambda tree: sum(1 for _ in tree.cursor().descendants()),
+        "pretty": lambda tree: tree.pretty(),
+    }
+    print(f"{'profundidade':>12}" + "".join(f"{name:>16}" for name in cases))
+    for depth in depths:
+        tree = deep_tree(depth)
+        row = "".join(measure(lambda: case(tree)) for case in cases.values())
+        print(f"{depth:>12}{row}")
+
+
+if __name__ == "__main__":
+    main()
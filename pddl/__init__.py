@@ -47,14 +47,14 @@ def eval(
     elif not isinstance(env, Ctx):
         env = Ctx.from_dict(env)
 
+    # Árvores produzidas por `parse` já foram validadas
     if isinstance(src, Node):
         ast = src
+        if not skip_validation:
+            ast.validate_tree()
     else:
         ast = parse(src)
 
-    if not skip_validation:
-        ast.validate_tree()
-
     try:
         return ctx, ast.eval(env, file_path)
     except Exception as e:
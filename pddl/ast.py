@@ -1,8 +1,9 @@
+import sys
 from abc import ABC
 from dataclasses import dataclass
-from typing import Callable
+from typing import TYPE_CHECKING, Callable, Iterable
 from .errors import PDDLError, MissingRequirementError, PredicateArityError , TypeError, UndeclaredNameError
-from .ctx import Ctx
+from .ctx import Ctx, requirement_bit
 
 # Declaramos nossa classe base num módulo separado para esconder um pouco de
 # Python relativamente avançado de quem não se interessar pelo assunto.
@@ -12,6 +13,11 @@ from .ctx import Ctx
 # e métodos de visitação.
 from .node import Node
 
+if TYPE_CHECKING:
+    from .diagnostics import Diagnostics
+    from .facts import FactStore
+    from .hierarchy import TypeHierarchy
+
 
 #
 # TIPOS BÁSICOS
@@ -20,6 +26,26 @@ from .node import Node
 # Tipos de valores que podem aparecer durante a execução do programa
 Value = str | None
 
+# Mensagens exibidas quando a validação termina com sucesso
+DOMAIN_OK = "✅ Domínio declarado corretamente!"
+PROBLEM_OK = "✅ Problema declarado corretamente!"
+
+# Requisitos verificados diretamente pelos nós da AST
+TYPING = requirement_bit("typing")
+CONDITIONAL_EFFECTS = requirement_bit("conditional-effects")
+
+# Posição de um identificador no código: a linha fica nos bits altos e a
+# coluna nos COLUMN_BITS bits baixos de um único inteiro (veja `Identifier`)
+COLUMN_BITS = 32
+COLUMN_MASK = (1 << COLUMN_BITS) - 1
+
+
+def pack_position(line: int, column: int) -> int:
+    """
+    Codifica uma linha e uma coluna em um único inteiro.
+    """
+    return line << COLUMN_BITS | column
+
 class Expr(Node, ABC):
     """
     Classe base para expressões.
@@ -29,7 +55,9 @@ class Expr(Node, ABC):
     funções, etc.
     """
 
-@dataclass
+    __slots__ = ()
+
+@dataclass(slots=True)
 class Program(Node):
     """
     Representa um programa.
@@ -39,15 +67,31 @@ class Program(Node):
 
     source: Expr
 
-    def eval(self, ctx: Ctx, file_path: str | None = None):
-        return self.source.eval(ctx, file_path)
+    def eval(self, ctx: Ctx, file_path: str | None = None, diagnostics: "Diagnostics | None" = None):
+        return self.source.eval(ctx, file_path, diagnostics)
+
+
+def eval_all(nodes: Iterable[Node], ctx: Ctx, diagnostics: "Diagnostics | None", file_path: str | None):
+    """
+    Avalia uma sequência de declarações.
+
+    Sem `diagnostics`, o primeiro erro é propagado. Com `diagnostics`, cada
+    erro é registrado e a avaliação continua com a próxima declaração.
+    """
+    for node in nodes:
+        try:
+            node.eval(ctx)
+        except PDDLError as e:
+            if diagnostics is None:
+                raise
+            diagnostics.add(e, file_path)
 
 
 #
 # EXPRESSÕES
 #
 
-@dataclass
+@dataclass(slots=True)
 class Domain(Expr):
     define: "Identifier"
     requirements: list["Requirement"]
@@ -56,58 +100,93 @@ class Domain(Expr):
     predicates: list["Predicate"]
     actions: list["Action"]
     
-    def eval(self, ctx: Ctx, file_path: str | None = None):
+    def eval(self, ctx: Ctx, file_path: str | None = None, diagnostics: "Diagnostics | None" = None):
+        errors = 0 if diagnostics is None else len(diagnostics)
         try:
             self.define.eval(ctx)
-            for requirement in self.requirements:
-                requirement.eval(ctx)
-            for type in self.types:
-                type.eval(ctx)
-            for constant in self.constants:
-                constant.eval(ctx)
-            for predicate in self.predicates:
-                predicate.eval(ctx)
-            for action in self.actions:
-                action.eval(ctx)
-            print("✅ Domínio declarado corretamente!")
-            return ctx
+            eval_all(self.requirements, ctx, diagnostics, file_path)
+            eval_all(self.types, ctx, diagnostics, file_path)
+            eval_all(self.constants, ctx, diagnostics, file_path)
+            eval_all(self.predicates, ctx, diagnostics, file_path)
+            eval_all(self.actions, ctx, diagnostics, file_path)
         except PDDLError as p:
             raise p.__class__(msg=p.msg, line=p.line, column=p.column, file_path=file_path)
+        if diagnostics is None or len(diagnostics) == errors:
+            print(DOMAIN_OK)
+        return ctx
 
-@dataclass
+@dataclass(slots=True)
 class Problem(Expr):
     define_problem: "Identifier" 
     domain_ref: "Identifier" 
     objects: list["Object"] 
-    init: list["Call"] 
-    goal: list["Call"]
+    init: "FactStore"
+    goal: "FactStore"
+
+    def eval(self, ctx: Ctx, file_path: str | None = None, diagnostics: "Diagnostics | None" = None):
+        from .batch import eval_facts
 
-    def eval(self, ctx: Ctx, file_path: str | None = None):
+        errors = 0 if diagnostics is None else len(diagnostics)
         try:
             self.define_problem.eval(ctx)
             self.domain_ref.eval(ctx)
             for obj in self.objects:
                 ctx.var_def(obj.name.name, obj)
-                obj.eval(ctx)
-            for init_call in self.init:
-                init_call.eval(ctx)
-            for goal_call in self.goal:
-                goal_call.eval(ctx)
-            print("✅ Problema declarado corretamente!")
+            eval_all(self.objects, ctx, diagnostics, file_path)
+            eval_facts(self.init, ctx, diagnostics, file_path)
+            eval_all(self.goal, ctx, diagnostics, file_path)
         except PDDLError as p:
             raise p.__class__(msg=p.msg, line=p.line, column=p.column, file_path=file_path)
+        if diagnostics is None or len(diagnostics) == errors:
+            print(PROBLEM_OK)
 
-@dataclass
+@dataclass(slots=True, init=False)
 class Identifier(Expr):
     """
     Uma variável no código
 
     Ex.: x, y, z
+
+    Há um identificador para cada ocorrência de um nome no código. Para que
+    isso custe pouco, o nome é internado (todas as ocorrências compartilham a
+    mesma string) e a linha e a coluna ficam codificadas em um único inteiro,
+    `pos`, e só são decodificadas quando lidas, normalmente para montar a
+    mensagem de um `PDDLError`.
     """
 
     name: str
-    line: int
-    column: int
+    pos: int
+
+    def __init__(self, name: str, line: int, column: int):
+        self.name = sys.intern(name)
+        self.pos = line << COLUMN_BITS | column
+
+    @classmethod
+    def at(cls, name: str, pos: int) -> "Identifier":
+        """
+        Cria um identificador a partir de uma posição já codificada por
+        `pack_position`.
+        """
+        ident = cls.__new__(cls)
+        ident.name = sys.intern(name)
+        ident.pos = pos
+        return ident
+
+    @property
+    def line(self) -> int:
+        return self.pos >> COLUMN_BITS
+
+    @line.setter
+    def line(self, line: int) -> None:
+        self.pos = line << COLUMN_BITS | self.pos & COLUMN_MASK
+
+    @property
+    def column(self) -> int:
+        return self.pos & COLUMN_MASK
+
+    @column.setter
+    def column(self, column: int) -> None:
+        self.pos = self.pos & ~COLUMN_MASK | column
 
     def eval(self, ctx: Ctx):
         ...
@@ -115,23 +194,76 @@ class Identifier(Expr):
     def __repr__(self):
         return f"ident {self.name}"
         
-@dataclass
+@dataclass(slots=True)
 class Requirement(Expr):
     name: Identifier
 
     def eval(self, ctx: Ctx):
-        ctx.var_def(self.name.name, self)
+        ctx.symbols.require(self.name.name)
+
+@dataclass(slots=True)
+class Either(Expr):
+    """
+    Tipo ``(either a b ...)``: qualquer um dos tipos listados.
+    """
+    either: Identifier
+    types: list[Identifier]
+
+    @property
+    def name(self) -> str:
+        return f"(either {" ".join(type.name for type in self.types)})"
+
+    @property
+    def line(self) -> int:
+        return self.either.line
+
+    @property
+    def column(self) -> int:
+        return self.either.column
+
+    def eval(self, ctx: Ctx):
+        ...
+
+    def __repr__(self):
+        return self.name
+
+
+# Referência a um tipo: um nome ou um ``either``
+TypeRef = Identifier | Either
 
-@dataclass
+
+def type_names(type: TypeRef) -> tuple[str, ...]:
+    """
+    Nomes dos tipos mencionados em uma referência a tipo.
+    """
+    if isinstance(type, Either):
+        return tuple(member.name for member in type.types)
+    return (type.name,)
+
+
+def check_type_declared(type: TypeRef, ctx: Ctx, prefix: str = "tipo "):
+    """
+    Verifica se todos os tipos mencionados em `type` foram declarados.
+    """
+    members = type.types if isinstance(type, Either) else (type,)
+    for member in members:
+        if member.name not in ctx.symbols.hierarchy:
+            raise TypeError(f"{prefix}{member.name} não declarado", line=member.line, column=member.column)
+
+
+@dataclass(slots=True)
 class Type(Expr):
     name: Identifier
+    parent: TypeRef | None = None
 
     def eval(self, ctx: Ctx):
-        ctx.var_def(self.name.name, self)
-        try:
-            if ctx["typing"]:
-                pass
-        except KeyError:
+        symbols = ctx.symbols
+        symbols.types[self.name.name] = self
+        parents = () if self.parent is None else type_names(self.parent)
+        symbols.hierarchy.declare(self.name.name, parents)
+        # A hierarquia mudou: os verificadores de predicados são recompilados
+        symbols.checkers.clear()
+        if not ctx.symbols.requirements & TYPING:
             raise MissingRequirementError (
                         f"erro ao declarar {self.name.name}, necessário :typing",
                         line=self.name.line,
@@ -142,36 +274,25 @@ class Type(Expr):
     def __repr__(self):
         return f"type {self.name.name}"
     
-@dataclass
+@dataclass(slots=True)
 class Object(Expr):
     name: Identifier
-    type: Identifier
+    type: TypeRef
     
     def eval(self, ctx: Ctx):
-        try:
-            if ctx[self.type.name]:
-                # print(f"tipo {self.type.name} existe")
-                # ctx.var_def(self.name.name, self)
-                ...
-        except Exception:
-            raise TypeError(f"tipo {self.type.name} não declarado", line=self.type.line, column=self.type.column)
+        check_type_declared(self.type, ctx)
     
-@dataclass
+@dataclass(slots=True)
 class Constant(Expr):
     name: Identifier
-    type: Identifier
+    type: TypeRef
 
     def eval(self, ctx: Ctx):
-        try:
-            if ctx[self.type.name]:
-                ctx.var_def(self.name.name, self)
-                # print(ctx)
-                ...
-        except Exception:
-            raise TypeError(f"{self.type.name} não declarado", line=self.type.line, column=self.type.column)
+        check_type_declared(self.type, ctx, prefix="")
+        ctx.var_def(self.name.name, self)
     def __repr__(self):
         return f"const {self.name.name}"
-@dataclass
+@dataclass(slots=True)
 class Predicate(Expr):
     name: Identifier
     args: list[Object]
@@ -179,7 +300,8 @@ class Predicate(Expr):
 
     def eval(self, ctx: Ctx):
 
-        ctx.var_def(self.name.name, self)
+        ctx.symbols.predicates[self.name.name] = self
+        ctx.symbols.checkers.pop(self.name.name, None)
 
         for arg in self.args:
             arg.eval(ctx)
@@ -187,7 +309,7 @@ class Predicate(Expr):
     def __repr__(self):
         return f"pred {self.name.name}"
 
-@dataclass
+@dataclass(slots=True)
 class Call(Expr):
     """
     Representa o uso de um predicado
@@ -196,80 +318,149 @@ class Call(Expr):
     args: list[Identifier | Expr]
 
     def eval(self, ctx: Ctx):
-        # 1. Verificar se o predicado (self.name.name) foi declarado
-        try:
-            predicate: Predicate = ctx[self.name.name]
-        except KeyError:
-            raise UndeclaredNameError(f"predicado {self.name.name} não declarado", 
-                                      line=self.name.line, column=self.name.column)
-        
+        # 1. Verificar se o predicado (self.name.name) foi declarado. Cada
+        # predicado é compilado uma única vez em um verificador, que faz as
+        # demais verificações (requisito, aridade e tipos dos argumentos)
+        checker = ctx.symbols.checkers.get(self.name.name)
+        if checker is None:
+            checker = PredicateChecker.lookup(self.name.name, ctx)
+            if checker is None:
+                raise UndeclaredNameError(f"predicado {self.name.name} não declarado", 
+                                          line=self.name.line, column=self.name.column)
+        checker.check(self, ctx)
+
+
+class PredicateChecker:
+    """
+    Verificador compilado para as chamadas de um predicado.
+
+    Guarda a aridade, o bit do requisito e os tipos esperados dos argumentos
+    (como conjuntos de bits da hierarquia de tipos), calculados uma única vez
+    a partir da declaração do predicado. Um argumento é aceito se o seu tipo
+    for subtipo de algum dos tipos esperados. As mensagens de erro só são
+    montadas quando alguma verificação falha.
+    """
+
+    __slots__ = ("predicate", "requirement", "requirement_bit", "arity", "expected")
+
+    def __init__(self, predicate: Predicate, hierarchy: "TypeHierarchy"):
+        self.predicate = predicate
+        self.requirement = predicate.requirement
+        self.requirement_bit = 0 if predicate.requirement is None else requirement_bit(predicate.requirement)
+        if predicate.args is None:
+            self.arity = None
+            self.expected = None
+        else:
+            self.arity = len(predicate.args)
+            self.expected = tuple(hierarchy.mask(type_names(arg.type)) for arg in predicate.args)
+
+    @classmethod
+    def lookup(cls, name: str, ctx: Ctx) -> "PredicateChecker | None":
+        """
+        Retorna o verificador do predicado, compilando-o se necessário, ou
+        `None` se o predicado não foi declarado.
+        """
+        symbols = ctx.symbols
+        checker = symbols.checkers.get(name)
+        if checker is None:
+            predicate = symbols.predicates.get(name)
+            if predicate is None:
+                return None
+            checker = symbols.checkers[name] = cls(predicate, symbols.hierarchy)
+        return checker
+
+    def check(self, call: Call, ctx: Ctx):
         # 2. Verificar o requisito associado ao predicado (se houver)
-        if predicate.requirement is not None:
+        if self.requirement is not None:
+            bit = self.requirement_bit
+            if not (ctx.symbols.requirements & bit if bit else ctx.symbols.has_requirement(self.requirement)):
+                self.missing_requirement(call)
+
+        # Conectivos lógicos (and, not, or) não têm assinatura: apenas
+        # avaliamos os argumentos
+        args = call.args
+        if self.expected is None:
+            for arg in args:
+                arg.eval(ctx)
+            return
+
+        # 3. Verificar a aridade (número de argumentos) do predicado
+        if len(args) != self.arity:
+            self.wrong_arity(call)
+
+        # 4. Verificar o tipo dos argumentos passados. Os argumentos de
+        # predicados declarados são nomes, cuja avaliação não faz nada
+        expected = self.expected
+        hierarchy = ctx.symbols.hierarchy
+        ancestors = hierarchy.ancestors
+        i = 0
+        for arg in args:
             try:
-                if ctx[predicate.requirement]:
-                    pass
+                real_type = ctx[arg.name].type
             except KeyError:
-                raise MissingRequirementError (
-                    f"{predicate.name.name} não encontrado, necessário :{predicate.requirement}",
-                    line=self.name.line,
-                    column=self.name.column
-                    )
-        # 3. Verificar a aridade (número de argumentos) do predicado
-        if predicate.args is not None:
-            if len(self.args) != len(predicate.args):
-                raise PredicateArityError(
-                    f"{self.name.name} esperava {
-                        len(predicate.args)} {
-                            "argumento" if len(predicate.args) == 1 
-                            else "argumentos"}, mas recebeu {len(self.args)}", 
-                    line=self.name.line, column=self.name.column)
-            
-            # 4. Verificar o tipo dos argumentos passados
-            for arg_1, arg_2 in zip(self.args, predicate.args):
-                expected_type = arg_2.type.name
-                try:
-                    real_type = ctx[arg_1.name].type.name
-                except KeyError:
-                    raise UndeclaredNameError(f"objeto {arg_1.name} não declarado", 
-                                              line=arg_1.line, column=arg_1.column)
-                
-                if real_type != expected_type:
-                    raise TypeError(
-                        f"({self.name.name} {" ".join(
-                            [f"**?{obj.name.name} - {obj.type.name}**" if obj.name.name == arg_2.name.name 
-                                else f"?{obj.name.name} - {obj.type.name}"
-                                for obj in predicate.args]
-                            )}) esperava argumento do tipo '{expected_type}', mas recebeu '{real_type}'", 
-                        line=arg_1.line, 
-                        column=arg_1.column)
-                
-        for arg in self.args:
-            arg.eval(ctx)
+                raise UndeclaredNameError(f"objeto {arg.name} não declarado", 
+                                          line=arg.line, column=arg.column)
+            real = ancestors.get(real_type.name)
+            if real is None:
+                real = hierarchy.ancestors_of(type_names(real_type))
+            # Um tipo sem ancestrais não foi declarado. Esse erro já foi
+            # reportado na declaração do objeto (ou do predicado), e o tipo é
+            # tratado como desconhecido para não repeti-lo em cada uso
+            if not real & expected[i] and real and expected[i]:
+                self.wrong_type(call, i, real_type.name)
+            i += 1
+
+    def missing_requirement(self, call: Call):
+        raise MissingRequirementError (
+            f"{self.predicate.name.name} não encontrado, necessário :{self.requirement}",
+            line=call.name.line,
+            column=call.name.column
+            )
 
-@dataclass
+    def wrong_arity(self, call: Call):
+        raise PredicateArityError(
+            f"{call.name.name} esperava {
+                self.arity} {
+                    "argumento" if self.arity == 1 
+                    else "argumentos"}, mas recebeu {len(call.args)}", 
+            line=call.name.line, column=call.name.column)
+
+    def wrong_type(self, call: Call, i: int, real_type: str):
+        arg_1 = call.args[i]
+        arg_2 = self.predicate.args[i]
+        expected_type = arg_2.type.name
+        raise TypeError(
+            f"({call.name.name} {" ".join(
+                [f"**?{obj.name.name} - {obj.type.name}**" if obj.name.name == arg_2.name.name 
+                    else f"?{obj.name.name} - {obj.type.name}"
+                    for obj in self.predicate.args]
+                )}) esperava argumento do tipo '{expected_type}', mas recebeu '{real_type}'", 
+            line=arg_1.line, 
+            column=arg_1.column)
+
+@dataclass(slots=True)
 class Forall(Expr):
     objs: list[Object]
     call: Call
 
     def eval(self, ctx: Ctx):
         scope = ctx.push({})
-        for obj in self.objs:
-            scope.var_def(obj.name.name, obj)
-            obj.eval(scope)
-        self.call.eval(scope)
-        scope.pop()
-
-@dataclass
+        try:
+            for obj in self.objs:
+                scope.var_def(obj.name.name, obj)
+                obj.eval(scope)
+            self.call.eval(scope)
+        finally:
+            scope.pop()
+
+@dataclass(slots=True)
 class When(Expr):
     when: Identifier
     condition: Call
     effect: Call
 
     def eval(self, ctx: Ctx):
-        try:
-            if ctx["conditional-effects"]:
-                pass
-        except KeyError:
+        if not ctx.symbols.requirements & CONDITIONAL_EFFECTS:
             raise MissingRequirementError(
                 "erro ao declarar when, necessário :conditional-effects",
                 line=self.when.line,
@@ -278,7 +469,7 @@ class When(Expr):
         self.condition.eval(ctx)
         self.effect.eval(ctx)
 
-@dataclass
+@dataclass(slots=True)
 class Action(Expr):
     name: Identifier
     parameters: list[Object]
@@ -287,14 +478,16 @@ class Action(Expr):
     
     def eval(self, ctx: Ctx):
         env = ctx.push({})
-        for parameter in self.parameters:
-            env.var_def(parameter.name.name, parameter)
-            parameter.eval(env)
-        for precon in self.precondition:
-            precon.eval(env)
-        for eff in self.effect:
-            eff.eval(env)
-        env.pop()
+        try:
+            for parameter in self.parameters:
+                env.var_def(parameter.name.name, parameter)
+                parameter.eval(env)
+            for precon in self.precondition:
+                precon.eval(env)
+            for eff in self.effect:
+                eff.eval(env)
+        finally:
+            env.pop()
     
     def __repr__(self):
         return f"act {self.name.name}"
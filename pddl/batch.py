@@ -0,0 +1,163 @@
+"""
+Verificação vetorizada dos fatos de ``:init``.
+
+Os fatos de um problema guardados em um `FactStore` formam colunas de
+inteiros: o identificador do predicado e um identificador de nome por
+posição de argumento. Em vez de chamar `Call.eval` para cada fato, agrupamos
+os fatos simples por predicado, traduzimos os argumentos para identificadores
+de tipo com um array de consulta e comparamos com os tipos esperados pelo
+predicado (levando em conta a hierarquia de tipos) de uma só vez, usando
+NumPy.
+
+Fatos que não passam na verificação vetorizada (ou que ela não sabe tratar,
+como ``(not ...)``) são avaliados com `Call.eval`, na ordem original. Como
+todos os demais fatos são válidos, o primeiro erro levantado é exatamente o
+mesmo da avaliação fato a fato.
+
+O NumPy é uma dependência opcional. Sem ele, ou para problemas pequenos, os
+fatos são sempre avaliados um a um. Como importar o NumPy custa mais que
+verificar dezenas de milhares de fatos, o limite é bem maior quando ele
+ainda não foi importado (veja `use_numpy`).
+"""
+
+import sys
+from importlib.util import find_spec
+from typing import TYPE_CHECKING, Iterable
+
+from .ast import Node, PredicateChecker, eval_all, type_names
+from .ctx import Ctx
+from .facts import FactStore
+
+if TYPE_CHECKING:
+    from array import array
+
+    import numpy as np
+
+    from .diagnostics import Diagnostics
+
+# Abaixo deste número de fatos, o custo de montar os arrays não compensa
+MIN_FACTS = 1024
+
+# O mesmo, incluindo a importação do NumPy (de 70 a 150ms), que a verificação
+# vetorizada só recupera a cerca de 1µs por fato (veja
+# ``benchmarks/call_eval.py``)
+MIN_FACTS_IMPORT = 150_000
+
+
+def has_numpy() -> bool:
+    """
+    Verifica se o NumPy está disponível, sem importá-lo.
+    """
+    return "numpy" in sys.modules or find_spec("numpy") is not None
+
+
+def use_numpy(count: int) -> bool:
+    """
+    Decide se `count` fatos devem ser verificados de forma vetorizada.
+    """
+    if "numpy" in sys.modules:
+        return count >= MIN_FACTS
+    return count >= MIN_FACTS_IMPORT and has_numpy()
+
+
+def eval_facts(
+    facts: Iterable[Node],
+    ctx: Ctx,
+    diagnostics: "Diagnostics | None" = None,
+    file_path: str | None = None,
+) -> None:
+    """
+    Avalia uma sequência de fatos, usando a verificação vetorizada quando
+    possível.
+
+    Com `diagnostics`, os erros são registrados e a avaliação continua (veja
+    `pddl.ast.eval_all`).
+    """
+    if isinstance(facts, FactStore) and use_numpy(len(facts)):
+        facts = [facts[int(i)] for i in flagged_rows(facts, ctx)]
+    eval_all(facts, ctx, diagnostics, file_path)
+
+
+def as_numpy(data: "array") -> "np.ndarray":
+    """
+    Cria uma visão NumPy de um array de inteiros, sem copiar os dados.
+    """
+    import numpy as np
+
+    if not data:
+        return np.zeros(0, dtype=np.int64)
+    return np.frombuffer(data, dtype=f"i{data.itemsize}")
+
+
+def flagged_rows(store: FactStore, ctx: Ctx) -> "np.ndarray":
+    """
+    Retorna, em ordem crescente, os índices dos fatos de `store` que precisam
+    ser avaliados por `Call.eval`: os que falham na verificação de tipos e os
+    que a verificação vetorizada não cobre.
+    """
+    import numpy as np
+
+    names = store.table.names
+    preds = as_numpy(store.preds)
+    offsets = as_numpy(store.offsets)
+    args = as_numpy(store.args)
+    roots = as_numpy(store.roots)
+
+    # Linhas com algum argumento aninhado não são fatos simples
+    nested = np.concatenate(([0], np.cumsum(args < 0)))
+    row_simple = nested[offsets[1:]] == nested[offsets[:-1]]
+    row_arity = offsets[1:] - offsets[:-1]
+
+    root_preds = preds[roots]
+    flagged = (root_preds < 0) | ~row_simple[roots]
+
+    # Tipo de cada nome da tabela, como um índice em `real_types`. Nomes que
+    # não são objetos declarados recebem o último índice, reservado para um
+    # tipo que não é compatível com nenhum outro.
+    hierarchy = ctx.symbols.hierarchy
+    type_ids: dict[str, int] = {}
+    real_types: list[int] = []
+    name_types = np.empty(len(names), dtype=np.int64)
+    for i, name in enumerate(names):
+        try:
+            type = ctx[name].type
+        except (KeyError, AttributeError):
+            name_types[i] = -1
+            continue
+        if (id := type_ids.get(type.name)) is None:
+            id = type_ids[type.name] = len(real_types)
+            real_types.append(hierarchy.ancestors_of(type_names(type)))
+        name_types[i] = id
+    name_types[name_types < 0] = len(real_types)
+
+    preds_in_use, inverse = np.unique(root_preds, return_inverse=True)
+    for k, pred in enumerate(preds_in_use):
+        if pred < 0:
+            continue
+        group = inverse == k
+        checker = PredicateChecker.lookup(names[pred], ctx)
+        if checker is None or checker.expected is None or not requirement_ok(checker, ctx):
+            flagged[group] = True
+            continue
+
+        # Apenas as linhas com a aridade correta têm seus tipos comparados
+        rows = roots[group]
+        ok = (row_arity[rows] == checker.arity) & row_simple[rows]
+        for j, expected in enumerate(checker.expected):
+            # Quais tipos reais são subtipos do tipo esperado nesta posição
+            compatible = np.array([bool(real & expected) for real in real_types] + [False])
+            idx = np.flatnonzero(ok)
+            ok[idx] = compatible[name_types[args[offsets[rows[idx]] + j]]]
+        flagged[group] |= ~ok
+
+    return np.flatnonzero(flagged)
+
+
+def requirement_ok(checker: PredicateChecker, ctx: Ctx) -> bool:
+    """
+    Verifica se o requisito exigido pelo predicado foi declarado.
+    """
+    if checker.requirement is None:
+        return True
+    return ctx.symbols.has_requirement(checker.requirement)
+
@@ -0,0 +1,235 @@
+"""
+Cache em disco usado para acelerar execuções repetidas do verificador.
+
+Os dados são gravados com `pickle` em um diretório de cache do usuário
+(``$PDDL_CACHE_DIR``, ``$XDG_CACHE_HOME/pddl`` ou ``~/.cache/pddl``). Cada
+entrada é identificada por uma chave derivada do conteúdo dos arquivos que a
+produziram, de modo que qualquer alteração nesses arquivos invalida a entrada
+automaticamente.
+
+O cache pode ser desabilitado definindo a variável de ambiente
+``PDDL_NO_CACHE`` ou chamando a função `disable`.
+"""
+
+import hashlib
+import os
+import pickle
+import sys
+import warnings
+from functools import cache as memoize
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .ast import Program
+    from .ctx import Ctx
+
+# Incrementado sempre que o formato dos dados gravados mudar.
+CACHE_VERSION = 1
+
+# Tamanho máximo, em bytes, ocupado pelos domínios em cache. Pode ser alterado
+# pela variável de ambiente PDDL_CACHE_MAX_SIZE (veja `domain_cache_max_size`).
+DOMAIN_CACHE_MAX_SIZE = 64 * 1024 * 1024
+
+PACKAGE_DIR = Path(__file__).parent
+_disabled = False
+
+
+def cache_dir() -> Path:
+    """
+    Retorna o diretório onde o cache é armazenado.
+    """
+    if path := os.environ.get("PDDL_CACHE_DIR"):
+        return Path(path)
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "pddl"
+
+
+def is_enabled() -> bool:
+    """
+    Verifica se o cache em disco está habilitado.
+    """
+    return not _disabled and not os.environ.get("PDDL_NO_CACHE")
+
+
+def disable() -> None:
+    """
+    Desabilita o cache em disco para o restante da execução.
+    """
+    global _disabled
+    _disabled = True
+
+
+def make_key(*parts: str | bytes | Path) -> str:
+    """
+    Calcula uma chave de cache a partir de uma sequência de partes.
+
+    Caminhos (`Path`) contribuem com o conteúdo do arquivo, e não com o nome.
+    A versão do formato do cache e a versão do Python sempre fazem parte da
+    chave.
+    """
+    digest = hashlib.sha256()
+    digest.update(f"v{CACHE_VERSION}-py{sys.version_info[0]}.{sys.version_info[1]}".encode())
+    for part in parts:
+        if isinstance(part, Path):
+            part = part.read_bytes()
+        elif isinstance(part, str):
+            part = part.encode("utf8")
+        digest.update(len(part).to_bytes(8, "little"))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+def entry_path(namespace: str, key: str) -> Path:
+    """
+    Caminho do arquivo que armazena a entrada `key` do espaço `namespace`.
+    """
+    return cache_dir() / namespace / f"{key}.pickle"
+
+
+def load(namespace: str, key: str, touch: bool = False) -> Any | None:
+    """
+    Carrega uma entrada do cache.
+
+    Retorna `None` se o cache estiver desabilitado, se a entrada não existir ou
+    se não puder ser lida (arquivo corrompido, versão incompatível, etc). Se
+    `touch` for verdadeiro, atualiza a data de modificação da entrada, que é
+    usada como data do último acesso pela política de remoção de `prune`.
+    """
+    if not is_enabled():
+        return None
+    path = entry_path(namespace, key)
+    try:
+        with path.open("rb") as fd:
+            value = pickle.load(fd)
+    except Exception:
+        return None
+    if touch:
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+    return value
+
+
+def store(namespace: str, key: str, value: Any) -> bool:
+    """
+    Grava uma entrada no cache.
+
+    A escrita é atômica: os dados são gravados em um arquivo temporário que
+    depois é renomeado. Assim, processos concorrentes nunca leem uma entrada
+    pela metade. Falhas de escrita são ignoradas silenciosamente, já que o
+    cache é apenas uma otimização. Retorna `True` se a entrada foi gravada.
+    """
+    if not is_enabled():
+        return False
+    import tempfile
+
+    path = entry_path(namespace, key)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                pickle.dump(value, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+    except Exception:
+        return False
+    return True
+
+
+def prune(namespace: str, max_size: int) -> None:
+    """
+    Remove as entradas acessadas há mais tempo até que o espaço `namespace`
+    ocupe no máximo `max_size` bytes.
+    """
+    entries = []
+    try:
+        for path in (cache_dir() / namespace).glob("*.pickle"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+    except OSError:
+        return
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_size:
+            break
+        try:
+            path.unlink()
+        except OSError:
+            continue
+        total -= size
+
+
+@memoize
+def verifier_version() -> str:
+    """
+    Identifica a versão do verificador pelo conteúdo dos seus módulos.
+
+    Qualquer alteração no código ou na gramática produz uma versão diferente,
+    o que invalida os resultados de análise guardados em cache.
+    """
+    paths = sorted(PACKAGE_DIR.glob("*.py")) + [PACKAGE_DIR / "grammar.lark"]
+    return make_key(*(part for path in paths for part in (path.name, path)))
+
+
+def domain_key(source: str, variant: str = "") -> str:
+    """
+    Chave de cache de um domínio, derivada do código fonte e da versão do
+    verificador.
+
+    `variant` distingue entradas produzidas com opções diferentes, como a
+    implementação da tabela de símbolos.
+    """
+    return make_key(verifier_version(), variant, source)
+
+
+def load_domain(source: str, variant: str = "") -> tuple["Program", "Ctx"] | None:
+    """
+    Carrega a AST e a tabela de símbolos de um domínio já validado.
+
+    Retorna `None` se o domínio não estiver em cache.
+    """
+    return load("domain", domain_key(source, variant), touch=True)
+
+
+def store_domain(source: str, ast: "Program", ctx: "Ctx", variant: str = "") -> None:
+    """
+    Guarda a AST e a tabela de símbolos de um domínio validado com sucesso.
+
+    Depois de gravar a entrada, remove as entradas mais antigas caso o cache de
+    domínios ultrapasse o tamanho máximo.
+    """
+    if store("domain", domain_key(source, variant), (ast, ctx)):
+        prune("domain", domain_cache_max_size())
+
+
+def domain_cache_max_size() -> int:
+    """
+    Tamanho máximo do cache de domínios: ``$PDDL_CACHE_MAX_SIZE`` ou
+    `DOMAIN_CACHE_MAX_SIZE`.
+
+    Um valor que não seja um inteiro não negativo é ignorado com um aviso,
+    já que o cache é apenas uma otimização.
+    """
+    if not (value := os.environ.get("PDDL_CACHE_MAX_SIZE")):
+        return DOMAIN_CACHE_MAX_SIZE
+    try:
+        max_size = int(value)
+    except ValueError:
+        max_size = -1
+    if max_size < 0:
+        warnings.warn(
+            f"PDDL_CACHE_MAX_SIZE inválido ({value!r}), usando {DOMAIN_CACHE_MAX_SIZE} bytes",
+            RuntimeWarning,
+            stacklevel=2,
+        )
+        return DOMAIN_CACHE_MAX_SIZE
+    return max_size
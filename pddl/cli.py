@@ -13,12 +13,17 @@ padrão do Python e não requer instalação de dependências externas.
 """
 
 import argparse
+import os
+import sys
+import time
+from collections import Counter
 
-from lark import Token
-
+from . import cache
 from . import eval as pddl_eval
 from .ctx import Ctx
-from .parser import lex, parse, parse_cst, parse_expr
+from .diagnostics import Diagnostics, TooManyErrors
+from .errors import PDDLError
+from .parser import lex, parse, parse_cst, parse_expr, set_engine
 
 
 def make_argparser():
@@ -28,8 +33,10 @@ def make_argparser():
         help="Arquivo de domínio",
     )
     parser.add_argument(
-        "problem_file",
-        help="Arquivo de problema",
+        "problem_files",
+        nargs="*",
+        metavar="problem_file",
+        help="Arquivos de problema. Use - para ler a lista de caminhos da entrada padrão.",
     )
     parser.add_argument(
         "-t",
@@ -61,75 +68,646 @@ def make_argparser():
         action="store_true",
         help="Mostra o código fonte do arquivo de entrada.",
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Não lê nem grava o cache em disco (parser e domínios).",
+    )
+    parser.add_argument(
+        "--ctx",
+        choices=["chain", "flat"],
+        default="chain",
+        help="Implementação da tabela de símbolos: escopos encadeados (chain) ou tabela plana (flat).",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=["lark", "fast"],
+        default="lark",
+        help="Analisador sintático: Lark (padrão, referência) ou o analisador especializado para PDDL (fast).",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Valida os fatos de :init à medida que são lidos, sem construir a AST completa do problema.",
+    )
+    parser.add_argument(
+        "--parallel",
+        action="store_true",
+        help="Mapeia o arquivo de problema em memória e analisa a seção :init em vários processos.",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        help="Número de processos usados com --parallel (padrão: número de CPUs).",
+    )
+    parser.add_argument(
+        "--max-errors",
+        type=int,
+        metavar="N",
+        help="Continua a verificação após erros e reporta até N erros por arquivo (0: sem limite).",
+    )
+    parser.add_argument(
+        "--format",
+        choices=["text", "json", "ndjson"],
+        default="text",
+        help="Formato da saída: texto (padrão), uma lista JSON ou um objeto JSON por linha, com um registro por arquivo.",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Mede o tempo de cada fase, as chamadas de eval por tipo de nó e as consultas a nomes e imprime um relatório na saída de erro. Use com --no-cache para medir também o domínio.",
+    )
+    parser.add_argument(
+        "--profile-out",
+        metavar="ARQUIVO",
+        help="Grava as estatísticas do cProfile da execução em ARQUIVO (lido com pstats). Implica --profile.",
+    )
+    parser.add_argument(
+        "--client",
+        action="store_true",
+        help="Envia a verificação para um servidor iniciado com 'pddl serve', em vez de executá-la neste processo.",
+    )
+    parser.add_argument(
+        "--server",
+        metavar="ENDEREÇO",
+        help="Endereço do servidor usado com --client: caminho de um socket Unix ou HOST:PORTA (padrão: $PDDL_SERVER ou um socket no diretório de execução do usuário).",
+    )
     return parser
 
 
-def main():
+def make_verify_tree_argparser():
+    parser = argparse.ArgumentParser(
+        prog="pddl verify-tree",
+        description="Verifica todos os pares domain.pddl/problem.pddl de uma árvore de diretórios.",
+    )
+    parser.add_argument(
+        "directory",
+        help="Diretório raiz da busca",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Número de processos usados na verificação (padrão: número de CPUs).",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Não lê nem grava o cache em disco (parser e domínios).",
+    )
+    return parser
+
+
+def make_serve_argparser():
+    from .server import DEFAULT_DOMAINS
+
+    parser = argparse.ArgumentParser(
+        prog="pddl serve",
+        description="Inicia um servidor de verificação que mantém parsers e domínios em memória (veja pddl --client).",
+    )
+    parser.add_argument(
+        "--listen",
+        metavar="ENDEREÇO",
+        help="Caminho de um socket Unix ou HOST:PORTA (padrão: $PDDL_SERVER ou um socket no diretório de execução do usuário).",
+    )
+    parser.add_argument(
+        "--allow-remote",
+        action="store_true",
+        help="Permite ouvir em um HOST:PORTA que não seja de loopback. Em TCP, o servidor só aceita arquivos enviados pelo conteúdo.",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Número de processos usados na verificação (padrão: número de CPUs).",
+    )
+    parser.add_argument(
+        "--domains",
+        type=int,
+        default=DEFAULT_DOMAINS,
+        metavar="N",
+        help=f"Número de domínios mantidos em memória por processo (padrão: {DEFAULT_DOMAINS}).",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=["lark", "fast"],
+        default="lark",
+        help="Analisador sintático usado pelo servidor.",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Não lê nem grava o cache em disco (parser e domínios).",
+    )
+    return parser
+
+
+def make_lsp_argparser():
+    parser = argparse.ArgumentParser(
+        prog="pddl lsp",
+        description="Inicia um servidor de linguagem (LSP) na entrada e saída padrão, para uso por editores.",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=["lark", "fast"],
+        default="lark",
+        help="Analisador sintático usado pelo servidor.",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Não lê nem grava o cache do parser em disco.",
+    )
+    return parser
+
+
+def main(argv: list[str] | None = None):
     """
     Função principal que cria a interface de linha de comando (CLI) para o verificador de PDDL.
     """
+    argv = sys.argv[1:] if argv is None else argv
+
+    # Subcomandos com argumentos próprios
+    if argv and argv[0] == "verify-tree":
+        return verify_tree(argv[1:])
+    if argv and argv[0] == "serve":
+        return serve(argv[1:])
+    if argv and argv[0] == "lsp":
+        return lsp(argv[1:])
+
     parser = make_argparser()
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     # Inicia o repl, se requisitado
     if args.domain_file == "repl":
         return repl()
 
-    # Lê arquivos de domínio e problema
+    if args.client:
+        return client(args, parser)
+
+    if args.no_cache:
+        cache.disable()
+    set_engine(args.engine)
+
+    if args.profile or args.profile_out:
+        return profiled(args, parser)
+    return run(args, parser)
+
+
+def run(args, parser: argparse.ArgumentParser):
+    """
+    Verifica os arquivos passados na linha de comando.
+    """
+    from .profiling import phase
+    from .runner import verify_domain
+
+    problem_files = expand_problem_files(args.problem_files)
+    if not problem_files:
+        parser.error("é necessário informar ao menos um arquivo de problema")
+
+    if args.stream and args.parallel:
+        parser.error("--stream e --parallel não podem ser usados juntos")
+
+    # Saída estruturada, com um registro por arquivo verificado
+    if args.format != "text":
+        if args.ast or args.cst or args.lex or args.show:
+            parser.error(f"--format {args.format} não pode ser usado com -t, -c, -l ou -s")
+        return structured(args, problem_files)
+
+    # Com mais de um problema, cada arquivo é verificado contra o mesmo
+    # domínio e o resultado é reportado individualmente
+    if len(problem_files) > 1 or args.problem_files == ["-"]:
+        return batch(args, problem_files)
+
+    # Lê arquivos de domínio e problema. Nos modos streaming e paralelo, o
+    # problema é lido durante a avaliação
+    [problem_file] = problem_files
+    stream = args.stream and not (args.show or args.ast or args.cst or args.lex)
+    parallel = args.parallel and not (args.show or args.ast or args.cst or args.lex)
+    # Os modos streaming e paralelo só são importados quando usados
+    if stream:
+        from .stream import eval_problem as stream_eval
+    if parallel:
+        from .parallel import eval_problem as parallel_eval
+        from .parallel import parse_problem
     try:
-        with open(args.domain_file, "r") as d:
-            domain_source = d.read()
-        with open(args.problem_file, "r") as p:
-            problem_source = p.read()
-        # source = domain_source + "\n" + problem_source
-        # source = domain_source
+        with phase("read"):
+            with open(args.domain_file, "r") as d:
+                domain_source = d.read()
+            with open(problem_file, "r") as p:
+                problem_source = None if stream or parallel else p.read()
     except FileNotFoundError:
-        print(f"Arquivo {args.domain_file} ou {args.problem_file} não encontrado.")
+        print(f"Arquivo {args.domain_file} ou {problem_file} não encontrado.")
         exit(1)
 
     if args.show:
-        line_len = 60
-        head = f"=== {args.domain_file} ="
-        head += "=" * (line_len - len(head))
-        print_color(head, "blue")
-        print()
-        # print_color(source, "yellow")
-        print_color(domain_source, "yellow")
-        head = f"=== {args.problem_file} ="
-        head += "=" * (line_len - len(head))
-        print_color(head, "blue")
-        print_color(problem_source, "yellow")
-        print_color("=" * line_len, "blue")
-        print()
+        show_sources([(args.domain_file, domain_source), (problem_file, problem_source)])
+
+    if args.max_errors is not None and not args.ast and not args.cst and not args.lex:
+        diagnostics = Diagnostics(args.max_errors)
+        try:
+            ctx = verify_domain(domain_source, args.domain_file, args.ctx == "flat", diagnostics)
+            if not diagnostics:
+                if stream:
+                    with open(problem_file, "r") as fd:
+                        stream_eval(fd, ctx, problem_file, diagnostics)
+                elif parallel:
+                    parallel_eval(problem_file, ctx, problem_file, diagnostics, args.jobs)
+                else:
+                    parse(problem_source).eval(ctx, problem_file, diagnostics)
+        except TooManyErrors:
+            pass
+        except Exception as e:
+            on_error(e, args.pm)
+        if report_errors(diagnostics):
+            exit(1)
 
-    if not args.ast and not args.cst and not args.lex:
+    elif not args.ast and not args.cst and not args.lex:
         try:
-            # pddl_eval(source)
-            from .ast import Predicate, Identifier
-            # pddl_eval(domain_source)
-            _, ctx = pddl_eval(domain_source, 
-                               Ctx({
-                                   "and": Predicate(Identifier("and", 0, 0), None, "strips"), 
-                                   "not": Predicate(Identifier("not", 0, 0), None, "negative-preconditions"),
-                                   "or": Predicate(Identifier("or", 0, 0), None, "disjunctive-preconditions"),
-                                   }), 
-                                   file_path=args.domain_file)
-            pddl_eval(problem_source, ctx, file_path=args.problem_file)
+            ctx = verify_domain(domain_source, args.domain_file, args.ctx == "flat")
+            if stream:
+                with open(problem_file, "r") as fd:
+                    stream_eval(fd, ctx, problem_file)
+            elif parallel:
+                ast = parse_problem(problem_file, args.jobs)
+                pddl_eval(ast, ctx, skip_validation=True, file_path=problem_file)
+            else:
+                pddl_eval(problem_source, ctx, file_path=problem_file)
         except Exception as e:
             on_error(e, args.pm)
 
     else:
-        # debug_source(source, args)
         debug_source(domain_source, args)
         debug_source(problem_source, args)
 
 
+def batch(args, problem_files: list[str]):
+    """
+    Valida o domínio uma única vez e verifica cada problema contra ele.
+
+    Cada problema é avaliado em uma cópia do contexto do domínio, de modo que
+    os objetos declarados em um problema não são vistos pelos demais. Erros em
+    um problema são reportados e a verificação continua com o próximo arquivo.
+    O processo termina com código 1 se algum problema for inválido.
+
+    Com ``--max-errors``, todos os erros de cada problema são reportados
+    (até o limite), e não apenas o primeiro.
+    """
+    from .profiling import phase
+    from .runner import verify_domain
+
+    try:
+        with phase("read"), open(args.domain_file, "r") as d:
+            domain_source = d.read()
+    except FileNotFoundError:
+        print(f"Arquivo {args.domain_file} não encontrado.")
+        exit(1)
+
+    if args.show:
+        show_sources([(args.domain_file, domain_source)])
+
+    debug = args.ast or args.cst or args.lex
+    stream = args.stream and not (args.show or debug)
+    parallel = args.parallel and not (args.show or debug)
+    if stream:
+        from .stream import eval_problem as stream_eval
+    if parallel:
+        from .parallel import eval_problem as parallel_eval
+    if debug:
+        debug_source(domain_source, args)
+    elif args.max_errors is not None:
+        diagnostics = Diagnostics(args.max_errors)
+        try:
+            ctx = verify_domain(domain_source, args.domain_file, args.ctx == "flat", diagnostics)
+        except TooManyErrors:
+            pass
+        except Exception as e:
+            return on_error(e, args.pm)
+        if report_errors(diagnostics):
+            exit(1)
+    else:
+        try:
+            ctx = verify_domain(domain_source, args.domain_file, args.ctx == "flat")
+        except Exception as e:
+            return on_error(e, args.pm)
+
+    failures = 0
+    for problem_file in problem_files:
+        print_color(f"== {problem_file}", "blue")
+        try:
+            with phase("read"), open(problem_file, "r") as p:
+                problem_source = None if stream or parallel else p.read()
+        except OSError as e:
+            print(f"❌ Arquivo {problem_file} não pode ser lido: {e.strerror}")
+            failures += 1
+            continue
+
+        if args.show:
+            show_sources([(problem_file, problem_source)])
+        if debug:
+            debug_source(problem_source, args)
+            continue
+
+        diagnostics = None if args.max_errors is None else Diagnostics(args.max_errors)
+        try:
+            if stream:
+                with open(problem_file, "r") as fd:
+                    stream_eval(fd, ctx.snapshot(), problem_file, diagnostics)
+            elif parallel:
+                parallel_eval(problem_file, ctx.snapshot(), problem_file, diagnostics, args.jobs)
+            else:
+                parse(problem_source).eval(ctx.snapshot(), problem_file, diagnostics)
+        except TooManyErrors:
+            pass
+        except PDDLError as e:
+            if args.pm:
+                on_error(e, args.pm)
+            print(f"❌ {e}")
+            failures += 1
+        except Exception as e:
+            on_error(e, args.pm)
+        if diagnostics is not None and report_errors(diagnostics):
+            failures += 1
+
+    if not debug:
+        total = len(problem_files)
+        print(f"{total - failures}/{total} problemas declarados corretamente.")
+    if failures:
+        exit(1)
+
+
+def profiled(args, parser: argparse.ArgumentParser):
+    """
+    Executa a verificação com um perfil ativo (veja `pddl.profiling`) e
+    imprime o relatório na saída de erro, mesmo se a verificação falhar.
+    """
+    from .profiling import Profiler
+
+    with Profiler(args.profile_out) as profiler:
+        try:
+            return run(args, parser)
+        finally:
+            print(profiler.report(), file=sys.stderr)
+
+
+def structured(args, problem_files: list[str]):
+    """
+    Verifica o domínio e os problemas, escrevendo um registro JSON por arquivo
+    assim que ele é verificado (veja `pddl.report`).
+
+    Se o domínio tiver erros, os problemas não são verificados. O processo
+    termina com código 1 se algum arquivo for inválido.
+    """
+    from .report import ReportWriter, check_domain, check_problem
+
+    failures = 0
+    with ReportWriter(args.format) as writer:
+        report, ctx = check_domain(args.domain_file, args.ctx == "flat", args.max_errors)
+        writer.write(report)
+        if ctx is None:
+            failures += 1
+        else:
+            for problem_file in problem_files:
+                report = check_problem(
+                    problem_file, ctx.snapshot(), args.max_errors, args.stream, args.parallel, args.jobs
+                )
+                writer.write(report)
+                failures += not report.ok
+    if failures:
+        exit(1)
+
+
+def serve(argv: list[str]):
+    """
+    Inicia o servidor de verificação (veja `pddl.server`).
+    """
+    from .server import default_address
+    from .server import serve as run_server
+
+    args = make_serve_argparser().parse_args(argv)
+    try:
+        run_server(
+            args.listen or default_address(),
+            args.jobs,
+            args.engine,
+            args.no_cache,
+            args.domains,
+            args.allow_remote,
+        )
+    except OSError as e:
+        print(f"Não foi possível iniciar o servidor: {e}")
+        exit(1)
+
+
+def lsp(argv: list[str]):
+    """
+    Inicia o servidor de linguagem (veja `pddl.lsp`).
+    """
+    from .lsp import main as run_lsp
+
+    args = make_lsp_argparser().parse_args(argv)
+    if args.no_cache:
+        cache.disable()
+    set_engine(args.engine)
+    exit(run_lsp())
+
+
+def client(args, parser: argparse.ArgumentParser):
+    """
+    Envia a verificação ao servidor e imprime os registros recebidos, no
+    formato de ``--format``.
+
+    O processo termina com código 1 se algum arquivo for inválido.
+    """
+    from .report import FileReport, ReportWriter
+    from .server import default_address, inline, parse_address, request
+
+    problem_files = expand_problem_files(args.problem_files)
+    if not problem_files:
+        parser.error("é necessário informar ao menos um arquivo de problema")
+    if args.ast or args.cst or args.lex or args.show or args.stream or args.parallel:
+        parser.error("--client não pode ser usado com -t, -c, -l, -s, --stream ou --parallel")
+    if args.profile or args.profile_out:
+        parser.error("--client não pode ser usado com --profile")
+
+    address = args.server or default_address()
+    payload = {
+        "domain": args.domain_file,
+        "problems": problem_files,
+        "cwd": os.getcwd(),
+        "ctx": args.ctx,
+        "max_errors": args.max_errors,
+    }
+    if isinstance(parse_address(address), tuple):
+        # Em TCP, o servidor não lê arquivos do disco
+        try:
+            payload["domain"] = inline(args.domain_file)
+            payload["problems"] = [inline(path) for path in problem_files]
+        except OSError as e:
+            print(f"Não foi possível ler {e.filename}: {e.strerror}")
+            exit(1)
+    try:
+        response = request(address, payload)
+    except OSError as e:
+        print(f"Não foi possível conectar ao servidor em {address}: {e.strerror or e}")
+        print("Inicie o servidor com 'pddl serve'.")
+        exit(1)
+    if "error" in response:
+        print(f"❌ {response['error']}")
+        exit(1)
+
+    reports = [FileReport.from_dict(data) for data in response["reports"]]
+    if args.format != "text":
+        with ReportWriter(args.format) as writer:
+            for report in reports:
+                writer.write(report)
+    else:
+        print_reports(reports, len(problem_files), args.max_errors is not None)
+    if not response["ok"]:
+        exit(1)
+
+
+def print_reports(reports: list, total: int, count_errors: bool):
+    """
+    Imprime os registros recebidos do servidor no formato de texto do modo
+    normal, um problema por vez.
+    """
+    from .ast import DOMAIN_OK, PROBLEM_OK
+
+    domain, *problems = reports
+    failures = 0
+    for report in [domain, *problems]:
+        if report.kind == "problem" and total > 1:
+            print_color(f"== {report.file}", "blue")
+        if report.ok:
+            print(DOMAIN_OK if report.kind == "domain" else PROBLEM_OK)
+            continue
+        failures += report.kind == "problem"
+        for error in report.errors:
+            print(f"❌ {format_error(error)}")
+        if count_errors:
+            print(f"{len(report.errors)} erro(s) encontrado(s).")
+    if total > 1 and domain.ok:
+        print(f"{total - failures}/{total} problemas declarados corretamente.")
+
+
+def format_error(error) -> str:
+    """
+    Formata um `pddl.report.ErrorInfo` como a mensagem da exceção original.
+    """
+    from . import errors
+
+    cls = getattr(errors, error.error, None)
+    if isinstance(cls, type) and issubclass(cls, PDDLError):
+        return str(PDDLError(error.message, error.line, error.column, error.file))
+    return f"{error.error}: {error.message}"
+
+
+def report_errors(diagnostics: Diagnostics) -> int:
+    """
+    Imprime os erros coletados com ``--max-errors`` e retorna quantos são.
+    """
+    for error in diagnostics:
+        print(f"❌ {error}")
+    if diagnostics.full:
+        print(f"Verificação interrompida: limite de {diagnostics.max_errors} erros atingido.")
+    elif diagnostics:
+        print(f"{len(diagnostics)} erro(s) encontrado(s).")
+    return len(diagnostics)
+
+
+def expand_problem_files(paths: list[str]) -> list[str]:
+    """
+    Expande a lista de arquivos de problema passada na linha de comando.
+
+    O caminho especial "-" é substituído pelos caminhos lidos da entrada
+    padrão, um por linha.
+    """
+    files = []
+    for path in paths:
+        if path == "-":
+            files.extend(line.strip() for line in sys.stdin if line.strip())
+        else:
+            files.append(path)
+    return files
+
+
+def show_sources(sources: list[tuple[str, str]]):
+    """
+    Mostra o código fonte dos arquivos de entrada.
+    """
+    line_len = 60
+    for i, (path, source) in enumerate(sources):
+        head = f"=== {path} ="
+        head += "=" * (line_len - len(head))
+        print_color(head, "blue")
+        if i == 0:
+            print()
+        print_color(source, "yellow")
+    print_color("=" * line_len, "blue")
+    print()
+
+
+def verify_tree(argv: list[str]):
+    """
+    Verifica, em paralelo, todos os pares de domínio e problema encontrados
+    em uma árvore de diretórios e imprime um relatório agregado.
+
+    Quando o arquivo de problema declara expectativas em comentários
+    (``; expect: ...`` ou ``; expect runtime error: ...``), o resultado é
+    comparado com elas. O processo termina com código 1 se algum par falhar.
+    """
+    from .runner import discover_pairs, verify_pairs
+
+    args = make_verify_tree_argparser().parse_args(argv)
+    if args.no_cache:
+        cache.disable()
+
+    pairs = discover_pairs(args.directory)
+    if not pairs:
+        print(f"Nenhum par {args.directory}/**/domain.pddl + problem.pddl encontrado.")
+        exit(1)
+
+    start = time.perf_counter()
+    failures = []
+    for result in verify_pairs(pairs, args.jobs):
+        path = os.path.dirname(result.problem_file)
+        elapsed = f"{result.elapsed * 1000:.1f}ms"
+        status = "✅" if result.passed else "❌"
+        if result.ok:
+            outcome = "válido"
+        else:
+            outcome = f"{result.error}: {result.message}"
+            if result.line is not None:
+                outcome += f" (linha {result.line}, coluna {result.column})"
+        if result.expected is not None:
+            outcome += ", conforme esperado" if result.expected else ", diferente do esperado"
+        print(f"{status} {path} [{elapsed}] {outcome}")
+        if not result.passed:
+            failures.append(result)
+
+    total = len(pairs)
+    elapsed = time.perf_counter() - start
+    print()
+    print(f"{total - len(failures)}/{total} pares ok em {elapsed:.2f}s ({args.jobs} processos).")
+    errors = Counter(result.error for result in failures)
+    for error, count in sorted(errors.items(), key=lambda item: str(item[0])):
+        print(f"  {error or 'resultado inesperado'}: {count}")
+    if failures:
+        exit(1)
+
+
 def debug_source(source: str, args):
     """
     Mostra informações de depuração sobre o código PDDL passado como argumento.
     """
 
     if args.ast:
+        from lark import Token
+
         ast = parse(source)
         for node in ast.lark_descendents():
             if isinstance(node, Token):
@@ -210,9 +788,24 @@ def on_error(exception: Exception, pm: bool):
 
 
 def print_color(str: str, color: str):
-    try:
-        from rich import print
+    # Só carregamos o rich quando a saída colorida for de fato exibida
+    if use_color():
+        try:
+            from rich import print as rich_print
 
-        print(f"[{color}]{str}[/{color}]")
-    except ImportError:
-        print(str)
+            return rich_print(f"[{color}]{str}[/{color}]")
+        except ImportError:
+            pass
+    print(str)
+
+
+def use_color() -> bool:
+    """
+    Verifica se a saída deve ser colorida.
+
+    Respeita a convenção da variável de ambiente NO_COLOR e desabilita cores
+    quando a saída padrão não é um terminal.
+    """
+    if os.environ.get("NO_COLOR"):
+        return False
+    return sys.stdout.isatty()
@@ -5,6 +5,8 @@ from typing import TYPE_CHECKING, Iterator, Optional, TypeVar
 
 from pddl.ast import dataclass
 
+from .hierarchy import TypeHierarchy
+
 if TYPE_CHECKING:
     from .ast import Value
 
@@ -25,26 +27,142 @@ class _Builtins(dict):
     def __str__(self) -> str:
         return self.__repr__()
 
+    def __reduce__(self):
+        # Preserva a identidade do singleton BUILTINS ao usar pickle
+        return "BUILTINS"
+
 
 BUILTINS = _Builtins()
 
+# Requisitos conhecidos de PDDL. Cada um ocupa um bit na máscara
+# `Symbols.requirements`, de modo que verificar um requisito é uma única
+# operação sobre inteiros.
+REQUIREMENTS = (
+    "strips",
+    "typing",
+    "negative-preconditions",
+    "disjunctive-preconditions",
+    "equality",
+    "existential-preconditions",
+    "universal-preconditions",
+    "quantified-preconditions",
+    "conditional-effects",
+    "fluents",
+    "numeric-fluents",
+    "object-fluents",
+    "adl",
+    "durative-actions",
+    "duration-inequalities",
+    "continuous-effects",
+    "derived-predicates",
+    "timed-initial-literals",
+    "preferences",
+    "constraints",
+    "action-costs",
+)
+REQUIREMENT_BITS = {name: 1 << i for i, name in enumerate(REQUIREMENTS)}
+
+
+def requirement_bit(name: str) -> int:
+    """
+    Bit do requisito na máscara de requisitos, ou 0 se ele não for conhecido.
+    """
+    return REQUIREMENT_BITS.get(name, 0)
+
+
+@dataclass
+class Symbols:
+    """
+    Tabelas de símbolos globais, separadas por tipo de símbolo.
+
+    Tipos e predicados ficam em dicionários próprios e os requisitos em uma
+    máscara de bits. Objetos, constantes e parâmetros continuam nos escopos de
+    `Ctx`, pois são os únicos nomes que dependem do escopo. Assim, um tipo e
+    um objeto com o mesmo nome não colidem, e cada verificação é um acesso
+    direto à tabela correspondente.
+
+    A relação de subtipos declarada em ``:types`` fica em `hierarchy`.
+    """
+
+    requirements: int = 0
+    types: dict[str, "Value"] = field(default_factory=dict)
+    predicates: dict[str, "Value"] = field(default_factory=dict)
+    unknown_requirements: set[str] = field(default_factory=set)
+    # Verificadores compilados a partir dos predicados, criados sob demanda
+    # por `Call.eval` (veja `pddl.ast.PredicateChecker`)
+    checkers: dict[str, "Value"] = field(default_factory=dict)
+    hierarchy: TypeHierarchy = field(default_factory=TypeHierarchy)
+
+    def require(self, name: str) -> None:
+        """
+        Registra um requisito declarado em ``:requirements``.
+        """
+        if bit := requirement_bit(name):
+            self.requirements |= bit
+        else:
+            self.unknown_requirements.add(name)
+
+    def has_requirement(self, name: str) -> bool:
+        """
+        Verifica se um requisito foi declarado.
+        """
+        if bit := requirement_bit(name):
+            return bool(self.requirements & bit)
+        return name in self.unknown_requirements
+
+    def copy(self) -> "Symbols":
+        """
+        Cria uma cópia das tabelas.
+        """
+        return Symbols(
+            self.requirements,
+            self.types.copy(),
+            self.predicates.copy(),
+            self.unknown_requirements.copy(),
+            self.checkers.copy(),
+            self.hierarchy.copy(),
+        )
+
+    def pretty(self) -> str:
+        """
+        Representação das tabelas como string.
+        """
+        requirements = [name for name in REQUIREMENTS if self.has_requirement(name)]
+        requirements.extend(sorted(self.unknown_requirements))
+        return "\n".join([
+            f"requirements: {' '.join(requirements) or '<empty>'}",
+            f"types: {' '.join(sorted(self.types)) or '<empty>'}",
+            f"predicates: {' '.join(sorted(self.predicates)) or '<empty>'}",
+        ])
+
 
 @dataclass
 class Ctx:
     """
-    Contexto de execução. Por enquanto é só um dicionário que armazena nomes
-    das variáveis e seus respectivos valores.
+    Contexto de execução. Os escopos armazenam os nomes de objetos, constantes
+    e parâmetros e seus respectivos valores; requisitos, tipos e predicados
+    ficam nas tabelas de `symbols`, compartilhadas por todos os escopos.
     """
 
     scope: ScopeDict = field(default_factory=dict)
     parent: Optional["Ctx"] = field(default_factory=lambda: Ctx(BUILTINS, None))
+    symbols: Symbols = field(default_factory=Symbols)
 
     @classmethod
-    def from_dict(cls, env: ScopeDict) -> "Ctx":
+    def from_dict(
+        cls, env: ScopeDict, flat: bool = False, symbols: Symbols | None = None
+    ) -> "Ctx":
         """
         Cria um novo contexto a partir de um dicionário.
+
+        Se `flat` for verdadeiro, usa a implementação `FlatCtx`, com busca em
+        tempo constante independente da profundidade dos escopos.
         """
-        return cls(env, Ctx(BUILTINS, None))
+        if symbols is None:
+            symbols = Symbols()
+        if flat:
+            return FlatCtx(env, symbols)
+        return cls(env, Ctx(BUILTINS, None), symbols)
 
     def __getitem__(self, name: str) -> "Value":
         """
@@ -110,7 +228,7 @@ class Ctx:
         lines: list[str] = []
         for i, scope in enumerate(self.iter_scopes(reverse=True)):
             lines.append(pretty_scope(scope, i))
-        return "\n".join(reversed(lines))
+        return "\n".join([*reversed(lines), self.symbols.pretty()])
 
     def pop(self) -> tuple[ScopeDict, "Ctx"]:
         """
@@ -124,7 +242,18 @@ class Ctx:
         """
         Empilha um novo escopo no contexto atual.
         """
-        return Ctx(env, self)
+        return Ctx(env, self, self.symbols)
+
+    def snapshot(self) -> "Ctx":
+        """
+        Cria uma cópia barata do contexto atual.
+
+        Apenas o dicionário do escopo mais interno e as tabelas de símbolos
+        são copiados; os escopos pais são compartilhados. Definições feitas na
+        cópia não afetam o contexto original, o que permite avaliar vários
+        problemas contra o mesmo domínio sem que um interfira no outro.
+        """
+        return Ctx(self.scope.copy(), self.parent, self.symbols.copy())
 
     def is_global(self) -> bool:
         """
@@ -135,6 +264,117 @@ class Ctx:
         return self.parent.parent is None
 
 
+class FlatCtx(Ctx):
+    """
+    Implementação alternativa de `Ctx` com uma tabela de símbolos plana.
+
+    Em vez de uma lista encadeada de escopos, guarda um único dicionário que
+    associa cada nome à pilha de valores visíveis (o último é o mais interno),
+    além de uma lista com os nomes definidos em cada escopo. Assim, consultas
+    custam O(1), independente da profundidade dos escopos, e `push` não aloca
+    um novo contexto.
+
+    A interface é a mesma de `Ctx`, com uma diferença: `push` e `pop`
+    modificam o próprio contexto e retornam ele mesmo. Por isso, todo `push`
+    deve ser seguido do `pop` correspondente.
+    """
+
+    def __init__(self, scope: ScopeDict | None = None, symbols: Symbols | None = None):
+        self.symbols = Symbols() if symbols is None else symbols
+        self.bindings: dict[str, list["Value"]] = {}
+        self.scopes: list[ScopeDict] = []
+        self._enter(BUILTINS)
+        self._enter({} if scope is None else scope)
+
+    def _enter(self, env: ScopeDict) -> None:
+        self.scopes.append(env)
+        bindings = self.bindings
+        for name, value in env.items():
+            if name in bindings:
+                bindings[name].append(value)
+            else:
+                bindings[name] = [value]
+
+    @property
+    def scope(self) -> ScopeDict:  # type: ignore[override]
+        return self.scopes[-1]
+
+    @property
+    def parent(self) -> None:  # type: ignore[override]
+        return None
+
+    def __getitem__(self, name: str) -> "Value":
+        try:
+            return self.bindings[name][-1]
+        except KeyError:
+            raise KeyError(f"Variable '{name}' not found in context.") from None
+
+    def __setitem__(self, name: str, value: "Value") -> None:
+        stack = self.bindings.get(name)
+        if stack is None:
+            raise KeyError(f"Variable '{name}' not found in context.")
+        stack[-1] = value
+        for scope in reversed(self.scopes):
+            if name in scope:
+                scope[name] = value
+                break
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.bindings
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, FlatCtx):
+            return NotImplemented
+        return self.scopes == other.scopes and self.symbols == other.symbols
+
+    def __repr__(self) -> str:
+        return f"FlatCtx(scopes={self.scopes!r}, symbols={self.symbols!r})"
+
+    def var_def(self, name: str, value: "Value") -> None:
+        scope = self.scopes[-1]
+        if name in scope:
+            if not self.is_global():
+                raise KeyError(f"Variable '{name}' already defined in the current scope.")
+            self.bindings[name][-1] = value
+        elif name in self.bindings:
+            self.bindings[name].append(value)
+        else:
+            self.bindings[name] = [value]
+        scope[name] = value
+
+    def to_dict(self) -> ScopeDict:
+        return {name: stack[-1] for name, stack in self.bindings.items()}
+
+    def iter_scopes(self, reverse: bool = False) -> Iterator[ScopeDict]:
+        yield from (self.scopes if reverse else reversed(self.scopes))
+
+    def pop(self) -> tuple[ScopeDict, "Ctx"]:
+        if len(self.scopes) == 1:
+            raise RuntimeError("Cannot pop the global scope.")
+        scope = self.scopes.pop()
+        bindings = self.bindings
+        for name in scope:
+            stack = bindings[name]
+            stack.pop()
+            if not stack:
+                del bindings[name]
+        return scope, self
+
+    def push(self, env: ScopeDict) -> "Ctx":
+        self._enter(env)
+        return self
+
+    def snapshot(self) -> "Ctx":
+        new = FlatCtx.__new__(FlatCtx)
+        new.symbols = self.symbols.copy()
+        new.scopes = [*self.scopes[:-1], self.scopes[-1].copy()]
+        new.bindings = {name: stack.copy() for name, stack in self.bindings.items()}
+        return new
+
+    def is_global(self) -> bool:
+        return len(self.scopes) == 2
+
+
 def pretty_scope(env: ScopeDict, index: int) -> str:
     """
     Representa um escopo como string.
@@ -0,0 +1,94 @@
+"""
+Coleta de vários erros em uma única verificação.
+
+Por padrão, a verificação para no primeiro `PDDLError`. Passando um objeto
+`Diagnostics` para `Program.eval` (ou usando `collect_errors`), cada
+declaração de nível superior (requisito, tipo, predicado, ação, objeto, fato
+de ``:init``, etc.) é verificada de forma independente: os erros são
+acumulados e a verificação continua até o fim do arquivo ou até atingir o
+limite de erros.
+"""
+
+from typing import TYPE_CHECKING, Iterator
+
+from .ctx import Ctx
+from .errors import PDDLError
+
+if TYPE_CHECKING:
+    from .node import Node
+
+
+class TooManyErrors(Exception):
+    """
+    Levantada quando o limite de erros de um `Diagnostics` é atingido.
+    """
+
+    def __init__(self, diagnostics: "Diagnostics"):
+        super().__init__(f"limite de {diagnostics.max_errors} erros atingido")
+        self.diagnostics = diagnostics
+
+
+class Diagnostics:
+    """
+    Acumula os erros encontrados durante uma verificação.
+
+    Se `max_errors` for dado (e maior que zero), `add` levanta `TooManyErrors`
+    assim que esse número de erros for atingido.
+    """
+
+    def __init__(self, max_errors: int | None = None):
+        self.max_errors = max_errors or None
+        self.errors: list[PDDLError] = []
+
+    def add(self, error: PDDLError, file_path: str | None = None) -> None:
+        """
+        Registra um erro, associando-o ao arquivo `file_path` se ele ainda
+        não indicar um arquivo.
+        """
+        if error.file_path is None and file_path is not None:
+            error = error.__class__(
+                msg=error.msg, line=error.line, column=error.column, file_path=file_path
+            )
+        self.errors.append(error)
+        if self.full:
+            raise TooManyErrors(self)
+
+    @property
+    def full(self) -> bool:
+        """
+        Verdadeiro se o limite de erros foi atingido.
+        """
+        return self.max_errors is not None and len(self.errors) >= self.max_errors
+
+    def __len__(self) -> int:
+        return len(self.errors)
+
+    def __iter__(self) -> Iterator[PDDLError]:
+        return iter(self.errors)
+
+    def __repr__(self) -> str:
+        return f"Diagnostics(max_errors={self.max_errors!r}, errors={self.errors!r})"
+
+
+def collect_errors(
+    src: "str | Node",
+    ctx: Ctx,
+    file_path: str | None = None,
+    max_errors: int | None = None,
+) -> list[PDDLError]:
+    """
+    Verifica um domínio ou problema e retorna todos os erros encontrados, até
+    o limite `max_errors`.
+
+    Declarações são avaliadas em `ctx` como em `Program.eval`. Erros de
+    sintaxe não são recuperáveis e são propagados normalmente.
+    """
+    from .parser import parse
+
+    ast = parse(src) if isinstance(src, str) else src
+    diagnostics = Diagnostics(max_errors)
+    try:
+        ast.eval(ctx, file_path, diagnostics)
+    except TooManyErrors:
+        pass
+    return diagnostics.errors
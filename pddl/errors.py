@@ -45,5 +45,11 @@ class PredicateArityError(PDDLError):
 class UndeclaredNameError(PDDLError):
     """Exceção levantada quando um predicado ou objeto não foi declarado."""
 
+    def __init__(self, msg, line, column, file_path=None):
+        super().__init__(msg, line, column, file_path)
+
+class ParseError(PDDLError):
+    """Exceção levantada para um erro de sintaxe, com a posição no arquivo."""
+
     def __init__(self, msg, line, column, file_path=None):
         super().__init__(msg, line, column, file_path)
\ No newline at end of file
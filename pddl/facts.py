@@ -0,0 +1,331 @@
+"""
+Armazenamento compacto para os fatos das seções ``:init`` e ``:goal``.
+
+Em problemas grandes, a maior parte da memória é ocupada por fatos do tipo
+``(connected loc-1 loc-2)``. Representar cada fato como um nó `Call` com um
+nó `Identifier` por argumento custa centenas de bytes por fato. A classe
+`FactStore` guarda os mesmos dados em arrays de inteiros, com os nomes
+internados em uma tabela, e materializa os nós `Call` apenas quando alguém os
+acessa.
+"""
+
+import sys
+import weakref
+from array import array
+from dataclasses import fields
+from typing import Iterable, Iterator, overload
+
+from .ast import Call, Identifier
+from .node import Node, NodeSequence
+
+
+class NameTable:
+    """
+    Tabela de nomes internados: associa cada nome distinto a um inteiro.
+    """
+
+    __slots__ = ("names", "ids")
+
+    def __init__(self, names: Iterable[str] = ()):
+        self.names: list[str] = []
+        self.ids: dict[str, int] = {}
+        for name in names:
+            self.intern(name)
+
+    def intern(self, name: str) -> int:
+        """
+        Retorna o identificador do nome, registrando-o se necessário.
+        """
+        try:
+            return self.ids[name]
+        except KeyError:
+            # Compartilha o texto com os identificadores, que também são
+            # internados (veja `pddl.ast.Identifier`)
+            name = sys.intern(name)
+            id = self.ids[name] = len(self.names)
+            self.names.append(name)
+            return id
+
+    def __getitem__(self, id: int) -> str:
+        return self.names[id]
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __getstate__(self):
+        return self.names
+
+    def __setstate__(self, names):
+        self.names = names
+        self.ids = {name: i for i, name in enumerate(names)}
+
+
+class FactStore(NodeSequence):
+    """
+    Sequência de fatos armazenada em arrays.
+
+    Cada fato ocupa uma linha. Uma linha guarda o identificador do nome do
+    predicado, a posição desse nome no código fonte e um intervalo do array de
+    argumentos (no formato CSR: os argumentos da linha `i` ficam entre
+    `offsets[i]` e `offsets[i + 1]`). Um argumento não negativo é o
+    identificador de um nome; um argumento negativo `-(j + 1)` aponta para a
+    linha `j`, o que permite representar fatos aninhados como
+    ``(not (at a b))`` e ``(and ...)`` sem criar objetos.
+
+    Nós que não são chamadas simples de predicados (como ``forall`` e
+    ``when``) são guardados como estão, em linhas com predicado -1.
+
+    A sequência contém apenas as linhas de nível superior (`roots`). Ao
+    acessar um item, o nó `Call` correspondente é reconstruído.
+    """
+
+    __slots__ = (
+        "table",
+        "preds",
+        "lines",
+        "columns",
+        "offsets",
+        "args",
+        "arg_lines",
+        "arg_columns",
+        "roots",
+        "opaque",
+        "_cache",
+    )
+
+    def __init__(self, table: NameTable | None = None):
+        self.table = NameTable() if table is None else table
+        self.preds = array("i")
+        self.lines = array("i")
+        self.columns = array("i")
+        self.offsets = array("i", [0])
+        self.args = array("i")
+        self.arg_lines = array("i")
+        self.arg_columns = array("i")
+        self.roots = array("i")
+        self.opaque: dict[int, Node] = {}
+        self._cache: weakref.WeakValueDictionary[int, Node] = weakref.WeakValueDictionary()
+
+    @classmethod
+    def from_nodes(cls, nodes: Iterable[Node], table: NameTable | None = None) -> "FactStore":
+        """
+        Cria um armazenamento a partir de uma sequência de nós.
+        """
+        store = cls(table)
+        store.extend(nodes)
+        return store
+
+    #
+    # Construção
+    #
+    def append(self, node: Node) -> None:
+        """
+        Adiciona um fato ao final da sequência.
+        """
+        self.roots.append(self._add_row(node))
+
+    def extend(self, nodes: Iterable[Node]) -> None:
+        """
+        Adiciona vários fatos ao final da sequência.
+        """
+        for node in nodes:
+            self.append(node)
+
+    def add_fact(
+        self,
+        name: str,
+        line: int,
+        column: int,
+        args: Iterable[tuple[str, int, int]],
+    ) -> None:
+        """
+        Adiciona um fato simples, ``(name arg1 arg2 ...)``, sem criar nós.
+
+        Cada argumento é uma tupla (nome, linha, coluna).
+        """
+        intern = self.table.intern
+        for arg, arg_line, arg_column in args:
+            self.args.append(intern(arg))
+            self.arg_lines.append(arg_line)
+            self.arg_columns.append(arg_column)
+        self.roots.append(self._new_row(intern(name), line, column))
+
+    def merge(self, other: "FactStore") -> None:
+        """
+        Adiciona ao final da sequência todos os fatos de outro armazenamento,
+        sem materializar nós.
+
+        Os nomes de `other` são internados na tabela deste armazenamento e as
+        referências entre linhas são deslocadas.
+        """
+        remap = [self.table.intern(name) for name in other.table.names]
+        base = len(self.preds)
+        arg_base = len(self.args)
+        self.preds.extend(array("i", [remap[p] if p >= 0 else p for p in other.preds]))
+        self.lines.extend(other.lines)
+        self.columns.extend(other.columns)
+        self.offsets.extend(array("i", [offset + arg_base for offset in other.offsets[1:]]))
+        # Um argumento negativo -(j + 1) aponta para a linha j de `other`
+        self.args.extend(array("i", [remap[a] if a >= 0 else a - base for a in other.args]))
+        self.arg_lines.extend(other.arg_lines)
+        self.arg_columns.extend(other.arg_columns)
+        self.roots.extend(array("i", [row + base for row in other.roots]))
+        for row, node in other.opaque.items():
+            self.opaque[row + base] = node
+
+    def shift_lines(self, delta: int) -> None:
+        """
+        Soma `delta` à linha de todos os nomes, como quando os fatos foram
+        analisados a partir de um trecho de um arquivo maior.
+        """
+        # Linhas 0 marcam linhas opacas e argumentos aninhados
+        self.lines = array("i", [line + delta if line else 0 for line in self.lines])
+        self.arg_lines = array("i", [line + delta if line else 0 for line in self.arg_lines])
+        shift_identifiers(list(self.opaque.values()), delta)
+        self._cache.clear()
+
+    def _add_row(self, node: Node) -> int:
+        if type(node) is not Call or not isinstance(node.name, Identifier):
+            return self._opaque_row(node)
+
+        # Os argumentos aninhados precisam ser adicionados antes, pois os
+        # argumentos de uma linha ocupam um intervalo contíguo do array
+        args: list[int | Identifier] = []
+        for arg in node.args:
+            if type(arg) is Identifier:
+                args.append(arg)
+            elif isinstance(arg, Node):
+                args.append(-(self._add_row(arg) + 1))
+            else:
+                return self._opaque_row(node)
+
+        intern = self.table.intern
+        for arg in args:
+            if isinstance(arg, Identifier):
+                self.args.append(intern(arg.name))
+                self.arg_lines.append(arg.line)
+                self.arg_columns.append(arg.column)
+            else:
+                self.args.append(arg)
+                self.arg_lines.append(0)
+                self.arg_columns.append(0)
+        name = node.name
+        return self._new_row(intern(name.name), name.line, name.column)
+
+    def _new_row(self, pred: int, line: int, column: int) -> int:
+        row = len(self.preds)
+        self.preds.append(pred)
+        self.lines.append(line)
+        self.columns.append(column)
+        self.offsets.append(len(self.args))
+        return row
+
+    def _opaque_row(self, node: Node) -> int:
+        row = self._new_row(-1, 0, 0)
+        self.opaque[row] = node
+        return row
+
+    #
+    # Acesso
+    #
+    def node(self, row: int) -> Node:
+        """
+        Materializa o nó correspondente a uma linha.
+        """
+        pred = self.preds[row]
+        if pred < 0:
+            return self.opaque[row]
+        names = self.table.names
+        args: list[Node] = []
+        for i in range(self.offsets[row], self.offsets[row + 1]):
+            arg = self.args[i]
+            if arg >= 0:
+                args.append(Identifier(names[arg], self.arg_lines[i], self.arg_columns[i]))
+            else:
+                args.append(self.node(-arg - 1))
+        return Call(Identifier(names[pred], self.lines[row], self.columns[row]), args)
+
+    def is_simple(self, row: int) -> bool:
+        """
+        Verifica se a linha é um fato simples, cujos argumentos são todos nomes.
+        """
+        if self.preds[row] < 0:
+            return False
+        start, end = self.offsets[row], self.offsets[row + 1]
+        return all(arg >= 0 for arg in self.args[start:end])
+
+    def __len__(self) -> int:
+        return len(self.roots)
+
+    @overload
+    def __getitem__(self, index: int) -> Node: ...
+    @overload
+    def __getitem__(self, index: slice) -> list[Node]: ...
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        row = self.roots[index]
+        # Mantém a identidade dos nós enquanto houver referências a eles, de
+        # modo que cursores e `Node.replace_child` funcionem normalmente
+        try:
+            return self._cache[row]
+        except KeyError:
+            node = self._cache[row] = self.node(row)
+            return node
+
+    def __setitem__(self, index: int, node: Node) -> None:
+        row = self.roots[index] = self._add_row(node)
+        # O nó atribuído passa a ser o nó retornado por `__getitem__`
+        self._cache[row] = node
+
+    def __iter__(self) -> Iterator[Node]:
+        for i in range(len(self.roots)):
+            yield self[i]
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (FactStore, list, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"FactStore({list(self)!r})"
+
+    def __getstate__(self):
+        return {name: getattr(self, name) for name in self.__slots__ if name != "_cache"}
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+        self._cache = weakref.WeakValueDictionary()
+
+    def nbytes(self) -> int:
+        """
+        Número aproximado de bytes ocupados pelos arrays.
+        """
+        arrays = (
+            self.preds, self.lines, self.columns, self.offsets, self.args,
+            self.arg_lines, self.arg_columns, self.roots,
+        )
+        return sum(a.itemsize * len(a) for a in arrays)
+
+
+def shift_identifiers(tree, delta: int, seen: set[int] | None = None) -> None:
+    """
+    Soma `delta` à linha de todos os identificadores de uma árvore.
+
+    Percorre também listas aninhadas nos campos dos nós (como os argumentos
+    de chamadas malformadas) e visita cada objeto uma única vez, pois um tipo
+    pode ser compartilhado por vários objetos.
+    """
+    seen = set() if seen is None else seen
+    if id(tree) in seen:
+        return
+    seen.add(id(tree))
+    if isinstance(tree, Identifier):
+        tree.line += delta
+    elif isinstance(tree, (list, tuple, NodeSequence)):
+        for item in tree:
+            shift_identifiers(item, delta, seen)
+    elif isinstance(tree, Node):
+        for field in fields(tree):
+            shift_identifiers(getattr(tree, field.name), delta, seen)
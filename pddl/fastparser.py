@@ -0,0 +1,444 @@
+"""
+Analisador sintático especializado para PDDL (``--engine fast``).
+
+PDDL é uma linguagem de S-expressões simples. Em vez de passar pelo lexer e
+pelo parser LALR genéricos do Lark e pelos callbacks do `PDDLTransformer`,
+este módulo divide o código em tokens com uma única expressão regular e
+constrói os nós de `pddl.ast` diretamente, por descida recursiva.
+
+O Lark continua sendo o analisador de referência: o resultado deve ser
+idêntico ao do parser "ast" de `pddl.parser`, incluindo as particularidades
+da gramática e do transformer (por exemplo, ``(p)`` sem argumentos produz um
+`Identifier`, e não um `Call`). Sempre que o código usa uma construção que
+este analisador não reproduz com segurança, inclusive qualquer erro de
+sintaxe, a análise é refeita com o Lark, de modo que as mensagens de erro
+também são as mesmas. Veja ``benchmarks/parser_diff.py``.
+"""
+
+import re
+from array import array
+
+from .ast import (
+    COLUMN_BITS,
+    COLUMN_MASK,
+    Action,
+    Call,
+    Constant,
+    Domain,
+    Either,
+    Forall,
+    Identifier,
+    Object,
+    Predicate,
+    Problem,
+    Program,
+    Requirement,
+    Type,
+    When,
+)
+from .facts import FactStore
+
+# Quebras de linha, espaços, comentários, parênteses, "?", palavras-chave
+# (":init"), identificadores e, por último, qualquer outro caractere
+TOKEN_RE = re.compile(r"\n|[ \t\r\f\v]+|;[^\n]*|[()?]|:?[a-z0-9_-]+|.")
+WORD_CHARS = frozenset("abcdefghijklmnopqrstuvwxyz0123456789_-")
+SKIP_CHARS = frozenset(" \t\r\f\v;")
+
+# Texto do token sentinela no fim do código
+EOF = ""
+
+
+class Unsupported(Exception):
+    """
+    Levantada quando o código não pode ser analisado por este módulo e deve
+    ser analisado pelo Lark.
+    """
+
+
+def tokenize(src: str) -> tuple[list[str], array]:
+    """
+    Divide o código em tokens, descartando espaços e comentários.
+
+    Retorna o texto dos tokens e, em um array paralelo, a posição de cada um,
+    codificada como em `pddl.ast.pack_position`. A lista termina com o token
+    `EOF`.
+    """
+    texts: list[str] = []
+    positions = array("q")
+    append = texts.append
+    append_position = positions.append
+    line = 1 << COLUMN_BITS  # linha já deslocada para os bits altos
+    line_start = -1  # posição anterior ao início da linha (colunas começam em 1)
+    for m in TOKEN_RE.finditer(src):
+        text = m.group()
+        first = text[0]
+        if first == "\n":
+            line += 1 << COLUMN_BITS
+            line_start = m.start()
+        elif first in SKIP_CHARS:
+            continue
+        elif first in WORD_CHARS or first in "()?" or (first == ":" and len(text) > 1):
+            append(text)
+            append_position(line | (m.start() - line_start))
+        else:
+            raise Unsupported(text)
+    append(EOF)
+    append_position(0)
+    return texts, positions
+
+
+def parse_fast(src: str, start: str = "start"):
+    """
+    Analisa `src` a partir da regra `start` da gramática, como o parser "ast"
+    do Lark. Construções não suportadas são analisadas pelo Lark.
+    """
+    try:
+        return FastParser(src).parse(start)
+    except Unsupported:
+        pass
+    # Fora do bloco ``except``, para que o erro do Lark não seja encadeado
+    from .parser import get_parser
+
+    return get_parser("ast").parse(src, start=start)
+
+
+class FastParser:
+    """
+    Analisador por descida recursiva sobre a lista de tokens de `tokenize`.
+
+    Cada método corresponde a uma regra de ``grammar.lark`` e retorna o mesmo
+    valor que o método correspondente do `PDDLTransformer`.
+    """
+
+    def __init__(self, src: str):
+        self.texts, self.positions = tokenize(src)
+        self.pos = 0
+
+    def parse(self, start: str = "start"):
+        match start:
+            case "start":
+                result = self.program()
+            case "define_problem":
+                result = self.header("problem")
+            case "domain_ref":
+                result = self.header(":domain")
+            case "objects":
+                result = self.objects()
+            case "call":
+                result = self.call()
+            case "init":
+                result = self.facts(":init")
+            case "goal":
+                result = self.facts(":goal")
+            case "define_domain":
+                result = self.header("domain")
+            case "requirements":
+                result = self.requirements()
+            case "types":
+                result = self.types()
+            case "constants_def":
+                result = self.constants()
+            case "predicate_def":
+                result = self.predicate()
+            case "action":
+                result = self.action()
+            case _:
+                raise Unsupported(start)
+        if self.pos != len(self.texts) - 1:
+            raise Unsupported("conteúdo após o fim")
+        return result
+
+    #
+    # Tokens
+    #
+
+    def expect(self, text: str) -> None:
+        if self.texts[self.pos] != text:
+            raise Unsupported(text)
+        self.pos += 1
+
+    def peek(self, offset: int = 0) -> str:
+        return self.texts[min(self.pos + offset, len(self.texts) - 1)]
+
+    def name(self) -> Identifier:
+        text = self.texts[self.pos]
+        # Um "-" isolado só é um identificador nos estados do Lark em que o
+        # terminal "-" não é aceito; na dúvida, deixamos para o Lark
+        if not text or text[0] not in WORD_CHARS or text == "-":
+            raise Unsupported(text)
+        self.pos += 1
+        return Identifier.at(text, self.positions[self.pos - 1])
+
+    #
+    # Programa
+    #
+
+    def program(self) -> Program:
+        self.expect("(")
+        self.expect("define")
+        if self.peek(1) == "domain":
+            return Program(self.domain())
+        return Program(self.problem())
+
+    def header(self, keyword: str) -> Identifier:
+        self.expect("(")
+        self.expect(keyword)
+        name = self.name()
+        self.expect(")")
+        return name
+
+    def domain(self) -> Domain:
+        define = self.header("domain")
+        requirements = self.requirements()
+        types = self.types()
+        constants = self.constants() if self.peek(1) == ":constants" else []
+        predicates = self.predicates()
+        actions = []
+        while self.peek() == "(":
+            actions.append(self.action())
+        self.expect(")")
+        return Domain(define, requirements, types, constants, predicates, actions)
+
+    def problem(self) -> Problem:
+        define_problem = self.header("problem")
+        domain_ref = self.header(":domain")
+        objects = self.objects()
+        init = self.facts(":init")
+        goal = self.facts(":goal")
+        self.expect(")")
+        return Problem(define_problem, domain_ref, objects, init, goal)
+
+    #
+    # Seções do domínio
+    #
+
+    def requirements(self) -> list[Requirement]:
+        self.expect("(")
+        self.expect(":requirements")
+        requirements = []
+        while True:
+            text = self.texts[self.pos]
+            if text == ")":
+                break
+            # O Lark divide ":strips" em ":" e no identificador "strips"
+            if text[:1] != ":":
+                raise Unsupported(text)
+            requirements.append(Requirement(Identifier.at(text[1:], self.positions[self.pos] + 1)))
+            self.pos += 1
+        self.pos += 1
+        return requirements
+
+    def types(self) -> list[Type]:
+        self.expect("(")
+        self.expect(":types")
+        types: list[Type] = []
+        pending: list[Type] = []
+        while True:
+            text = self.peek()
+            if text == ")":
+                break
+            if text == "-":
+                self.pos += 1
+                parent = self.type_ref()
+                for type in pending:
+                    type.parent = parent
+                pending = []
+            else:
+                type = Type(self.name())
+                types.append(type)
+                pending.append(type)
+        self.pos += 1
+        return types
+
+    def type_ref(self) -> Identifier | Either:
+        if self.peek() != "(":
+            return self.name()
+        self.pos += 1
+        text = self.texts[self.pos]
+        if text != "either":
+            raise Unsupported(text)
+        either = Identifier.at(text, self.positions[self.pos])
+        self.pos += 1
+        types = [self.name()]
+        while self.peek() != ")":
+            types.append(self.name())
+        self.pos += 1
+        return Either(either, types)
+
+    def constants(self) -> list[Constant]:
+        self.expect("(")
+        self.expect(":constants")
+        constants = self.typed_list(Constant, require_type=True)
+        self.expect(")")
+        return constants
+
+    def predicates(self) -> list[Predicate]:
+        self.expect("(")
+        self.expect(":predicates")
+        predicates = []
+        while self.peek() == "(":
+            predicates.append(self.predicate())
+        self.expect(")")
+        return predicates
+
+    def predicate(self) -> Predicate:
+        self.expect("(")
+        name = self.name()
+        args = self.typed_list(Object, require_type=True)
+        self.expect(")")
+        return Predicate(name, args)
+
+    def action(self) -> Action:
+        self.expect("(")
+        self.expect(":action")
+        name = self.name()
+        self.expect(":parameters")
+        self.expect("(")
+        parameters = self.typed_list(Object)
+        self.expect(")")
+        self.expect(":precondition")
+        precondition = []
+        while self.peek() == "(":
+            precondition.append(self.call())
+        self.expect(":effect")
+        effect = []
+        while self.peek() == "(":
+            effect.append(self.call())
+        self.expect(")")
+        return Action(name, parameters, precondition, effect)
+
+    #
+    # Seções do problema
+    #
+
+    def objects(self) -> list:
+        self.expect("(")
+        self.expect(":objects")
+        objects = self.typed_list(Object)
+        self.expect(")")
+        return objects
+
+    def facts(self, keyword: str) -> FactStore:
+        self.expect("(")
+        self.expect(keyword)
+        store = FactStore()
+        while self.peek() == "(":
+            if not self.simple_fact(store):
+                store.append(self.call())
+        self.expect(")")
+        return store
+
+    def simple_fact(self, store: FactStore) -> bool:
+        """
+        Adiciona ao armazenamento um fato ``(nome arg1 arg2 ...)`` cujos
+        argumentos são todos nomes, sem criar nós. Retorna falso, sem consumir
+        tokens, para qualquer outra forma, que é analisada por `call`.
+        """
+        texts = self.texts
+        positions = self.positions
+        start = self.pos + 1
+        name = texts[start]
+        if not name or name[0] not in WORD_CHARS or name in ("-", "forall", "when"):
+            return False
+        end = start + 1
+        while (text := texts[end]) and text[0] in WORD_CHARS and text != "-":
+            end += 1
+        # Sem argumentos, ``(p)`` produz um `Identifier`, e não um `Call`
+        if text != ")" or end == start + 1:
+            return False
+        store.add_fact(
+            name,
+            positions[start] >> COLUMN_BITS,
+            positions[start] & COLUMN_MASK,
+            ((texts[i], positions[i] >> COLUMN_BITS, positions[i] & COLUMN_MASK) for i in range(start + 1, end)),
+        )
+        self.pos = end + 1
+        return True
+
+    #
+    # Argumentos e chamadas
+    #
+
+    def arguments(self, cls: type = Object) -> list:
+        """
+        Lê uma sequência ``argument*`` até o ")" (sem consumi-lo).
+
+        Como no Lark, cada item é uma lista de nomes sem tipo, uma lista de
+        objetos de `cls` (nomes seguidos de ``- tipo``) ou uma chamada.
+        """
+        items: list = []
+        run: list[Identifier] = []
+        texts = self.texts
+        while True:
+            text = texts[self.pos]
+            if text == ")":
+                break
+            first = text[:1]
+            if text == "-":
+                self.pos += 1
+                type = self.type_ref()
+                items.append([cls(name, type) for name in run])
+                run = []
+            elif first == "(":
+                if run:
+                    items.append(run)
+                    run = []
+                items.append(self.call())
+            elif first == "?":
+                self.pos += 1
+                run.append(self.name())
+            elif first in WORD_CHARS:
+                run.append(Identifier.at(text, self.positions[self.pos]))
+                self.pos += 1
+            else:
+                raise Unsupported(text)
+        if run:
+            items.append(run)
+        return items
+
+    def typed_list(self, cls: type, require_type: bool = False) -> list:
+        """
+        Lê uma lista de nomes com tipos, como em ``:objects`` e
+        ``:parameters``, e a achata em uma única lista.
+
+        Nomes sem tipo no fim da lista são mantidos como `Identifier`, como
+        faz o transformer. Se `require_type` for verdadeiro, a gramática exige
+        um tipo e nomes sem tipo são deixados para o Lark.
+        """
+        result = []
+        for item in self.arguments(cls):
+            if not isinstance(item, list):
+                raise Unsupported("chamada em lista de objetos")
+            if require_type and item and type(item[0]) is Identifier:
+                raise Unsupported("nome sem tipo")
+            result.extend(item)
+        return result
+
+    def call(self):
+        self.expect("(")
+        text = self.texts[self.pos]
+        if text == "forall":
+            self.pos += 1
+            self.expect("(")
+            items = self.arguments()
+            self.expect(")")
+            if len(items) != 1:
+                raise Unsupported("forall")
+            call = self.call()
+            self.expect(")")
+            return Forall(items[0], call)
+        if text == "when":
+            when = Identifier.at(text, self.positions[self.pos])
+            self.pos += 1
+            condition = self.call()
+            effect = self.call()
+            self.expect(")")
+            return When(when, condition, effect)
+
+        name = self.name()
+        items = self.arguments()
+        self.expect(")")
+        # ``?call`` com um único filho é substituído por ele
+        if not items:
+            return name
+        return Call(name, items[0] if isinstance(items[0], list) else items)
@@ -0,0 +1,136 @@
+"""
+Hierarquia de tipos declarada na seção ``:types`` de um domínio.
+
+Cada tipo recebe um identificador inteiro. Para cada tipo guardamos o
+conjunto de seus ancestrais (incluindo ele mesmo) como um conjunto de bits
+em um inteiro do Python: o bit `i` está ligado se o tipo `i` é um ancestral.
+Com o fecho transitivo pré-calculado, verificar se um tipo é subtipo de
+outro é uma única operação `&` entre inteiros.
+
+Tipos ``(either a b)`` são representados pela união dos bits de `a` e `b`.
+"""
+
+from typing import Iterable
+
+# Tipo raiz de PDDL, do qual todos os outros descendem
+OBJECT = "object"
+
+
+class TypeHierarchy:
+    """
+    Hierarquia de tipos com fecho transitivo pré-calculado.
+    """
+
+    __slots__ = ("ids", "names", "parents", "_ancestors")
+
+    def __init__(self):
+        self.ids: dict[str, int] = {}
+        self.names: list[str] = []
+        self.parents: list[set[int]] = []
+        self._ancestors: dict[str, int] | None = None
+        self.declare(OBJECT)
+
+    def declare(self, name: str, parents: Iterable[str] = ()) -> int:
+        """
+        Declara um tipo e, opcionalmente, seus tipos pais.
+
+        Tipos pais ainda não declarados são declarados implicitamente. Tipos
+        sem pais descendem de ``object``. Declarar o mesmo tipo de novo
+        acrescenta os novos pais aos que ele já tinha.
+        """
+        id = self._intern(name)
+        for parent in parents:
+            self.parents[id].add(self._intern(parent))
+        self._ancestors = None
+        return id
+
+    def _intern(self, name: str) -> int:
+        try:
+            return self.ids[name]
+        except KeyError:
+            id = self.ids[name] = len(self.names)
+            self.names.append(name)
+            self.parents.append(set())
+            self._ancestors = None
+            return id
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.ids
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @property
+    def ancestors(self) -> dict[str, int]:
+        """
+        Associa o nome de cada tipo ao conjunto de bits dos seus ancestrais,
+        incluindo ele mesmo e ``object``.
+        """
+        if self._ancestors is None:
+            self._ancestors = self._closure()
+        return self._ancestors
+
+    def _closure(self) -> dict[str, int]:
+        # Propaga os bits dos pais até que nada mude. O número de passadas é
+        # limitado pela altura da hierarquia e ciclos não causam problemas.
+        root = 1 << self.ids[OBJECT]
+        bits = [(1 << id) | root for id in range(len(self.names))]
+        changed = True
+        while changed:
+            changed = False
+            for id, parents in enumerate(self.parents):
+                value = bits[id]
+                for parent in parents:
+                    value |= bits[parent]
+                if value != bits[id]:
+                    bits[id] = value
+                    changed = True
+        return {name: bits[id] for name, id in self.ids.items()}
+
+    def mask(self, names: Iterable[str]) -> int:
+        """
+        Conjunto de bits de um tipo esperado: a união dos bits dos tipos
+        dados (um só tipo, ou os membros de um ``either``).
+        """
+        ids = self.ids
+        value = 0
+        for name in names:
+            if name in ids:
+                value |= 1 << ids[name]
+        return value
+
+    def ancestors_of(self, names: Iterable[str]) -> int:
+        """
+        Conjunto de bits dos ancestrais de um tipo real. Para um ``either``,
+        é a união dos ancestrais de cada membro.
+        """
+        ancestors = self.ancestors
+        value = 0
+        for name in names:
+            value |= ancestors.get(name, 0)
+        return value
+
+    def is_subtype(self, sub: str, sup: str) -> bool:
+        """
+        Verifica se o tipo `sub` é igual a `sup` ou descende dele.
+        """
+        return bool(self.ancestors.get(sub, 0) & self.mask((sup,)))
+
+    def copy(self) -> "TypeHierarchy":
+        """
+        Cria uma cópia da hierarquia.
+        """
+        new = TypeHierarchy.__new__(TypeHierarchy)
+        new.ids = self.ids.copy()
+        new.names = self.names.copy()
+        new.parents = [parents.copy() for parents in self.parents]
+        new._ancestors = self._ancestors
+        return new
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, TypeHierarchy):
+            return NotImplemented
+        return self.names == other.names and self.parents == other.parents
+
+    def __repr__(self) -> str:
+        return f"TypeHierarchy({self.names!r})"
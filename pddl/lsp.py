@@ -0,0 +1,690 @@
+"""
+Servidor de linguagem (Language Server Protocol) para PDDL (``pddl lsp``).
+
+O servidor conversa com o editor pela entrada e saída padrão (JSON-RPC com
+cabeçalhos ``Content-Length``) e publica os erros de cada documento aberto
+como diagnósticos, com as mesmas mensagens do verificador.
+
+Reverificar um problema de milhares de linhas a cada tecla seria lento
+demais. Por isso, cada documento é dividido em formas de nível superior pelo
+scanner de parênteses de `pddl.stream` (o cabeçalho, cada seção, cada
+``:action``, cada predicado de ``:predicates`` e cada fato de ``:init``), e
+cada forma guarda sua AST e seus erros. Depois de uma edição, só as formas cujo
+texto mudou são analisadas novamente; as demais são reaproveitadas, com as
+linhas corrigidas se tiverem sido deslocadas.
+
+As formas se dividem em declarações (requisitos, tipos, constantes,
+predicados e objetos), que constroem o contexto, e verificações (ações e
+fatos de ``:init`` e ``:goal``), que apenas o consultam. Se as declarações
+não mudaram, só as verificações editadas são avaliadas. Se mudaram, o
+contexto é reconstruído a partir das ASTs guardadas e são reavaliadas apenas
+as verificações que mencionam algum dos nomes cuja declaração mudou (ou
+todas, se mudaram os requisitos ou os tipos).
+
+O domínio de um problema é o documento aberto que declara o domínio de
+``(:domain ...)`` ou, se não houver, o ``domain.pddl`` do mesmo diretório.
+"""
+
+import json
+import os
+import re
+import sys
+from contextlib import redirect_stdout
+from dataclasses import dataclass, field
+from typing import IO, Any
+from urllib.parse import unquote, urlparse
+
+from .ast import Identifier, Predicate, eval_all, type_names
+from .ctx import Ctx
+from .diagnostics import Diagnostics
+from .errors import ParseError, PDDLError
+from .facts import shift_identifiers
+from .runner import domain_ctx
+from .stream import SECTIONS as PROBLEM_SECTIONS
+from .stream import Form, FormScanner, SectionOrder, is_whole_section, iter_nodes, parse_form
+
+# Seções do domínio, na ordem exigida pela gramática, e a regra usada para
+# analisar cada forma
+DOMAIN_SECTIONS = {
+    "domain": "define_domain",
+    ":requirements": "requirements",
+    ":types": "types",
+    ":constants": "constants_def",
+    ":predicates": "predicate_def",
+    ":action": "action",
+}
+
+# Seções divididas em uma forma por filho, que podem se repetir na sequência
+SPLIT = {"domain": {":predicates"}, "problem": {":init"}}
+REPEATED = {"domain": {":predicates", ":action"}, "problem": {":init"}}
+OPTIONAL = {":constants", ":action"}
+
+# Formas que apenas consultam o contexto
+CHECKS = {":action", ":init", ":goal"}
+
+# Declarações cuja mudança afeta todas as verificações
+GLOBAL = {":requirements", ":types"}
+
+# Como no Lark, comentários podem aparecer entre os símbolos e as
+# palavras-chave são reconhecidas como prefixo
+DEFINE_RE = re.compile(r"\((?:\s|;[^\n]*)*define(?:\s|;[^\n]*)*\((?:\s|;[^\n]*)*(domain|problem)")
+WORD_RE = re.compile(r"[a-z0-9_?:-]+|.")
+
+# Códigos de erro do JSON-RPC
+METHOD_NOT_FOUND = -32601
+INVALID_REQUEST = -32600
+INTERNAL_ERROR = -32603
+
+MESSAGE_ERROR = 1
+
+DIAGNOSTIC_ERROR = 1
+
+
+@dataclass(eq=False)
+class Entry:
+    """
+    Uma forma de nível superior de um documento, com sua AST e seus erros.
+
+    `errors` contém os erros da última avaliação, com as posições no
+    documento; `checked` indica se eles ainda valem para o contexto atual.
+    """
+
+    form: Form
+    nodes: list = field(default_factory=list)
+    syntax: list[PDDLError] = field(default_factory=list)
+    errors: list[PDDLError] = field(default_factory=list)
+    uses: frozenset[str] = frozenset()
+    signatures: frozenset[tuple[str, str]] = frozenset()
+    checked: bool = False
+
+    @classmethod
+    def parse(cls, form: Form, start: str) -> "Entry":
+        entry = cls(form)
+        if form.section in SPLIT["domain"] | SPLIT["problem"] and is_whole_section(form):
+            return entry
+        try:
+            tree = parse_form(form, start)
+        except PDDLError as e:
+            entry.syntax = [e]
+            return entry
+        except Exception as e:
+            entry.syntax = [syntax_error(form, e)]
+            return entry
+        entry.nodes = tree if isinstance(tree, list) else [tree]
+        entry.uses = frozenset(
+            node.name for node in iter_nodes(entry.nodes) if isinstance(node, Identifier)
+        )
+        entry.signatures = signatures(form, entry.nodes)
+        return entry
+
+    @property
+    def key(self) -> tuple[str, str, int]:
+        return self.form.section, self.form.text, self.form.column
+
+    def move(self, form: Form) -> None:
+        """
+        Atualiza a posição da forma, que teve o texto preservado.
+        """
+        delta = form.line - self.form.line
+        self.form = form
+        if delta:
+            shift_identifiers(self.nodes, delta)
+            for error in {id(e): e for e in [*self.syntax, *self.errors]}.values():
+                error.line += delta
+
+    def evaluate(self, ctx: Ctx) -> None:
+        """
+        Avalia a forma em `ctx`, guardando os erros encontrados.
+        """
+        diagnostics = Diagnostics()
+        try:
+            if self.form.section == ":objects":
+                # Como em `Problem.eval`, os objetos são declarados antes de
+                # serem avaliados
+                for obj in self.nodes:
+                    ctx.var_def(obj.name.name, obj)
+            eval_all(self.nodes, ctx, diagnostics, None)
+        except Exception as e:
+            # Erros que não são do PDDL (como parâmetros repetidos) interrompem
+            # a verificação normal; aqui, são reportados no início da forma
+            diagnostics.add(PDDLError(str(e), self.form.line, self.form.column))
+        self.errors = [*self.syntax, *diagnostics]
+        self.checked = True
+
+    def skip(self) -> None:
+        """
+        Descarta os erros de avaliação, quando não há contexto para avaliar a
+        forma.
+        """
+        self.errors = list(self.syntax)
+        self.checked = False
+
+
+def signatures(form: Form, nodes: list) -> frozenset[tuple[str, str]]:
+    """
+    Assinaturas dos nomes declarados por uma forma: pares (nome, declaração).
+    Um nome cuja assinatura mudou afeta as verificações que o mencionam.
+    """
+    result = set()
+    for node in nodes:
+        if isinstance(node, Predicate):
+            result.add((node.name.name, form.text))
+        elif hasattr(node, "type") and isinstance(getattr(node, "name", None), Identifier):
+            result.add((node.name.name, " ".join(type_names(node.type))))
+    return frozenset(result)
+
+
+def syntax_error(form: Form, exc: Exception) -> PDDLError:
+    """
+    Converte um erro de sintaxe do Lark, com a posição relativa à forma, em
+    um erro com a posição no documento.
+    """
+    from lark.exceptions import UnexpectedCharacters, UnexpectedEOF, UnexpectedToken
+
+    line = getattr(exc, "line", -1)
+    column = getattr(exc, "column", -1)
+    if isinstance(exc, UnexpectedToken) and exc.token.type != "$END":
+        msg = f"erro de sintaxe: token inesperado '{exc.token}'"
+    elif isinstance(exc, UnexpectedCharacters):
+        msg = f"erro de sintaxe: caractere inesperado '{exc.char}'"
+    elif isinstance(exc, (UnexpectedEOF, UnexpectedToken)):
+        msg = "erro de sintaxe: fim inesperado da forma"
+        line = column = -1
+    else:
+        msg = f"erro de sintaxe: {str(exc).splitlines()[0]}"
+    if line is None or line < 1:
+        return ParseError(msg, form.line, form.column)
+    if line == 1:
+        column += form.column - 1
+    return ParseError(msg, line + form.line - 1, column)
+
+
+class Document:
+    """
+    Estado de um documento aberto: o texto e as formas já analisadas.
+    """
+
+    def __init__(self, uri: str, text: str = "", version: int | None = None):
+        self.uri = uri
+        self.text = text
+        self.version = version
+        self.kind: str | None = None
+        self.entries: list[Entry] = []
+        self.errors: list[PDDLError] = []
+        # Contexto construído pelas declarações e histórico das mudanças nas
+        # declarações (`None`: todas as verificações foram afetadas)
+        self.ctx: Ctx | None = None
+        self.changes: list[frozenset[str] | None] = []
+        self.decls: list[Entry] = []
+        self.domain: tuple["Document", int] | None = None
+
+    @property
+    def path(self) -> str | None:
+        return uri_to_path(self.uri)
+
+    @property
+    def name(self) -> str | None:
+        """
+        Nome declarado em ``(domain ...)`` ou ``(problem ...)``.
+        """
+        for entry in self.entries:
+            if entry.form.section == self.kind and entry.nodes:
+                return entry.nodes[0].name
+        return None
+
+    @property
+    def domain_name(self) -> str | None:
+        """
+        Nome do domínio referenciado por um problema em ``(:domain ...)``.
+        """
+        for entry in self.entries:
+            if entry.form.section == ":domain" and entry.nodes:
+                return entry.nodes[0].name
+        return None
+
+    def apply_change(self, change: dict) -> None:
+        """
+        Aplica uma mudança de ``textDocument/didChange``: um trecho
+        (``range``) ou o texto inteiro.
+        """
+        if "range" not in change:
+            self.text = change["text"]
+            return
+        start = offset_at(self.text, change["range"]["start"])
+        end = offset_at(self.text, change["range"]["end"])
+        self.text = self.text[:start] + change["text"] + self.text[end:]
+
+    def check(self, workspace: "Workspace") -> list[PDDLError]:
+        """
+        Verifica o documento, reaproveitando as formas que não mudaram, e
+        retorna os erros encontrados, em ordem.
+        """
+        kind = document_kind(self.text)
+        if kind != self.kind:
+            self.kind = kind
+            self.entries = []
+            self.decls = []
+            self.ctx = None
+            self.domain = None
+            self.changes.append(None)
+        if kind is None:
+            # Sem um cabeçalho reconhecido, só a estrutura externa é verificada
+            forms, self.errors = scan(self.text, ())
+            if forms and not self.errors:
+                first = forms[0]
+                self.errors = [ParseError(
+                    f"esperado '(domain' ou '(problem', encontrado '({first.section}'",
+                    first.line,
+                    first.column,
+                )]
+            return self.errors
+
+        forms, errors = scan(self.text, SPLIT[kind])
+        forms, structure = check_structure(forms, kind)
+        errors += structure
+        self.entries = self.match(forms, kind)
+
+        # Declarações: reconstrói o contexto se alguma mudou
+        decls = [entry for entry in self.entries if entry.form.section not in CHECKS]
+        changed = self.update_context(decls, workspace)
+
+        for entry in self.entries:
+            if entry.form.section not in CHECKS:
+                continue
+            if self.ctx is None:
+                entry.skip()
+            elif not entry.checked or changed is None or entry.uses & changed:
+                entry.evaluate(self.ctx)
+
+        for entry in self.entries:
+            errors.extend(entry.errors)
+        errors.sort(key=lambda e: (e.line, e.column))
+        self.errors = errors
+        return errors
+
+    def match(self, forms: list[Form], kind: str) -> list[Entry]:
+        """
+        Associa cada forma a uma entrada da verificação anterior com o mesmo
+        texto, ou analisa a forma se ela for nova.
+        """
+        sections = DOMAIN_SECTIONS if kind == "domain" else PROBLEM_SECTIONS
+        pool: dict[tuple, list[Entry]] = {}
+        for entry in reversed(self.entries):
+            pool.setdefault(entry.key, []).append(entry)
+
+        entries = []
+        for form in forms:
+            reused = pool.get((form.section, form.text, form.column))
+            if reused:
+                entry = reused.pop()
+                entry.move(form)
+            else:
+                entry = Entry.parse(form, sections[form.section])
+            entries.append(entry)
+        return entries
+
+    def update_context(self, decls: list[Entry], workspace: "Workspace") -> frozenset[str] | None:
+        """
+        Reconstrói o contexto se as declarações (ou, em um problema, o
+        domínio) mudaram desde a última verificação.
+
+        Retorna os nomes cujas declarações mudaram, ou `None` se todas as
+        verificações devem ser refeitas.
+        """
+        changed: set[str] = set()
+        everything = False
+        domain = None
+        if self.kind == "problem":
+            # Como no CLI, o problema não é avaliado contra um domínio com erros
+            domain = workspace.find_domain(self)
+            if domain is not None and (domain.ctx is None or domain.errors):
+                domain = None
+            if domain is None:
+                everything = self.domain is not None
+            elif self.domain is None or self.domain[0] is not domain:
+                everything = True
+            else:
+                for names in domain.changes[self.domain[1]:]:
+                    if names is None:
+                        everything = True
+                        break
+                    changed |= names
+
+        old, new = set(map(id, self.decls)), set(map(id, decls))
+        if old == new and not everything and not changed:
+            return frozenset()
+
+        before = {sig for entry in self.decls for sig in entry.signatures}
+        after = {sig for entry in decls for sig in entry.signatures}
+        changed |= {name for name, _ in before ^ after}
+        modified = [entry for entry in [*self.decls, *decls] if (id(entry) in old) != (id(entry) in new)]
+        if any(entry.form.section in GLOBAL for entry in modified):
+            everything = True
+
+        self.decls = decls
+        if self.kind == "domain":
+            self.ctx = domain_ctx()
+        elif domain is not None:
+            self.ctx = domain.ctx.snapshot()
+            self.domain = (domain, len(domain.changes))
+        else:
+            self.ctx = None
+            self.domain = None
+
+        for entry in decls:
+            if self.ctx is None:
+                entry.skip()
+            else:
+                entry.evaluate(self.ctx)
+
+        result = None if everything else frozenset(changed)
+        self.changes.append(result)
+        return result
+
+
+def document_kind(text: str) -> str | None:
+    """
+    Retorna "domain" ou "problem", conforme o cabeçalho ``(define ...)``.
+    """
+    m = DEFINE_RE.search(text)
+    return m.group(1) if m else None
+
+
+def scan(text: str, split: set[str]) -> tuple[list[Form], list[PDDLError]]:
+    """
+    Divide o texto em formas. Símbolos fora das formas são reportados sem
+    interromper a leitura; em caso de parênteses desbalanceados, retorna as
+    formas encontradas até o erro e os erros.
+    """
+    errors: list[PDDLError] = []
+    scanner = FormScanner(split, errors)
+    forms: list[Form] = []
+    try:
+        forms.extend(scanner.feed(text))
+        scanner.close()
+    except PDDLError as e:
+        errors.append(e)
+    return forms, errors
+
+
+def check_structure(forms: list[Form], kind: str) -> tuple[list[Form], list[PDDLError]]:
+    """
+    Verifica a ordem das seções, como `pddl.stream.eval_problem`, mas sem
+    interromper no primeiro erro. Retorna as formas em seções válidas e os
+    erros encontrados.
+    """
+    sections = DOMAIN_SECTIONS if kind == "domain" else PROBLEM_SECTIONS
+    order = SectionOrder(sections, REPEATED[kind], OPTIONAL)
+    valid, errors = [], []
+    for form in forms:
+        accepted, structure = order.check(form)
+        errors.extend(structure)
+        if accepted:
+            valid.append(form)
+    if forms:
+        errors.extend(order.finish(forms[-1].line, forms[-1].column))
+    return valid, errors
+
+
+class Workspace:
+    """
+    Documentos abertos e domínios lidos do disco.
+    """
+
+    def __init__(self):
+        self.documents: dict[str, Document] = {}
+        self.files: dict[str, tuple[float, Document]] = {}
+
+    def find_domain(self, problem: Document) -> Document | None:
+        """
+        Retorna o documento do domínio usado pelo problema.
+        """
+        name = problem.domain_name
+        for document in self.documents.values():
+            if document.kind == "domain" and document.name == name:
+                return document
+        if problem.path is None:
+            return None
+        path = os.path.join(os.path.dirname(problem.path), "domain.pddl")
+        for document in self.documents.values():
+            if document.kind == "domain" and document.path == path:
+                return document
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            return None
+        cached = self.files.get(path)
+        if cached is None or cached[0] != mtime:
+            with open(path, "r") as fd:
+                document = Document(path_to_uri(path), fd.read())
+            document.check(self)
+            self.files[path] = (mtime, document)
+            return document
+        return cached[1]
+
+
+class LanguageServer:
+    """
+    Laço principal do servidor: lê mensagens JSON-RPC de `input`, atualiza os
+    documentos e publica os diagnósticos em `output`.
+    """
+
+    def __init__(self, input: IO[bytes], output: IO[bytes]):
+        self.input = input
+        self.output = output
+        self.workspace = Workspace()
+        self.shutdown = False
+
+    def serve(self) -> int:
+        """
+        Atende mensagens até ``exit``. Retorna o código de saída do processo.
+        """
+        # As mensagens impressas pelo verificador não podem se misturar ao
+        # protocolo na saída padrão
+        with redirect_stdout(sys.stderr):
+            while (message := self.read()) is not None:
+                if message.get("method") == "exit":
+                    return 0 if self.shutdown else 1
+                self.handle(message)
+        return 0 if self.shutdown else 1
+
+    def read(self) -> dict | None:
+        length = None
+        while True:
+            line = self.input.readline()
+            if not line:
+                return None
+            line = line.strip()
+            if not line:
+                break
+            name, _, value = line.decode("ascii").partition(":")
+            if name.strip().lower() == "content-length":
+                length = int(value)
+        if length is None:
+            return {}
+        return json.loads(self.input.read(length))
+
+    def send(self, message: dict) -> None:
+        body = json.dumps({"jsonrpc": "2.0", **message}, ensure_ascii=False).encode()
+        self.output.write(f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+        self.output.flush()
+
+    def handle(self, message: dict) -> None:
+        method = message.get("method")
+        id = message.get("id")
+        params = message.get("params") or {}
+        handler = getattr(self, "on_" + str(method).replace("/", "_").replace("$", "_"), None)
+        if handler is None:
+            if id is not None:
+                error = {"code": METHOD_NOT_FOUND, "message": f"método desconhecido: {method}"}
+                self.send({"id": id, "error": error})
+            return
+        try:
+            result = handler(params)
+        except (KeyError, TypeError, ValueError) as e:
+            self.fail(id, INVALID_REQUEST, str(e))
+            return
+        except Exception as e:
+            # Um erro inesperado não pode derrubar o servidor, que atende
+            # todos os documentos abertos no editor
+            self.fail(id, INTERNAL_ERROR, f"{type(e).__name__}: {e}")
+            return
+        if id is not None:
+            self.send({"id": id, "result": result})
+
+    def fail(self, id, code: int, message: str) -> None:
+        """
+        Responde a uma requisição com um erro. Em notificações, que não têm
+        resposta, o erro é registrado no log do editor.
+        """
+        if id is not None:
+            self.send({"id": id, "error": {"code": code, "message": message}})
+        else:
+            self.send({"method": "window/logMessage", "params": {"type": MESSAGE_ERROR, "message": message}})
+
+    #
+    # Mensagens
+    #
+
+    def on_initialize(self, params: dict) -> dict:
+        return {
+            "capabilities": {
+                # Sincronização incremental: o editor envia apenas os trechos
+                # alterados
+                "textDocumentSync": {"openClose": True, "change": 2},
+            },
+            "serverInfo": {"name": "pddl"},
+        }
+
+    def on_initialized(self, params: dict) -> None:
+        pass
+
+    def on_shutdown(self, params: dict) -> None:
+        self.shutdown = True
+
+    def on_textDocument_didOpen(self, params: dict) -> None:
+        item = params["textDocument"]
+        document = Document(item["uri"], item["text"], item.get("version"))
+        self.workspace.documents[document.uri] = document
+        self.check(document)
+
+    def on_textDocument_didChange(self, params: dict) -> None:
+        item = params["textDocument"]
+        document = self.workspace.documents[item["uri"]]
+        for change in params["contentChanges"]:
+            document.apply_change(change)
+        document.version = item.get("version")
+        self.check(document)
+
+    def on_textDocument_didClose(self, params: dict) -> None:
+        uri = params["textDocument"]["uri"]
+        document = self.workspace.documents.pop(uri, None)
+        self.send({
+            "method": "textDocument/publishDiagnostics",
+            "params": {"uri": uri, "diagnostics": []},
+        })
+        if document is not None and document.kind == "domain":
+            self.recheck_problems()
+
+    def on__cancelRequest(self, params: dict) -> None:
+        pass
+
+    def check(self, document: Document) -> None:
+        """
+        Verifica o documento e publica os diagnósticos. Problemas abertos que
+        dependem de um domínio alterado também são verificados novamente.
+        """
+        self.publish(document, self.errors(document))
+        if document.kind == "domain":
+            self.recheck_problems(exclude=document)
+
+    def recheck_problems(self, exclude: Document | None = None) -> None:
+        for other in list(self.workspace.documents.values()):
+            if other is not exclude and other.kind == "problem":
+                changes = len(other.changes)
+                errors = self.errors(other)
+                if len(other.changes) != changes:
+                    self.publish(other, errors)
+
+    def errors(self, document: Document) -> list[PDDLError]:
+        try:
+            return document.check(self.workspace)
+        except Exception as e:
+            # Um erro inesperado é publicado no início do documento, em vez de
+            # deixar os diagnósticos anteriores desatualizados
+            return [PDDLError(f"erro interno do verificador: {type(e).__name__}: {e}", 1, 1)]
+
+    def publish(self, document: Document, errors: list[PDDLError]) -> None:
+        lines = document.text.split("\n")
+        self.send({
+            "method": "textDocument/publishDiagnostics",
+            "params": {
+                "uri": document.uri,
+                "version": document.version,
+                "diagnostics": [to_diagnostic(error, lines) for error in errors],
+            },
+        })
+
+
+def to_diagnostic(error: PDDLError, lines: list[str]) -> dict[str, Any]:
+    """
+    Converte um erro em um diagnóstico do LSP, que cobre a palavra na
+    posição do erro. Linhas e colunas do LSP começam em 0 e as colunas são
+    contadas em unidades UTF-16.
+    """
+    line = max(error.line - 1, 0)
+    column = max(error.column - 1, 0)
+    text = lines[line] if line < len(lines) else ""
+    m = WORD_RE.match(text, column)
+    end = m.end() if m else column
+    return {
+        "range": {
+            "start": {"line": line, "character": utf16_length(text[:column])},
+            "end": {"line": line, "character": utf16_length(text[:end])},
+        },
+        "severity": DIAGNOSTIC_ERROR,
+        "source": "pddl",
+        "code": type(error).__name__,
+        "message": error.msg,
+    }
+
+
+def utf16_length(text: str) -> int:
+    return len(text) + sum(1 for char in text if ord(char) > 0xFFFF)
+
+
+def offset_at(text: str, position: dict) -> int:
+    """
+    Converte uma posição do LSP (linha e coluna UTF-16) em um índice do texto.
+    """
+    offset = 0
+    for _ in range(position["line"]):
+        newline = text.find("\n", offset)
+        if newline < 0:
+            return len(text)
+        offset = newline + 1
+    units = position["character"]
+    while units > 0 and offset < len(text) and text[offset] != "\n":
+        units -= 2 if ord(text[offset]) > 0xFFFF else 1
+        offset += 1
+    return offset
+
+
+def uri_to_path(uri: str) -> str | None:
+    parsed = urlparse(uri)
+    if parsed.scheme != "file":
+        return None
+    return unquote(parsed.path)
+
+
+def path_to_uri(path: str) -> str:
+    from urllib.parse import quote
+
+    return "file://" + quote(os.path.abspath(path))
+
+
+def main() -> int:
+    """
+    Inicia o servidor na entrada e saída padrão.
+    """
+    return LanguageServer(sys.stdin.buffer, sys.stdout.buffer).serve()
@@ -4,9 +4,10 @@ ATENÇÃO: EVITE MODIFICAR ESTE ARQUIVO!
 Define estrutura de dados básicas para as árvores sintáticas.
 """
 
+import weakref
 from abc import ABC
-from dataclasses import dataclass, field
-from functools import singledispatch
+from dataclasses import dataclass, field, fields, is_dataclass
+from functools import cache, singledispatch
 from types import BuiltinFunctionType, FunctionType, MethodDescriptorType, MethodType
 from typing import (
     TYPE_CHECKING,
@@ -20,15 +21,32 @@ from typing import (
     cast,
 )
 
-from lark import Token, Tree
-
 if TYPE_CHECKING:
+    from lark import Token, Tree
+
     from .ast import Class, Function
 
 
 N = TypeVar("N", bound="Node", contravariant=True)
 
 
+class NodeSequence(ABC):
+    """
+    Classe base para sequências de nós que não são listas do Python.
+
+    Atributos de nós que guardam instâncias desta classe são tratados como
+    listas de filhos por `Node.children`, `Node.pretty`, `Node.replace_child`,
+    etc. Subclasses devem implementar `__len__`, `__getitem__`,
+    `__setitem__` e `__iter__`. Veja `pddl.facts.FactStore`.
+    """
+
+    __slots__ = ()
+
+
+# Tipos de atributos tratados como listas de filhos
+SEQUENCES = (list, tuple, NodeSequence)
+
+
 class Node(ABC):
     """
     Classe base para todos os nós da árvore sintática.
@@ -38,6 +56,20 @@ class Node(ABC):
     criar subclasses que implementem os métodos abstratos definidos aqui.
     """
 
+    # Os nós usam __slots__ em vez de um __dict__ por instância, o que reduz
+    # bastante a memória ocupada por árvores grandes. O __weakref__ permite
+    # guardar referências fracas para nós (veja `pddl.facts.FactStore`).
+    __slots__ = ("__weakref__",)
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Registra as classes que sobrescrevem os ganchos de validação e de
+        # remoção de açúcar sintático, para que `process_tree` possa pular os
+        # nós (ou a árvore inteira) em que eles não fazem nada.
+        for hook, classes in HOOKS.items():
+            if getattr(cls, hook) is not getattr(Node, hook):
+                classes.add(cls)
+
     def eval(self, ctx, file_path: str | None = None):
         name = type(self).__name__
         raise NotImplementedError(f"Método eval não implementado para {name}!")
@@ -61,9 +93,9 @@ class Node(ABC):
 
         Um nó é considerado uma folha se não tem filhos do tipo `Node`.
         """
-        for name in self.__annotations__:
+        for name in field_names(type(self)):
             value = getattr(self, name)
-            if isinstance(value, (Node, list, tuple, dict)):
+            if isinstance(value, (Node, dict, *SEQUENCES)):
                 return False
         return True
 
@@ -75,105 +107,66 @@ class Node(ABC):
         """
         # Um pouquinho de Python avançado aqui.
         # O método `_pretty_lines` é um gerador. Cada yield retorna uma dupla com
-        # o nível de indentação da linha e o conteúdo a ser impresso
+        # o nível de indentação da linha e o conteúdo a ser impresso.
         #
-        # No caso simples, imprimimos a classe usando str(self). Fazemos isso se
-        # a classe não tiver nenhum filho do tipo Node.
-        if can_print_as_leaf(self):
-            yield indent_level, str(self)
-            return
-
-        # No caso mais complexo, começamos com a linha de abertura, imprimindo
-        # o nome da classe e um parêntese de abertura
-        yield indent_level, str(self.__class__.__name__) + "("
-
-        # O attributo "__annotations__" é um dicionário que contém os nomes dos
-        # atributos declarados e seus tipos correspondentes. Vamos pegar os tipos
-        # na ordem de declaração e imprimir o nome e valores correspondentes
-        for attr in self.__annotations__:
-            # attr é o nome do atributo. Obtemos o valor do atributo usando a
-            # função `getattr` do Python
-            value = getattr(self, attr)
-
-            # Se o valor for um objeto do tipo `Node`, chamamos o método `pretty_lines`
-            # recursivamente. Caso contrário, usamos a implementação genérica
-            # do método `pretty`
-            if isinstance(value, Node):
-                yield from self._pretty_lines_node(attr + "=", value, indent_level)
-            elif isinstance(value, (list, tuple)):
-                yield from self._pretty_lines_list(attr, value, indent_level)
-            else:
-                yield indent_level + 1, f"{attr}={pretty(value)}"
+        # Em vez de chamar o método recursivamente para cada filho, usamos uma
+        # pilha explícita. A pilha guarda linhas prontas, no formato (nível,
+        # texto), e nós ainda por imprimir, no formato (nó, nível, prefixo, fim).
+        # Assim, árvores muito profundas não estouram o limite de recursão.
+        stack: list[tuple] = [(self, indent_level, "", end)]
+        while stack:
+            item = stack.pop()
+            if len(item) == 2:
+                yield item
                 continue
+            node, level, prefix, end = item
 
-        # Terminamos fechando o parênteses que foi aberto na primeira linha
-        yield indent_level, ")" + end
-
-    def _pretty_lines_node(
-        self,
-        prefix: str,
-        value: "Node",
-        indent_level: int = 0,
-    ) -> Iterator[tuple[int, str]]:
-        """
-        Método auxiliar para imprimir nós de forma legível.
-        """
-        lines = iter(value._pretty_lines(indent_level + 1))
-        (_, first_line) = next(lines)
-
-        # Tratamos a primeira linha de forma diferente, pois ela é prefixada
-        # com o nome do atributo.
-        yield indent_level + 1, prefix + first_line
-
-        # O comando "yield from" gera todos os valores remanescentes do
-        # iterador `lines`.
-        yield from lines
-
-    def _pretty_lines_list(
-        self,
-        attr: str,
-        value: list[Any] | tuple[Any],
-        indent_level: int = 0,
-    ) -> Iterator[tuple[int, str]]:
-        """
-        Método auxiliar para imprimir listas de forma legível.
-        """
-        if all(not isinstance(item, Node) for item in value):
-            yield indent_level + 1, f"{attr}={list(value)}"
-            return
-
-        yield indent_level + 1, f"{attr}=["
+            # No caso simples, imprimimos o nó usando str(node). Fazemos isso
+            # se a classe não tiver nenhum filho do tipo Node.
+            if can_print_as_leaf(node):
+                yield level, prefix + str(node)
+                continue
 
-        for item in value:
-            if isinstance(item, Node):
-                yield from item._pretty_lines(indent_level + 2, end=",")
-            else:
-                yield indent_level + 2, pretty(item) + ","
-        yield indent_level + 1, "]"
+            # No caso mais complexo, começamos com a linha de abertura,
+            # imprimindo o nome da classe e um parêntese de abertura
+            yield level, prefix + node.__class__.__name__ + "("
+
+            # A função `field_names` retorna os nomes dos atributos declarados
+            # na classe, na ordem de declaração. Montamos a lista do que deve
+            # ser impresso para cada atributo e empilhamos em ordem reversa.
+            work: list[tuple] = []
+            for attr in field_names(type(node)):
+                value = getattr(node, attr)
+                if isinstance(value, Node):
+                    work.append((value, level + 1, attr + "=", ""))
+                elif isinstance(value, SEQUENCES):
+                    if all(not isinstance(elem, Node) for elem in value):
+                        work.append((level + 1, f"{attr}={list(value)}"))
+                        continue
+                    work.append((level + 1, f"{attr}=["))
+                    for elem in value:
+                        if isinstance(elem, Node):
+                            work.append((elem, level + 2, "", ","))
+                        else:
+                            work.append((level + 2, pretty(elem) + ","))
+                    work.append((level + 1, "]"))
+                else:
+                    work.append((level + 1, f"{attr}={pretty(value)}"))
+
+            # Terminamos fechando o parênteses que foi aberto na primeira linha
+            work.append((level, ")" + end))
+            stack.extend(reversed(work))
 
     def visit(self, visitors: dict[type["Node"], Callable[[N], Any]]) -> None:
         """
         Recebe um dicionário de tipos associados a funções.
 
         Executa a função correspondente ao tipo para cada nó na árvore sintática.
+        Os filhos são visitados antes do nó pai. Atributos que não são nós
+        também são passados para `visit_once`.
         """
-
-        # Primeiro visitamos os filhos do nó atual.
-        for name in self.__annotations__:
-            value = getattr(self, name)
-            if isinstance(value, Node):
-                value.visit(visitors)
-            elif isinstance(value, (list, tuple)):
-                for item in value:
-                    if isinstance(item, Node):
-                        item.visit(visitors)
-                    else:
-                        visit_once(item, visitors)
-            else:
-                visit_once(value, visitors)
-
-        # Agora visitamos self
-        visit_once(self, visitors)
+        for item in postorder(self, _visit_items):
+            visit_once(item, visitors)
 
     def children(self) -> Iterable["Node"]:
         """
@@ -183,16 +176,16 @@ class Node(ABC):
         do nó atual. Isso é útil para percorrer a árvore sintática de forma
         recursiva.
         """
-        for name in self.__annotations__:
+        for name in field_names(type(self)):
             value = getattr(self, name)
             if isinstance(value, Node):
                 yield value
-            elif isinstance(value, (list, tuple)):
+            elif isinstance(value, SEQUENCES):
                 for item in value:
                     if isinstance(item, Node):
                         yield item
 
-    def lark_descendents(self) -> Iterable[Tree | Token]:
+    def lark_descendents(self) -> Iterable["Tree | Token"]:
         """
         Retorna todos os descendentes do nó atual.
 
@@ -203,31 +196,38 @@ class Node(ABC):
         método ajuda a encontrar nós não-tranformados que podem ter escapado seu
         Transformer.
         """
-        for name in self.__annotations__:
-            value = getattr(self, name)
-            if isinstance(value, (Tree, Token)):
-                yield value
+        from lark import Token, Tree
 
-            if isinstance(value, Node):
-                yield from value.lark_descendents()
-            elif isinstance(value, (list, tuple)):
-                for item in value:
-                    if isinstance(item, Node):
-                        yield from item.lark_descendents()
-                    elif isinstance(item, (Tree, Token)):
-                        yield item
+        def items(obj):
+            if not isinstance(obj, Node):
+                return
+            for name in field_names(type(obj)):
+                value = getattr(obj, name)
+                if isinstance(value, (Node, Tree, Token)):
+                    yield value
+                elif isinstance(value, SEQUENCES):
+                    for item in value:
+                        if isinstance(item, (Node, Tree, Token)):
+                            yield item
+
+        for item in preorder(self, items):
+            if isinstance(item, (Tree, Token)):
+                yield item
 
-    def descendants(self) -> Iterable[Any]:
+    def descendants(
+        self, skip: Callable[["Node"], bool] | None = None, postorder: bool = False
+    ) -> Iterable[Any]:
         """
         Retorna todos os descendentes do nó atual.
 
         O método `descendants` retorna um iterador que percorre todos os
-        descendentes do nó atual. Isso é útil para percorrer a árvore sintática
-        de forma recursiva.
+        descendentes do nó atual, começando pelo próprio nó. Por padrão, cada
+        nó aparece antes dos filhos (pré-ordem); com `postorder=True`, depois
+        deles. Nós para os quais `skip` retorna verdadeiro são ignorados,
+        junto com todos os seus descendentes.
         """
-        yield self
-        for child in self.children():
-            yield from child.descendants()
+        traverse = _postorder if postorder else preorder
+        return traverse(self, Node.children, skip)
 
     def cursor(self, cursor: Optional["Cursor[N]"] = None) -> "Cursor[N]":
         """
@@ -242,6 +242,10 @@ class Node(ABC):
         if cursor.node is self:
             return cursor
 
+        # Com um índice de pais, basta subir do nó atual até o cursor
+        if cursor.index is not None and self in cursor.index:
+            return cursor.index.cursor(self, cursor)  # type: ignore
+
         # Busca em largura
         pending = [cursor]
         while pending:
@@ -258,21 +262,31 @@ class Node(ABC):
         O método `replace_child` substitui um filho do nó atual por um novo
         nó. Isso é útil para modificar a árvore sintática de forma recursiva.
         """
-        for name in self.__annotations__:
+        for name in field_names(type(self)):
             value = getattr(self, name)
             if isinstance(value, Node):
                 if value is old:
                     setattr(self, name, new)
+                    TreeIndex.update_all(self, old, new)
                     return
-            elif isinstance(value, (list, tuple)):
+            elif isinstance(value, SEQUENCES):
                 for i, item in enumerate(value):
                     if item is old:
                         if isinstance(value, tuple):
                             msg = f"Em {type(self).__name__}.{name}: esperava uma lista de filhos, mas encontrei uma tupla"
                             raise TypeError(msg)
                         value[i] = new
+                        TreeIndex.update_all(self, old, new)
                         return
 
+    def build_index(self) -> "TreeIndex":
+        """
+        Constrói um índice de pais para a árvore com raiz no nó atual.
+
+        Veja `TreeIndex`.
+        """
+        return TreeIndex(self)
+
     def desugar_self(self):
         """
         Método que transforma o nó atual em uma versão sem auxílios sintáticos.
@@ -285,12 +299,7 @@ class Node(ABC):
         """
         Remove açúcar sintático do nó atual e todos os filhos.
         """
-        pending = [self.cursor()]
-
-        while pending:
-            cursor = pending.pop()
-            cursor.node.desugar_self()
-            pending.extend(cursor.children())
+        self.process_tree(validate=False)
 
     def validate_self(self, cursor: "Cursor[Node]"):
         """
@@ -306,8 +315,36 @@ class Node(ABC):
         """
         Valida o nó atual e todos os filhos.
         """
+        self.process_tree(desugar=False)
+
+    def process_tree(self, validate: bool = True, desugar: bool = True):
+        """
+        Valida e remove açúcar sintático do nó atual e de todos os filhos em
+        uma única passada pela árvore.
+
+        Cada nó é validado e, em seguida, transformado por `desugar_self`,
+        antes de seus filhos serem visitados. Os ganchos só são chamados nas
+        classes que os sobrescrevem. Se nenhuma classe sobrescreve os ganchos
+        pedidos, a árvore não é percorrida.
+        """
+        validators = HOOKS["validate_self"] if validate else set()
+        desugarers = HOOKS["desugar_self"] if desugar else set()
+        if not (validators or desugarers):
+            return
+
+        # Os filhos de cada nó só são lidos depois que o nó é processado, de
+        # modo que as alterações feitas por `desugar_self` são respeitadas
         for cursor in self.cursor().descendants():
-            cursor.node.validate_self(cursor)
+            node = cursor.node
+            if type(node) in validators:
+                node.validate_self(cursor)
+            if type(node) in desugarers:
+                node.desugar_self()
+
+
+# Classes de nós que sobrescrevem cada gancho de `Node.process_tree`.
+# Preenchido por `Node.__init_subclass__`.
+HOOKS: dict[str, set[type[Node]]] = {"validate_self": set(), "desugar_self": set()}
 
 
 @dataclass
@@ -318,6 +355,7 @@ class Cursor(Generic[N]):
 
     node: N
     parent_cursor: Optional["Cursor[Node]"] = field(default=None, repr=False)
+    index: Optional["TreeIndex"] = field(default=None, repr=False, compare=False)
 
     def parent(self) -> "Cursor[Node]":
         """
@@ -337,9 +375,10 @@ class Cursor(Generic[N]):
         O método `root` retorna o nó raiz do cursor. Isso é útil para
         navegar na árvore sintática de forma recursiva.
         """
-        if not self.parent_cursor:
-            return cast("Cursor[Node]", self)
-        return self.parent_cursor.root()
+        cursor = cast("Cursor[Node]", self)
+        while cursor.parent_cursor is not None:
+            cursor = cursor.parent_cursor
+        return cursor
 
     def is_root(self) -> bool:
         """
@@ -374,9 +413,17 @@ class Cursor(Generic[N]):
         """
         if not self.parent_cursor:
             return
+        # Com um índice, os filhos do pai e a posição do nó entre eles já são
+        # conhecidos, sem percorrer os atributos do pai novamente
+        if self.index is not None and self.node in self.index:
+            position = self.index.position(self.node)
+            for i, sibling in enumerate(self.index.children(self.parent_cursor.node)):
+                if i != position:
+                    yield Cursor(sibling, self.parent_cursor, self.index)
+            return
         for sibling in self.parent_cursor.node.children():
             if sibling is not self.node:
-                yield Cursor(sibling, self.parent_cursor)
+                yield Cursor(sibling, self.parent_cursor, self.index)
 
     def children(self) -> Iterable["Cursor[Node]"]:
         """
@@ -388,23 +435,29 @@ class Cursor(Generic[N]):
         """
         self = cast("Cursor[Node]", self)
         for child in self.node.children():
-            yield Cursor(child, self)
+            yield Cursor(child, self, self.index)
 
     def descendants(
-        self, skip: Callable[["Cursor"], bool] | None = None, skip_self: bool = False
+        self,
+        skip: Callable[["Cursor"], bool] | None = None,
+        skip_self: bool = False,
+        postorder: bool = False,
     ) -> Iterable["Cursor[Node]"]:
         """
         Retorna todos os descendentes do nó atual.
 
         O método `descendants` retorna um iterador que percorre todos os
-        descendentes do nó atual. Isso é útil para navegar na árvore sintática
-        de forma recursiva.
-        """
-        if skip is None or not skip(self):
-            if not skip_self:
-                yield cast("Cursor[Node]", self)
-            for child in self.children():
-                yield from child.descendants(skip)
+        descendentes do nó atual, em pré-ordem ou, se `postorder` for
+        verdadeiro, em pós-ordem. Cursores para os quais `skip` retorna
+        verdadeiro são ignorados junto com seus descendentes. Se `skip_self`
+        for verdadeiro, o próprio cursor não é incluído.
+        """
+        traverse = _postorder if postorder else preorder
+        cursors = traverse(cast("Cursor[Node]", self), Cursor.children, skip)
+        for cursor in cursors:
+            if skip_self and cursor is self:
+                continue
+            yield cursor
 
     def is_scoped_to(self, scope: type[Node]) -> bool:
         """
@@ -453,6 +506,234 @@ class Cursor(Generic[N]):
         return cursor
 
 
+class TreeIndex:
+    """
+    Índice opcional que associa cada nó de uma árvore ao seu nó pai e à sua
+    posição entre os filhos do pai.
+
+    Sem o índice, encontrar o cursor de um nó exige percorrer a árvore a
+    partir da raiz. Com ele, `cursor` apenas sobe pelos pais do nó, com custo
+    proporcional à profundidade. Cursores criados pelo índice carregam uma
+    referência para ele, de modo que `Node.cursor(cursor)` e
+    `Cursor.siblings` também se beneficiam.
+
+    O índice é construído uma única vez e mantido atualizado por
+    `Node.replace_child`. Outras modificações na árvore (como atribuir
+    diretamente um atributo) não são refletidas no índice.
+    """
+
+    __slots__ = ("root", "parents", "child_lists", "__weakref__")
+
+    # Índices vivos, atualizados por `Node.replace_child`
+    live: "weakref.WeakSet[TreeIndex]" = weakref.WeakSet()
+
+    def __init__(self, root: Node):
+        self.root = root
+        # Nós não são hasheáveis, então usamos id(nó) como chave. Guardar o
+        # próprio nó garante que o id não seja reaproveitado por outro objeto.
+        # Cada entrada guarda o nó, o pai e a posição do nó entre os filhos do
+        # pai; `child_lists` guarda os filhos de cada nó que tem filhos.
+        self.parents: dict[int, tuple[Node, Node | None, int]] = {}
+        self.child_lists: dict[int, list[Node]] = {}
+        self._add(root, None, 0)
+        TreeIndex.live.add(self)
+
+    def _add(self, node: Node, parent: Node | None, position: int) -> None:
+        parents = self.parents
+        child_lists = self.child_lists
+        parents[id(node)] = (node, parent, position)
+        stack = [node]
+        while stack:
+            item = stack.pop()
+            children = list(item.children())
+            if children:
+                child_lists[id(item)] = children
+            for i, child in enumerate(children):
+                parents[id(child)] = (child, item, i)
+                stack.append(child)
+
+    def _remove(self, node: Node) -> None:
+        for item in preorder(node, Node.children):
+            self.parents.pop(id(item), None)
+            self.child_lists.pop(id(item), None)
+
+    def __contains__(self, node: object) -> bool:
+        entry = self.parents.get(id(node))
+        return entry is not None and entry[0] is node
+
+    def __len__(self) -> int:
+        return len(self.parents)
+
+    def parent(self, node: Node) -> Node | None:
+        """
+        Retorna o pai do nó, ou `None` se ele for a raiz.
+        """
+        return self._entry(node)[1]
+
+    def position(self, node: Node) -> int:
+        """
+        Retorna a posição do nó entre os filhos do pai (0 para a raiz).
+        """
+        return self._entry(node)[2]
+
+    def children(self, node: Node) -> list[Node]:
+        """
+        Retorna os filhos do nó, na ordem de `Node.children`.
+        """
+        self._entry(node)
+        return self.child_lists.get(id(node), [])
+
+    def _entry(self, node: Node) -> tuple[Node, Node | None, int]:
+        entry = self.parents.get(id(node))
+        if entry is None or entry[0] is not node:
+            raise ValueError("O nó não pertence à árvore indexada")
+        return entry
+
+    def path(self, node: Node) -> list[Node]:
+        """
+        Retorna os nós no caminho da raiz até `node`, inclusive.
+        """
+        path = [node]
+        while (parent := self.parent(path[-1])) is not None:
+            path.append(parent)
+        path.reverse()
+        return path
+
+    def cursor(self, node: Node, base: "Cursor[Node] | None" = None) -> "Cursor[Node]":
+        """
+        Retorna um cursor para `node`.
+
+        Se `base` for dado, o cursor resultante é construído a partir dele e
+        `node` deve ser um descendente de `base.node`.
+        """
+        path = self.path(node)
+        if base is None:
+            cursor = Cursor(path[0], None, self)
+            path = path[1:]
+        else:
+            for i, item in enumerate(path):
+                if item is base.node:
+                    break
+            else:
+                raise ValueError("O cursor não aponta para o nó atual")
+            cursor, path = base, path[i + 1 :]
+        for item in path:
+            cursor = Cursor(item, cursor, self)
+        return cursor
+
+    def replace(self, parent: Node, old: Node, new: Node) -> None:
+        """
+        Atualiza o índice após `old` ser substituído por `new` em `parent`.
+        """
+        if old in self:
+            self._remove(old)
+        # As posições dos demais filhos não mudam, mas a lista de filhos do
+        # pai é refeita, pois `old` pode não estar no índice
+        children = self.child_lists[id(parent)] = list(parent.children())
+        for i, child in enumerate(children):
+            if child is new:
+                self._add(new, parent, i)
+
+    @classmethod
+    def update_all(cls, parent: Node, old: Node, new: Node) -> None:
+        """
+        Atualiza todos os índices vivos que contêm `parent`.
+        """
+        for index in list(cls.live):
+            if parent in index:
+                index.replace(parent, old, new)
+
+
+T = TypeVar("T")
+
+
+def preorder(
+    root: T,
+    children: Callable[[T], Iterable[T]],
+    skip: Callable[[T], bool] | None = None,
+) -> Iterator[T]:
+    """
+    Percorre uma árvore em pré-ordem (cada item antes dos seus filhos).
+
+    Usa uma pilha explícita de iteradores em vez de recursão, de modo que a
+    profundidade da árvore não é limitada pelo limite de recursão do Python.
+    A função `children` é chamada somente depois que o item é entregue, então
+    quem consome o iterador pode modificar os filhos do item. Itens para os
+    quais `skip` retorna verdadeiro são ignorados junto com seus descendentes.
+    """
+    if skip is not None and skip(root):
+        return
+    yield root
+    stack = [iter(children(root))]
+    while stack:
+        for child in stack[-1]:
+            if skip is None or not skip(child):
+                yield child
+                stack.append(iter(children(child)))
+            break
+        else:
+            stack.pop()
+
+
+def postorder(
+    root: T,
+    children: Callable[[T], Iterable[T]],
+    skip: Callable[[T], bool] | None = None,
+) -> Iterator[T]:
+    """
+    Percorre uma árvore em pós-ordem (cada item depois dos seus filhos).
+
+    Assim como `preorder`, usa uma pilha explícita. Itens para os quais `skip`
+    retorna verdadeiro são ignorados junto com seus descendentes.
+    """
+    if skip is not None and skip(root):
+        return
+    stack = [(root, iter(children(root)))]
+    while stack:
+        item, pending = stack[-1]
+        for child in pending:
+            if skip is None or not skip(child):
+                stack.append((child, iter(children(child))))
+                break
+        else:
+            stack.pop()
+            yield item
+
+
+# Nome alternativo usado nos métodos que têm um argumento chamado `postorder`
+_postorder = postorder
+
+
+def _visit_items(obj: Any) -> Iterator[Any]:
+    """
+    Itens visitados por `Node.visit` abaixo de um objeto: os valores dos
+    atributos de um nó, com listas substituídas pelos seus elementos.
+    """
+    if not isinstance(obj, Node):
+        return
+    for name in field_names(type(obj)):
+        value = getattr(obj, name)
+        if isinstance(value, SEQUENCES):
+            yield from value
+        else:
+            yield value
+
+
+@cache
+def field_names(cls: type) -> tuple[str, ...]:
+    """
+    Retorna os nomes dos atributos declarados em uma classe de nó, na ordem de
+    declaração.
+
+    O resultado é calculado uma única vez por classe. Funciona tanto para
+    dataclasses (com ou sem __slots__) quanto para classes que apenas anotam
+    seus atributos.
+    """
+    if is_dataclass(cls):
+        return tuple(f.name for f in fields(cls))
+    return tuple(getattr(cls, "__annotations__", {}))
+
+
 @singledispatch
 def pretty(obj: Any) -> str:
     """
@@ -512,9 +793,9 @@ def can_print_as_leaf(node: Node) -> bool:
     """
     while node:
         args = []
-        for attr in node.__annotations__:
+        for attr in field_names(type(node)):
             obj = getattr(node, attr)
-            if isinstance(obj, (list, tuple)) and obj:
+            if isinstance(obj, SEQUENCES) and obj:
                 return False
             elif isinstance(obj, Node):
                 args.append(obj)
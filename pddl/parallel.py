@@ -0,0 +1,256 @@
+"""
+Análise em paralelo de arquivos de problema grandes.
+
+Um problema tem três regiões quase independentes (``:objects``, ``:init`` e
+``:goal``) e, em problemas grandes, ``:init`` ocupa quase todo o arquivo.
+Neste modo, o arquivo é mapeado em memória e o corpo de ``:init`` é dividido,
+por uma contagem de parênteses, em trechos que terminam entre dois fatos.
+Cada trecho é analisado em um processo separado, que lê o trecho do mesmo
+arquivo mapeado e devolve um `FactStore` (arrays de inteiros e uma tabela de
+nomes, baratos de serializar). Os armazenamentos são concatenados na ordem do
+arquivo e o problema resultante é validado e avaliado normalmente.
+
+O restante do arquivo (o "esqueleto", sem o corpo de ``:init``) é analisado no
+processo principal. Se a divisão encontrar qualquer irregularidade, ou se
+algum trecho tiver erros de sintaxe, o arquivo inteiro é analisado por
+`pddl.parser.parse`, de modo que as mensagens de erro são as mesmas do modo
+normal.
+"""
+
+import mmap
+import os
+import re
+from typing import TYPE_CHECKING
+
+from . import cache, parser
+from .ast import Problem, Program
+from .ctx import Ctx
+from .facts import FactStore
+
+if TYPE_CHECKING:
+    from .diagnostics import Diagnostics
+
+# Tamanho mínimo, em bytes, de um trecho de :init. Arquivos menores que isso
+# são analisados em um único processo.
+MIN_CHUNK = 1 << 20
+
+# Número de trechos por processo, para equilibrar a carga entre eles
+CHUNKS_PER_JOB = 4
+
+TOKEN_RE = re.compile(rb"[()]|;[^\n]*")
+COMMENT_RE = re.compile(rb";[^\n]*")
+KEYWORD_RE = re.compile(rb"\s*(:?[a-z0-9_-]+)")
+
+
+def parse_problem(path: str, jobs: int | None = None, chunk_size: int | None = None) -> Program:
+    """
+    Analisa um arquivo de problema, dividindo a seção ``:init`` entre até
+    `jobs` processos (por padrão, o número de CPUs).
+
+    Retorna a mesma árvore que `pddl.parser.parse` retornaria para o conteúdo
+    do arquivo, já validada por `process_tree`.
+    """
+    jobs = jobs or os.cpu_count() or 1
+    with open(path, "rb") as fd:
+        if os.fstat(fd.fileno()).st_size == 0:
+            return parser.parse("")
+        with mmap.mmap(fd.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            if chunk_size is None:
+                chunk_size = max(MIN_CHUNK, len(buf) // (jobs * CHUNKS_PER_JOB))
+            program = parse_mapped(path, buf, jobs, chunk_size)
+            if program is None:
+                program = parser.parse(buf[:].decode())
+    return program
+
+
+def eval_problem(
+    path: str,
+    ctx: Ctx,
+    file_path: str | None = None,
+    diagnostics: "Diagnostics | None" = None,
+    jobs: int | None = None,
+) -> Ctx:
+    """
+    Analisa o problema com `parse_problem` e o avalia em `ctx`, como
+    `Problem.eval`.
+    """
+    parse_problem(path, jobs).eval(ctx, file_path, diagnostics)
+    return ctx
+
+
+def parse_mapped(path: str, buf: mmap.mmap, jobs: int, chunk_size: int) -> Program | None:
+    """
+    Analisa o arquivo mapeado em `buf`. Retorna `None` se o arquivo tiver
+    qualquer irregularidade e precisar ser analisado inteiro.
+    """
+    start = find_init(buf)
+    if start is None:
+        return None
+    split = split_init(buf, start, chunk_size)
+    if split is None:
+        return None
+    end, cuts = split
+
+    # Linha e coluna (em caracteres) do início de cada trecho e do parêntese
+    # que fecha a seção
+    positions = []
+    line = 1
+    last = 0
+    for pos in [*cuts, end]:
+        line += buf[last:pos].count(b"\n")
+        line_start = buf.rfind(b"\n", 0, pos) + 1
+        positions.append((line, len(buf[line_start:pos].decode()) + 1))
+        last = pos
+
+    engine = parser.ENGINE
+    no_cache = not cache.is_enabled()
+    chunks = [
+        (path, a, b, line, column, engine, no_cache)
+        for a, b, (line, column) in zip(cuts, [*cuts[1:], end], positions)
+    ]
+    try:
+        program = parse_skeleton(buf, start, end, positions[0], positions[-1], engine)
+        if len(chunks) == 1 or jobs == 1:
+            stores = [parse_chunk(*chunk) for chunk in chunks]
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor(max_workers=min(jobs, len(chunks))) as executor:
+                stores = list(executor.map(parse_chunk, *zip(*chunks)))
+    except Exception:
+        # Erros de sintaxe são reportados pela análise do arquivo inteiro
+        return None
+
+    init = stores[0]
+    for store in stores[1:]:
+        init.merge(store)
+    program.source.init = init
+    program.process_tree()
+    return program
+
+
+def find_init(buf: mmap.mmap) -> int | None:
+    """
+    Retorna a posição logo após a palavra-chave ``:init`` da seção de nível
+    superior correspondente, ou `None` se ela não existir.
+    """
+    depth = 0
+    for m in TOKEN_RE.finditer(buf):
+        token = m.group()
+        if token == b"(":
+            depth += 1
+            if depth == 2:
+                keyword = KEYWORD_RE.match(buf, m.end())
+                if keyword is not None and keyword.group(1) == b":init":
+                    return keyword.end()
+        elif token == b")":
+            depth -= 1
+            if depth <= 0:
+                return None
+    return None
+
+
+def split_init(buf: mmap.mmap, start: int, chunk_size: int) -> tuple[int, list[int]] | None:
+    """
+    Encontra o fim do corpo de ``:init``, que começa em `start`, e o divide em
+    trechos de aproximadamente `chunk_size` bytes que terminam entre dois
+    fatos.
+
+    Retorna a posição do parêntese que fecha a seção e as posições de início
+    dos trechos, ou `None` se a seção não for fechada.
+    """
+    cuts = [start]
+    size = len(buf)
+    pos = start
+    depth = 0
+    while pos < size:
+        # Blocos terminam no início de uma linha, para não dividir comentários
+        stop = buf.find(b"\n", min(pos + chunk_size, size)) + 1 or size
+        block = buf[pos:stop]
+        if b";" in block:
+            block = COMMENT_RE.sub(b"", block)
+        closes = block.count(b")")
+        if closes > depth:
+            # A seção pode terminar neste bloco: procura a posição exata
+            pos, depth = scan(buf, pos, stop, depth)
+        else:
+            depth += block.count(b"(") - closes
+            pos = stop
+        if depth > 0:
+            # Avança até o fim do fato corrente
+            pos, depth = scan(buf, pos, size, depth, boundary=True)
+        if depth < 0:
+            return pos, cuts
+        if depth == 0 and pos < size:
+            cuts.append(pos)
+    return None
+
+
+def scan(buf: mmap.mmap, pos: int, stop: int, depth: int, boundary: bool = False) -> tuple[int, int]:
+    """
+    Acompanha a profundidade dos parênteses de `pos` até `stop`.
+
+    Retorna a posição em que parou e a profundidade nesse ponto: -1 no
+    parêntese que fecha a seção e, se `boundary` for verdadeiro, 0 logo após
+    o primeiro fato completado.
+    """
+    for m in TOKEN_RE.finditer(buf, pos, stop):
+        token = m.group()
+        if token == b"(":
+            depth += 1
+        elif token == b")":
+            depth -= 1
+            if depth < 0:
+                return m.start(), -1
+            if boundary and depth == 0:
+                return m.end(), 0
+    return stop, depth
+
+
+def parse_skeleton(
+    buf: mmap.mmap,
+    start: int,
+    end: int,
+    start_position: tuple[int, int],
+    end_position: tuple[int, int],
+    engine: str,
+) -> Program:
+    """
+    Analisa o arquivo sem o corpo de ``:init`` (entre `start` e `end`).
+
+    O corpo é substituído por uma quebra de linha e espaços, de modo que a
+    seção ``:goal`` mantém suas colunas; as linhas são corrigidas depois.
+    """
+    head = buf[:start].decode()
+    tail = buf[end:].decode()
+    (start_line, start_column), (end_line, end_column) = start_position, end_position
+    if end_line > start_line:
+        skeleton = head + "\n" + " " * (end_column - 1) + tail
+    else:
+        skeleton = head + " " * (end_column - start_column) + tail
+    program = parser.parse_text(skeleton, "start", engine)
+    if not isinstance(program, Program) or not isinstance(program.source, Problem):
+        raise ValueError("o arquivo não é um problema")
+    if end_line > start_line:
+        program.source.goal.shift_lines(end_line - start_line - 1)
+    return program
+
+
+def parse_chunk(
+    path: str, start: int, end: int, line: int, column: int, engine: str, no_cache: bool = False
+) -> FactStore:
+    """
+    Analisa um trecho do corpo de ``:init``, que começa na linha e coluna
+    dadas. Executada nos processos auxiliares, que recebem do processo
+    principal o analisador e o estado do cache em disco (`cache.disable` não é
+    herdado por processos criados com "spawn").
+    """
+    if no_cache:
+        cache.disable()
+    with open(path, "rb") as fd, mmap.mmap(fd.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+        text = buf[start:end].decode()
+    # O trecho é analisado como uma seção :init própria, com a primeira linha
+    # recuada até a coluna original
+    store = parser.parse_text("(:init\n" + " " * (column - 1) + text + ")", "init", engine)
+    store.shift_lines(line - 2)
+    return store
@@ -5,32 +5,127 @@ Define a gramática da Linguagem e funções para realizar a análise sintática
 análise léxica, etc.
 """
 
+from functools import cache as memoize
 from pathlib import Path
-from typing import Iterator
-
-from lark import Lark, Token, Tree
+from typing import TYPE_CHECKING, Iterator
 
+from . import cache
 from .ast import Expr, Program
-from .transformer import PDDLTransformer
+
+if TYPE_CHECKING:
+    from lark import Lark, Token, Tree
 
 DIR = Path(__file__).parent
 GRAMMAR_PATH = DIR / "grammar.lark"
+TRANSFORMER_PATH = DIR / "transformer.py"
+
+# Regras que podem ser usadas como ponto de partida da análise. Além do
+# programa completo, seções isoladas do problema e do domínio podem ser
+# analisadas separadamente (veja os módulos `pddl.stream`, `pddl.parallel` e
+# `pddl.lsp`).
+START = [
+    "start", "define_problem", "domain_ref", "objects", "init", "call", "goal",
+    "define_domain", "requirements", "types", "constants_def", "predicate_def", "action",
+]
+
+# Analisador usado por `parse` e `parse_text`: "lark" (referência) ou "fast"
+# (veja o módulo `pddl.fastparser`).
+ENGINES = ("lark", "fast")
+ENGINE = "lark"
+
+
+@memoize
+def parser_state() -> dict:
+    """
+    Retorna o estado serializado do parser LALR (tabelas, terminais e regras).
+
+    Construir as tabelas a partir da gramática é a parte mais cara da
+    inicialização. Por isso, o estado é gravado no cache em disco, com uma
+    chave que depende do conteúdo da gramática, do transformer e da versão do
+    Lark. Qualquer alteração nesses arquivos invalida o cache automaticamente.
+    """
+    import lark
+    from lark.grammar import Rule
+    from lark.lexer import TerminalDef
+
+    key = cache.make_key(
+        GRAMMAR_PATH, TRANSFORMER_PATH, lark.__version__, " ".join(START)
+    )
+    state = cache.load("parser", key)
+    if state is None:
+        parser = lark.Lark(GRAMMAR_PATH.read_text(), parser="lalr", start=START)
+        data, memo = parser.memo_serialize([TerminalDef, Rule])
+        state = {"data": data, "memo": memo}
+        cache.store("parser", key, state)
+    return state
+
+
+def load_parser(state: dict, **options) -> "Lark":
+    """
+    Cria uma instância do Lark a partir do estado retornado por `parser_state`.
+
+    Os parsers de AST e de CST compartilham as mesmas tabelas e diferem apenas
+    no transformer, que pode ser passado em `options`.
+    """
+    from lark import Lark
+
+    return Lark._load_from_dict(state["data"], state["memo"], **options)
+
+
+@memoize
+def get_parser(kind: str = "ast") -> "Lark":
+    """
+    Retorna o parser do tipo pedido, construindo-o no primeiro uso.
+
+    O parser "ast" aplica o `PDDLTransformer` durante a análise e produz nós
+    da AST. O parser "cst" produz as árvores do Lark e só é necessário nos
+    modos de depuração.
+    """
+    if kind == "ast":
+        from .transformer import PDDLTransformer
+
+        return load_parser(parser_state(), transformer=PDDLTransformer())
+    elif kind == "cst":
+        from .transformer import CSTTransformer
+
+        return load_parser(parser_state(), transformer=CSTTransformer())
+    raise ValueError(f"tipo de parser desconhecido: {kind!r}")
+
+
+def __getattr__(name: str):
+    # Mantém `ast_parser` e `cst_parser` acessíveis como atributos do módulo,
+    # mas só os constrói quando forem realmente usados.
+    if name in ("ast_parser", "cst_parser"):
+        return get_parser(name.removesuffix("_parser"))
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
+def set_engine(name: str) -> None:
+    """
+    Escolhe o analisador usado por padrão em `parse` e `parse_text`.
+    """
+    global ENGINE
+    if name not in ENGINES:
+        raise ValueError(f"analisador desconhecido: {name!r}")
+    ENGINE = name
+
+
+def parse_text(src: str, start: str = "start", engine: str | None = None):
+    """
+    Analisa `src` a partir da regra `start` e retorna os nós da AST, sem
+    validá-los com `process_tree`.
+
+    O analisador "fast" produz exatamente os mesmos nós que o Lark e recorre a
+    ele em construções que não suporta e em erros de sintaxe.
+    """
+    if (engine or ENGINE) == "fast":
+        from .fastparser import parse_fast
 
-ast_parser = Lark(
-    GRAMMAR_PATH.open(),
-    transformer=PDDLTransformer(),
-    parser="lalr",
-    start=["start"],
-)
-cst_parser = Lark(
-    GRAMMAR_PATH.open(),
-    parser="lalr",
-    start=["start"],
-)
+        return parse_fast(src, start)
+    return get_parser("ast").parse(src, start=start)
 
 
-def parse(src: str) -> Program:
+def parse(src: str, engine: str | None = None) -> Program:
     """
     Função que recebe um código fonte e retorna a árvore sintática.
 
@@ -41,11 +136,13 @@ def parse(src: str) -> Program:
     Args:
         src (str):
             Código fonte a ser analisado.
+        engine (str | None):
+            Analisador a ser usado ("lark" ou "fast"). Por padrão, usa o
+            escolhido com `set_engine`.
     """
-    tree = ast_parser.parse(src, start="start")
+    tree = parse_text(src, "start", engine)
     assert isinstance(tree, Program), f"Esperava um Program, mas recebi {type(tree)}"
-    tree.validate_tree()
-    tree.desugar_tree()
+    tree.process_tree()
     return tree
 
 
@@ -70,14 +167,13 @@ def parse_expr(src: str) -> Expr:
         >>> parse_expr("1 + 2 * 3").eval(Ctx())
         7
     """
-    tree = ast_parser.parse(src, start="expr")
+    tree = get_parser("ast").parse(src, start="expr")
     assert isinstance(tree, Expr), f"Esperava um Expr, mas recebi {type(tree)}"
-    tree.validate_tree()
-    tree.desugar_tree()
+    tree.process_tree()
     return tree
 
 
-def parse_cst(src: str, expr: bool = False) -> Tree:
+def parse_cst(src: str, expr: bool = False) -> "Tree":
     """
     Similar a função `parse`, mas retorna a árvore sintática produzida pelo
     Lark.
@@ -92,11 +188,11 @@ def parse_cst(src: str, expr: bool = False) -> Tree:
             Se True, analisa o código como se fosse apenas uma expressão.
     """
     start = "expr" if expr else "start"
-    return cst_parser.parse(src, start=start)
+    return get_parser("cst").parse(src, start=start)
 
 
-def lex(src: str) -> Iterator[Token]:
+def lex(src: str) -> Iterator["Token"]:
     """
     Retorna um iterador sobre os tokens do código fonte.
     """
-    return ast_parser.lex(src)
+    return get_parser("ast").lex(src)
@@ -0,0 +1,413 @@
+"""
+Perfil de execução do verificador.
+
+Um `Profiler` ativo (usado como gerenciador de contexto) instrumenta o
+verificador e registra:
+
+- o tempo de relógio e de CPU de cada fase: leitura dos arquivos, análise
+  sintática, validação da árvore e avaliação;
+- dentro da análise sintática, o tempo gasto no lexer, nos callbacks do
+  `PDDLTransformer` e, por diferença, no parser LALR;
+- o número de chamadas e o tempo de `eval` por tipo de nó (`Call`, `Action`,
+  `Forall`, ...);
+- o número de consultas a nomes nos contextos (`Ctx` e `FlatCtx`);
+- opcionalmente, um arquivo do ``cProfile`` que pode ser lido com ``pstats``.
+
+A instrumentação só existe enquanto o perfil estiver ativo: ao sair do bloco
+``with``, os métodos originais são restaurados.
+
+Outros módulos marcam fases com `phase`, que não faz nada se não houver um
+perfil ativo. Para reagir aos eventos (por exemplo, para enviar métricas a
+outro sistema), crie uma subclasse de `Profiler` e sobrescreva os ganchos
+`on_phase` e `on_eval`:
+
+    class Printer(Profiler):
+        def on_phase(self, name, wall, cpu):
+            super().on_phase(name, wall, cpu)
+            print(name, wall)
+
+    with Printer():
+        ...
+"""
+
+import time
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass
+from typing import Any, Callable, ContextManager, Iterator
+
+from .ctx import Ctx, FlatCtx
+from .node import Node
+
+# Perfil ativo no momento, se houver
+ACTIVE: "Profiler | None" = None
+
+# Ordem das fases no relatório. As fases internas à análise sintática
+# aparecem indentadas.
+REPORT_ORDER = ["read", "parse", "lex", "lalr", "transform", "validate", "eval"]
+PARSE_PHASES = ("lex", "lalr", "transform")
+
+
+@dataclass
+class PhaseStats:
+    """
+    Tempo acumulado de uma fase, em segundos.
+    """
+
+    calls: int = 0
+    wall: float = 0.0
+    cpu: float = 0.0
+
+
+@dataclass
+class EvalStats:
+    """
+    Chamadas de `eval` de um tipo de nó.
+
+    `total` inclui o tempo gasto nos filhos (contando apenas a chamada mais
+    externa, em caso de recursão) e `own` exclui esse tempo.
+    """
+
+    calls: int = 0
+    total: float = 0.0
+    own: float = 0.0
+    active: int = 0
+
+
+def current() -> "Profiler | None":
+    """
+    Retorna o perfil ativo, se houver.
+    """
+    return ACTIVE
+
+
+def phase(name: str) -> ContextManager:
+    """
+    Marca uma fase no perfil ativo. Sem perfil ativo, não faz nada.
+    """
+    if ACTIVE is None:
+        return nullcontext()
+    return ACTIVE.phase(name)
+
+
+class Profiler:
+    """
+    Coleta o perfil de uma execução do verificador.
+
+    Se `cprofile` for dado, a execução também é medida pelo ``cProfile`` e as
+    estatísticas são gravadas nesse arquivo ao final.
+    """
+
+    def __init__(self, cprofile: str | None = None):
+        self.cprofile = cprofile
+        self.phases: dict[str, PhaseStats] = {}
+        self.nodes: dict[str, EvalStats] = {}
+        self.lookups = 0
+        self.scope_probes = 0
+        self._eval_stack: list[float] = []
+        self._lookup_depth = 0
+        self._eval_start = (0.0, 0.0)
+        self._patches: list[tuple[Any, str, Any]] = []
+        self._callbacks: tuple[dict, dict] | None = None
+        self._profile = None
+
+    #
+    # Ganchos
+    #
+
+    def on_phase(self, name: str, wall: float, cpu: float) -> None:
+        """
+        Chamado ao final de cada fase com os tempos de relógio e de CPU. Fases
+        internas à análise sintática (``lex`` e ``transform``) não têm tempo
+        de CPU medido e recebem ``cpu=0``.
+        """
+        stats = self.phases.get(name)
+        if stats is None:
+            stats = self.phases[name] = PhaseStats()
+        stats.calls += 1
+        stats.wall += wall
+        stats.cpu += cpu
+
+    def on_eval(self, node: Node, total: float, own: float) -> None:
+        """
+        Chamado após cada `eval`, com o tempo total e o tempo próprio (sem os
+        filhos) da chamada.
+        """
+        stats = self._node_stats(type(node).__name__)
+        stats.calls += 1
+        stats.own += own
+        if stats.active == 0:
+            stats.total += total
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """
+        Mede o tempo de relógio e de CPU gasto dentro do bloco.
+        """
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            self.on_phase(name, time.perf_counter() - wall, time.process_time() - cpu)
+
+    #
+    # Instrumentação
+    #
+
+    def __enter__(self) -> "Profiler":
+        global ACTIVE
+        if ACTIVE is not None:
+            raise RuntimeError("já existe um perfil ativo")
+        ACTIVE = self
+        self._instrument_parser()
+        self._instrument_nodes()
+        self._instrument_ctx()
+        if self.cprofile is not None:
+            import cProfile
+
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        global ACTIVE
+        if self._profile is not None:
+            self._profile.disable()
+            self._profile.dump_stats(self.cprofile)
+            self._profile = None
+        for obj, name, value in reversed(self._patches):
+            if value is None:
+                delattr(obj, name)
+            else:
+                setattr(obj, name, value)
+        self._patches.clear()
+        if self._callbacks is not None:
+            callbacks, self._callbacks = self._callbacks, None
+            self._restore_callbacks(callbacks)
+        ACTIVE = None
+
+    def _patch(self, obj: Any, name: str, value: Any) -> None:
+        # Guarda `None` para atributos que só existem na classe, de modo que a
+        # restauração remova o atributo da instância
+        original = obj.__dict__.get(name) if isinstance(obj, type) else vars(obj).get(name)
+        self._patches.append((obj, name, original))
+        setattr(obj, name, value)
+
+    def _instrument_parser(self) -> None:
+        from .parser import get_parser
+
+        parser = get_parser("ast")
+        frontend = parser.parser
+        parse = parser.parse
+        profiler = self
+
+        def timed_parse(*args, **kwargs):
+            with profiler.phase("parse"):
+                return parse(*args, **kwargs)
+
+        self._patch(parser, "parse", timed_parse)
+        self._patch(frontend, "lexer", TimedLexer(frontend.lexer, self))
+
+        # Os callbacks das regras e terminais ficam em um dicionário
+        # compartilhado com o parser LALR, modificado no próprio lugar
+        callbacks = frontend.parser.parser.callbacks
+        self._callbacks = (callbacks, dict(callbacks))
+        for key, callback in callbacks.items():
+            callbacks[key] = self._timed_callback(callback)
+
+        # O analisador "fast" faz análise e construção dos nós de uma vez; o
+        # recurso ao Lark é medido pelo `parse` do Lark acima
+        from .fastparser import FastParser
+
+        fast_parse = FastParser.parse
+
+        def timed_fast_parse(*args, **kwargs):
+            with profiler.phase("parse"):
+                return fast_parse(*args, **kwargs)
+
+        self._patch(FastParser, "parse", timed_fast_parse)
+
+    def _restore_callbacks(self, saved: tuple[dict, dict]) -> None:
+        callbacks, original = saved
+        callbacks.clear()
+        callbacks.update(original)
+
+    def _timed_callback(self, callback: Callable) -> Callable:
+        on_phase = self.on_phase
+
+        def timed(*args):
+            start = time.perf_counter()
+            try:
+                return callback(*args)
+            finally:
+                on_phase("transform", time.perf_counter() - start, 0.0)
+
+        return timed
+
+    def _instrument_nodes(self) -> None:
+        process_tree = Node.process_tree
+        profiler = self
+
+        def timed_process_tree(node, *args, **kwargs):
+            with profiler.phase("validate"):
+                return process_tree(node, *args, **kwargs)
+
+        self._patch(Node, "process_tree", timed_process_tree)
+
+        stack = [Node]
+        while stack:
+            cls = stack.pop()
+            stack.extend(cls.__subclasses__())
+            if "eval" in cls.__dict__:
+                self._patch(cls, "eval", self._timed_eval(cls.__dict__["eval"]))
+
+    def _timed_eval(self, eval: Callable) -> Callable:
+        profiler = self
+        eval_stack = self._eval_stack
+
+        def timed_eval(node, *args, **kwargs):
+            if not eval_stack:
+                profiler._eval_start = (time.perf_counter(), time.process_time())
+            stats = profiler._node_stats(type(node).__name__)
+            stats.active += 1
+            eval_stack.append(0.0)
+            start = time.perf_counter()
+            try:
+                return eval(node, *args, **kwargs)
+            finally:
+                total = time.perf_counter() - start
+                children = eval_stack.pop()
+                stats.active -= 1
+                profiler.on_eval(node, total, total - children)
+                if eval_stack:
+                    eval_stack[-1] += total
+                else:
+                    wall, cpu = profiler._eval_start
+                    profiler.on_phase(
+                        "eval", time.perf_counter() - wall, time.process_time() - cpu
+                    )
+
+        return timed_eval
+
+    def _node_stats(self, name: str) -> EvalStats:
+        stats = self.nodes.get(name)
+        if stats is None:
+            stats = self.nodes[name] = EvalStats()
+        return stats
+
+    def _instrument_ctx(self) -> None:
+        profiler = self
+
+        # `Ctx.__getitem__` sobe pela cadeia de escopos recursivamente: cada
+        # nível conta como uma sondagem, mas só a chamada externa é uma consulta
+        def wrap_getitem(getitem):
+            def timed_getitem(ctx, name):
+                profiler.scope_probes += 1
+                if profiler._lookup_depth:
+                    return getitem(ctx, name)
+                profiler.lookups += 1
+                profiler._lookup_depth += 1
+                try:
+                    return getitem(ctx, name)
+                finally:
+                    profiler._lookup_depth -= 1
+
+            return timed_getitem
+
+        def wrap_contains(contains):
+            def timed_contains(ctx, name):
+                if not profiler._lookup_depth:
+                    profiler.lookups += 1
+                return contains(ctx, name)
+
+            return timed_contains
+
+        for cls in (Ctx, FlatCtx):
+            self._patch(cls, "__getitem__", wrap_getitem(cls.__dict__["__getitem__"]))
+            self._patch(cls, "__contains__", wrap_contains(cls.__dict__["__contains__"]))
+
+    #
+    # Relatório
+    #
+
+    def to_dict(self) -> dict:
+        """
+        Retorna o perfil como um dicionário pronto para ser serializado.
+        """
+        phases = {name: vars(stats).copy() for name, stats in self.phases.items()}
+        # Só o Lark tem as etapas de lexer e LALR (o analisador "fast" não)
+        if "lex" in phases:
+            inner = sum(phases.get(name, {}).get("wall", 0.0) for name in ("lex", "transform"))
+            phases["lalr"] = {"calls": phases["parse"]["calls"], "wall": phases["parse"]["wall"] - inner, "cpu": 0.0}
+        nodes = {
+            name: {"calls": stats.calls, "total": stats.total, "own": stats.own}
+            for name, stats in sorted(self.nodes.items(), key=lambda item: -item[1].own)
+            if stats.calls
+        }
+        return {
+            "phases": phases,
+            "nodes": nodes,
+            "lookups": self.lookups,
+            "scope_probes": self.scope_probes,
+        }
+
+    def report(self) -> str:
+        """
+        Formata o perfil como um relatório em texto.
+        """
+        data = self.to_dict()
+        phases = data["phases"]
+        lines = [f"{'fase':<14}{'chamadas':>10}{'relógio':>12}{'CPU':>12}"]
+        order = REPORT_ORDER + [name for name in phases if name not in REPORT_ORDER]
+        for name in order:
+            if name not in phases:
+                continue
+            stats = phases[name]
+            label = f"  {name}" if name in PARSE_PHASES else name
+            cpu = f"{stats['cpu'] * 1000:>10.2f}ms" if stats["cpu"] else f"{'-':>12}"
+            lines.append(f"{label:<14}{stats['calls']:>10}{stats['wall'] * 1000:>10.2f}ms{cpu}")
+
+        lines.append("")
+        lines.append(f"{'nó':<14}{'chamadas':>10}{'total':>12}{'próprio':>12}")
+        for name, stats in data["nodes"].items():
+            lines.append(
+                f"{name:<14}{stats['calls']:>10}{stats['total'] * 1000:>10.2f}ms{stats['own'] * 1000:>10.2f}ms"
+            )
+
+        lines.append("")
+        lines.append(f"consultas a nomes: {self.lookups} ({self.scope_probes} escopos visitados)")
+        if self.cprofile is not None:
+            lines.append(f"estatísticas do cProfile gravadas em {self.cprofile}")
+        return "\n".join(lines)
+
+
+class TimedLexer:
+    """
+    Envolve o lexer do Lark e mede o tempo gasto produzindo cada token.
+
+    O parser LALR pede os tokens um a um, intercalando a análise léxica com a
+    sintática; o tempo de cada token é acumulado na fase ``lex``.
+    """
+
+    def __init__(self, lexer, profiler: Profiler):
+        self.lexer = lexer
+        self.profiler = profiler
+
+    def lex(self, *args):
+        tokens = self.lexer.lex(*args)
+        on_phase = self.profiler.on_phase
+        elapsed = 0.0
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    token = next(tokens)
+                except StopIteration:
+                    return
+                finally:
+                    elapsed += time.perf_counter() - start
+                yield token
+        finally:
+            on_phase("lex", elapsed, 0.0)
+
+    def __getattr__(self, name: str):
+        return getattr(self.lexer, name)
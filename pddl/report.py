@@ -0,0 +1,278 @@
+"""
+Saída estruturada (JSON / NDJSON) do verificador.
+
+Cada arquivo verificado produz um registro (`FileReport`) com o resultado, os
+erros encontrados, contagens das declarações e o tempo gasto em cada fase da
+verificação. Os registros são escritos assim que cada arquivo termina, de modo
+que lotes grandes podem ser consumidos aos poucos:
+
+- ``ndjson``: um objeto JSON por linha.
+- ``json``: uma lista JSON, escrita um elemento por vez.
+
+As mensagens de sucesso impressas por `Domain.eval` e `Problem.eval` são
+descartadas; o resultado fica no campo ``status``.
+"""
+
+import io
+import json
+import sys
+import time
+from contextlib import contextmanager, redirect_stdout
+from dataclasses import asdict, dataclass, field
+from typing import IO, Iterator
+
+from . import cache
+from .ctx import Ctx
+from .diagnostics import Diagnostics, TooManyErrors
+from .errors import PDDLError
+from .node import Node
+from .parallel import parse_problem
+from .parser import parse
+from .profiling import phase
+from .runner import domain_ctx
+
+FORMATS = ("json", "ndjson")
+
+
+@dataclass
+class ErrorInfo:
+    """
+    Um erro encontrado na verificação de um arquivo.
+
+    `error` é o nome da classe da exceção (normalmente uma das classes de
+    `pddl.errors`).
+    """
+
+    error: str
+    message: str
+    line: int | None = None
+    column: int | None = None
+    file: str | None = None
+
+    @classmethod
+    def from_exception(cls, exc: Exception, file_path: str | None = None) -> "ErrorInfo":
+        if isinstance(exc, PDDLError):
+            return cls(type(exc).__name__, exc.msg, exc.line, exc.column, exc.file_path or file_path)
+        # Erros de sintaxe do Lark também informam linha e coluna
+        line = getattr(exc, "line", None)
+        column = getattr(exc, "column", None)
+        return cls(type(exc).__name__, str(exc), line, column, file_path)
+
+
+@dataclass
+class FileReport:
+    """
+    Resultado da verificação de um arquivo de domínio ou de problema.
+
+    Os campos `error`, `message`, `line` e `column` repetem o primeiro erro de
+    `errors`. Os tempos em `timings` são dados em segundos. As contagens em
+    `counts` são preenchidas sempre que o arquivo é analisado, mesmo que a
+    avaliação encontre erros.
+    """
+
+    file: str
+    kind: str
+    status: str = "ok"
+    error: str | None = None
+    message: str | None = None
+    line: int | None = None
+    column: int | None = None
+    errors: list[ErrorInfo] = field(default_factory=list)
+    counts: dict[str, int] = field(default_factory=dict)
+    timings: dict[str, float] = field(default_factory=dict)
+    cached: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.status == "ok"
+
+    def add_error(self, info: ErrorInfo) -> None:
+        if not self.errors:
+            self.error = info.error
+            self.message = info.message
+            self.line = info.line
+            self.column = info.column
+        self.errors.append(info)
+        self.status = "error"
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """
+        Mede o tempo gasto dentro do bloco e o acumula na fase `name`.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = self.timings.get(name, 0.0) + time.perf_counter() - start
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "FileReport":
+        """
+        Reconstrói um registro a partir do resultado de `to_dict`.
+        """
+        errors = [ErrorInfo(**error) for error in data.get("errors", ())]
+        return cls(**{**data, "errors": errors})
+
+
+class ReportWriter:
+    """
+    Escreve registros em `out` no formato ``json`` ou ``ndjson``, um de cada
+    vez. Deve ser usado como gerenciador de contexto, para fechar a lista JSON.
+    """
+
+    def __init__(self, format: str, out: IO[str] | None = None):
+        if format not in FORMATS:
+            raise ValueError(f"formato desconhecido: {format}")
+        self.format = format
+        self.out = sys.stdout if out is None else out
+        self.count = 0
+
+    def write(self, report: FileReport) -> None:
+        data = json.dumps(report.to_dict(), ensure_ascii=False)
+        if self.format == "ndjson":
+            self.out.write(data + "\n")
+        else:
+            self.out.write(("[\n" if self.count == 0 else ",\n") + data)
+        self.count += 1
+        self.out.flush()
+
+    def close(self) -> None:
+        if self.format == "json":
+            self.out.write("[]\n" if self.count == 0 else "\n]\n")
+            self.out.flush()
+
+    def __enter__(self) -> "ReportWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def check_domain(
+    path: str,
+    flat: bool = False,
+    max_errors: int | None = None,
+    source: str | None = None,
+) -> tuple[FileReport, Ctx | None]:
+    """
+    Verifica um arquivo de domínio, como `pddl.runner.verify_domain`, e retorna
+    o registro e o contexto resultante (`None` se o domínio tiver erros).
+
+    Se `source` for dado, o arquivo não é lido e `path` serve apenas para
+    identificá-lo nos registros e mensagens.
+    """
+    report = FileReport(path, "domain")
+    ctx = None
+    start = time.perf_counter()
+    try:
+        if source is None:
+            with report.phase("read"), phase("read"):
+                with open(path, "r") as fd:
+                    source = fd.read()
+        variant = "flat" if flat else "chain"
+        with report.phase("cache"):
+            cached = cache.load_domain(source, variant)
+        if cached is not None:
+            report.cached = True
+            ast, ctx = cached
+        else:
+            with report.phase("parse"):
+                ast = parse(source)
+        # As contagens dependem apenas da análise e são registradas mesmo que
+        # a avaliação encontre erros
+        domain = ast.source
+        report.counts = {
+            "requirements": len(domain.requirements),
+            "types": len(domain.types),
+            "constants": len(domain.constants),
+            "predicates": len(domain.predicates),
+            "actions": len(domain.actions),
+        }
+        if cached is None:
+            with report.phase("eval"):
+                ctx = evaluate(ast, domain_ctx(flat), path, report, max_errors)
+            if report.ok:
+                cache.store_domain(source, ast, ctx, variant)
+    except Exception as e:
+        report.add_error(ErrorInfo.from_exception(e, path))
+    report.timings["total"] = time.perf_counter() - start
+    return report, ctx if report.ok else None
+
+
+def check_problem(
+    path: str,
+    ctx: Ctx,
+    max_errors: int | None = None,
+    stream: bool = False,
+    parallel: bool = False,
+    jobs: int | None = None,
+    source: str | None = None,
+) -> FileReport:
+    """
+    Verifica um arquivo de problema no contexto `ctx` de um domínio.
+
+    No modo streaming, leitura, análise e avaliação acontecem juntas e são
+    medidas como uma única fase ``eval``; as contagens não são calculadas. No
+    modo paralelo (veja `pddl.parallel`), a leitura faz parte da fase
+    ``parse``.
+
+    Se `source` for dado, o arquivo não é lido e o modo paralelo, que depende
+    do arquivo mapeado em memória, é ignorado.
+    """
+    from .stream import eval_problem as stream_eval
+
+    report = FileReport(path, "problem")
+    start = time.perf_counter()
+    try:
+        if stream:
+            diagnostics = None if max_errors is None else Diagnostics(max_errors)
+            fd = open(path, "r") if source is None else io.StringIO(source)
+            with report.phase("eval"), fd:
+                collect(lambda: stream_eval(fd, ctx, path, diagnostics), report, diagnostics)
+        else:
+            if parallel and source is None:
+                with report.phase("parse"):
+                    ast = parse_problem(path, jobs)
+            else:
+                if source is None:
+                    with report.phase("read"), phase("read"):
+                        with open(path, "r") as fd:
+                            source = fd.read()
+                with report.phase("parse"):
+                    ast = parse(source)
+            problem = ast.source
+            report.counts = {
+                "objects": len(problem.objects),
+                "init": len(problem.init),
+                "goal": len(problem.goal),
+            }
+            with report.phase("eval"):
+                evaluate(ast, ctx, path, report, max_errors)
+    except Exception as e:
+        report.add_error(ErrorInfo.from_exception(e, path))
+    report.timings["total"] = time.perf_counter() - start
+    return report
+
+
+def evaluate(ast: Node, ctx: Ctx, path: str, report: FileReport, max_errors: int | None) -> Ctx:
+    """
+    Avalia `ast` em `ctx`, registrando os erros em `report`.
+    """
+    diagnostics = None if max_errors is None else Diagnostics(max_errors)
+    collect(lambda: ast.eval(ctx, path, diagnostics), report, diagnostics)
+    return ctx
+
+
+def collect(func, report: FileReport, diagnostics: Diagnostics | None) -> None:
+    # Sem `diagnostics`, o primeiro erro é propagado para quem chamou
+    try:
+        with redirect_stdout(io.StringIO()):
+            func()
+    except TooManyErrors:
+        pass
+    for error in diagnostics or ():
+        report.add_error(ErrorInfo.from_exception(error))
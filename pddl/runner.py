@@ -0,0 +1,253 @@
+"""
+Funções para executar o verificador sobre pares de arquivos domínio/problema
+e coletar o resultado de cada verificação.
+
+Este módulo é usado pelos modos do CLI que verificam muitos arquivos de uma
+vez, como ``pddl verify-tree``.
+"""
+
+import io
+import os
+import re
+import time
+from contextlib import redirect_stdout
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from . import cache
+from . import eval as pddl_eval
+from .ctx import Ctx, Symbols
+from .errors import PDDLError
+from .parser import get_parser, parse
+
+if TYPE_CHECKING:
+    from .diagnostics import Diagnostics
+
+DOMAIN_FILE = "domain.pddl"
+PROBLEM_FILE = "problem.pddl"
+
+EXPECT_RE = re.compile(r"^\s*;\s*expect(?P<error> runtime error)?:\s*(?P<text>.*?)\s*$")
+ERROR_RE = re.compile(r'^File "(?P<file>[^"]*)", line (?P<line>\d+), column (?P<column>\d+): (?P<msg>.*)$')
+
+
+def domain_ctx(flat: bool = False) -> Ctx:
+    """
+    Cria o contexto inicial usado para avaliar um domínio.
+
+    Contém os conectivos lógicos tratados como predicados especiais e o
+    requisito que habilita cada um deles. Se `flat` for verdadeiro, usa a
+    implementação `FlatCtx` da tabela de símbolos.
+    """
+    from .ast import Identifier, Predicate
+
+    symbols = Symbols(predicates={
+        "and": Predicate(Identifier("and", 0, 0), None, "strips"),
+        "not": Predicate(Identifier("not", 0, 0), None, "negative-preconditions"),
+        "or": Predicate(Identifier("or", 0, 0), None, "disjunctive-preconditions"),
+    })
+    return Ctx.from_dict({}, flat=flat, symbols=symbols)
+
+
+def verify_domain(
+    source: str,
+    file_path: str | None = None,
+    flat: bool = False,
+    diagnostics: "Diagnostics | None" = None,
+) -> Ctx:
+    """
+    Valida um domínio e retorna o contexto resultante.
+
+    Domínios validados com sucesso são guardados no cache em disco, indexados
+    pelo conteúdo do arquivo. Uma nova execução com o mesmo domínio reaproveita
+    a tabela de símbolos sem analisar nem avaliar o código novamente.
+
+    Com `diagnostics`, os erros do domínio são registrados em vez de
+    propagados (veja `pddl.diagnostics`) e domínios com erros não vão para o
+    cache.
+    """
+    from .ast import DOMAIN_OK
+
+    variant = "flat" if flat else "chain"
+    if (cached := cache.load_domain(source, variant)) is not None:
+        _, ctx = cached
+        print(DOMAIN_OK)
+        return ctx
+
+    ast = parse(source)
+    if diagnostics is None:
+        _, ctx = pddl_eval(ast, domain_ctx(flat), file_path=file_path)
+    else:
+        errors = len(diagnostics)
+        ctx = ast.eval(domain_ctx(flat), file_path, diagnostics)
+        if len(diagnostics) > errors:
+            return ctx
+    cache.store_domain(source, ast, ctx, variant)
+    return ctx
+
+
+@dataclass
+class Expectation:
+    """
+    Resultado esperado de uma verificação, declarado em comentários do tipo
+    ``; expect: ...`` ou ``; expect runtime error: ...`` no arquivo de problema.
+    """
+
+    output: list[str] = field(default_factory=list)
+    error: str | None = None
+
+    @classmethod
+    def from_source(cls, source: str) -> "Expectation | None":
+        """
+        Extrai as expectativas do código fonte. Retorna `None` se o arquivo não
+        declarar nenhuma.
+        """
+        expectation = cls()
+        found = False
+        for line in source.splitlines():
+            if (m := EXPECT_RE.match(line)) is None:
+                continue
+            found = True
+            if m["error"]:
+                expectation.error = m["text"]
+            else:
+                expectation.output.append(m["text"])
+        return expectation if found else None
+
+    def matches(self, result: "Result") -> bool:
+        """
+        Verifica se o resultado de uma verificação atende à expectativa.
+
+        Mensagens de erro são comparadas pelo nome do arquivo, linha, coluna e
+        texto, ignorando o diretório em que o arquivo se encontra.
+        """
+        if self.error is None:
+            return result.ok and self.output == result.output
+        if result.ok or result.line is None:
+            return False
+        if (m := ERROR_RE.match(self.error)) is None:
+            return self.error == result.message
+        return (
+            os.path.basename(m["file"]) == os.path.basename(result.file or "")
+            and int(m["line"]) == result.line
+            and int(m["column"]) == result.column
+            and m["msg"] == result.message
+        )
+
+
+@dataclass
+class Result:
+    """
+    Resultado da verificação de um par domínio/problema.
+    """
+
+    domain_file: str
+    problem_file: str
+    ok: bool = False
+    error: str | None = None
+    message: str | None = None
+    line: int | None = None
+    column: int | None = None
+    file: str | None = None
+    output: list[str] = field(default_factory=list)
+    elapsed: float = 0.0
+    expected: bool | None = None
+
+    @property
+    def passed(self) -> bool:
+        """
+        Verdadeiro se o par atende às expectativas declaradas ou, na ausência
+        delas, se foi verificado sem erros.
+        """
+        return self.ok if self.expected is None else self.expected
+
+
+def verify_pair(domain_file: str, problem_file: str) -> Result:
+    """
+    Verifica um par domínio/problema e retorna o resultado, sem propagar
+    exceções.
+
+    A saída produzida durante a verificação é capturada em `Result.output` e
+    comparada com as expectativas declaradas no arquivo de problema, se houver.
+    """
+    result = Result(str(domain_file), str(problem_file))
+    start = time.perf_counter()
+    stdout = io.StringIO()
+    expectation = None
+    try:
+        with open(domain_file, "r") as d:
+            domain_source = d.read()
+        with open(problem_file, "r") as p:
+            problem_source = p.read()
+        expectation = Expectation.from_source(problem_source)
+        with redirect_stdout(stdout):
+            ctx = verify_domain(domain_source, str(domain_file))
+            parse(problem_source).eval(ctx, str(problem_file))
+        result.ok = True
+    except PDDLError as e:
+        result.error = type(e).__name__
+        result.message = e.msg
+        result.line = e.line
+        result.column = e.column
+        result.file = e.file_path
+    except Exception as e:
+        result.error = type(e).__name__
+        result.message = str(e)
+    result.elapsed = time.perf_counter() - start
+    result.output = stdout.getvalue().splitlines()
+    if expectation is not None:
+        result.expected = expectation.matches(result)
+    return result
+
+
+def discover_pairs(root: str | Path) -> list[tuple[Path, Path]]:
+    """
+    Procura recursivamente por diretórios contendo um arquivo de domínio e um
+    arquivo de problema, em ordem alfabética.
+    """
+    pairs = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        if DOMAIN_FILE in filenames and PROBLEM_FILE in filenames:
+            path = Path(dirpath)
+            pairs.append((path / DOMAIN_FILE, path / PROBLEM_FILE))
+    return pairs
+
+
+def warm_up(no_cache: bool = False) -> None:
+    """
+    Prepara o processo atual para verificações, construindo o parser de AST.
+
+    Usado como inicializador dos processos de trabalho, de modo que o custo de
+    construção do parser é pago uma única vez por processo. Processos criados
+    com os métodos "spawn" e "forkserver" não herdam `cache.disable`; por isso
+    o estado do cache do processo principal é repassado em `no_cache`.
+    """
+    if no_cache:
+        cache.disable()
+    get_parser("ast")
+
+
+def _verify_pair_args(pair: tuple[Path, Path]) -> Result:
+    return verify_pair(*pair)
+
+
+def verify_pairs(pairs: list[tuple[Path, Path]], jobs: int = 1):
+    """
+    Verifica uma lista de pares, possivelmente em paralelo.
+
+    Retorna um iterador sobre os resultados, na mesma ordem de `pairs`. Com
+    `jobs` maior que 1, os pares são distribuídos entre processos de trabalho.
+    """
+    if jobs <= 1 or len(pairs) <= 1:
+        warm_up()
+        yield from map(_verify_pair_args, pairs)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    chunksize = max(1, len(pairs) // (jobs * 8))
+    with ProcessPoolExecutor(
+        max_workers=jobs, initializer=warm_up, initargs=(not cache.is_enabled(),)
+    ) as executor:
+        yield from executor.map(_verify_pair_args, pairs, chunksize=chunksize)
@@ -0,0 +1,449 @@
+"""
+Servidor de verificação de longa duração (``pddl serve``) e o cliente usado
+por ``pddl --client``.
+
+Cada execução do CLI paga a inicialização do interpretador, a importação do
+Lark e a construção do parser. O servidor paga esses custos uma única vez: ele
+mantém processos de trabalho com o parser já construído e, em cada processo,
+os domínios já avaliados em memória (`DomainCache`, com remoção do menos usado
+recentemente). O laço de eventos do processo principal (asyncio) apenas
+recebe as requisições e distribui a verificação de cada problema entre os
+processos.
+
+O servidor escuta em um socket Unix (por padrão, veja `default_address`) ou em
+uma porta TCP (``HOST:PORTA``). O protocolo é JSON, um objeto por linha, e uma
+conexão pode enviar várias requisições em sequência:
+
+    {"domain": "domain.pddl", "problems": ["p1.pddl", {"path": "p2.pddl", "source": "..."}],
+     "cwd": "/home/...", "ctx": "chain", "max_errors": null}
+
+Arquivos podem ser dados por caminho (relativo a ``cwd``) ou pelo código fonte
+(``source``), caso em que o caminho serve apenas como nome. A resposta contém
+um registro de `pddl.report.FileReport` para o domínio e um para cada problema
+(os problemas não são verificados se o domínio tiver erros):
+
+    {"ok": true, "reports": [{"file": "domain.pddl", "kind": "domain", ...}, ...]}
+
+Requisições malformadas recebem ``{"error": "mensagem"}``. A requisição
+``{"op": "ping"}`` apenas confirma que o servidor está no ar.
+
+O socket Unix só pode ser usado pelo dono do processo. Em TCP, qualquer
+processo que alcance a porta pode enviar requisições; por isso o servidor
+recusa endereços que não sejam de loopback (a menos que `allow_remote` seja
+verdadeiro) e, em conexões TCP, aceita apenas arquivos enviados com
+``source``, sem ler arquivos do disco.
+"""
+
+import dataclasses
+import ipaddress
+import json
+import os
+import signal
+import socket
+import tempfile
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any
+
+# O asyncio só é importado pelo servidor: o cliente (`request`) é usado por
+# ``pddl --client`` e deve iniciar rápido
+if TYPE_CHECKING:
+    import asyncio
+
+# Número padrão de domínios mantidos em memória por processo de trabalho
+DEFAULT_DOMAINS = 32
+
+# Tamanho máximo de uma requisição (uma linha), em bytes. O limite padrão do
+# asyncio (64 KiB) é menor que muitos problemas enviados com ``source``
+MAX_REQUEST = 64 * 1024 * 1024
+
+CTX_VARIANTS = (None, "chain", "flat")
+
+
+def default_address() -> str:
+    """
+    Endereço padrão do servidor: ``$PDDL_SERVER`` ou um socket Unix no
+    diretório de execução do usuário.
+    """
+    if address := os.environ.get("PDDL_SERVER"):
+        return address
+    base = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    return os.path.join(base, f"pddl-{os.getuid()}.sock")
+
+
+def parse_address(address: str) -> tuple[str, int] | str:
+    """
+    Interpreta um endereço: ``HOST:PORTA`` (ou ``:PORTA``) para TCP e,
+    caso contrário, o caminho de um socket Unix.
+    """
+    host, sep, port = address.rpartition(":")
+    if sep and port.isdigit() and "/" not in address:
+        return host or "127.0.0.1", int(port)
+    return address
+
+
+def is_loopback(host: str) -> bool:
+    """
+    Verifica se todos os endereços de `host` são de loopback.
+    """
+    try:
+        infos = socket.getaddrinfo(host, None)
+    except OSError:
+        return False
+    return all(ipaddress.ip_address(info[4][0]).is_loopback for info in infos)
+
+
+class DomainCache:
+    """
+    Domínios já verificados, indexados pelo conteúdo do arquivo, com remoção
+    do menos usado recentemente quando há mais de `capacity` entradas.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_DOMAINS):
+        self.capacity = capacity
+        self.entries: OrderedDict[Any, Any] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key) -> Any | None:
+        try:
+            value = self.entries[key]
+        except KeyError:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value) -> None:
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+#
+# Processos de trabalho
+#
+
+_domains = DomainCache()
+
+
+def init_worker(engine: str, no_cache: bool, capacity: int) -> None:
+    """
+    Inicializador dos processos de trabalho: aplica as opções do servidor e
+    constrói o parser antes da primeira requisição.
+    """
+    from . import cache
+    from .parser import set_engine
+    from .runner import warm_up
+
+    global _domains
+    if no_cache:
+        cache.disable()
+    set_engine(engine)
+    warm_up()
+    _domains = DomainCache(capacity)
+
+
+def read_source(item: dict, cwd: str) -> tuple[str, str]:
+    """
+    Retorna o nome e o código fonte de um arquivo da requisição.
+    """
+    path = item.get("path") or "<entrada>"
+    source = item.get("source")
+    if source is None:
+        with open(os.path.join(cwd, path), "r") as fd:
+            source = fd.read()
+    return path, source
+
+
+def unreadable(item: dict, kind: str, error: OSError):
+    from .report import ErrorInfo, FileReport
+
+    path = item.get("path") or "<entrada>"
+    report = FileReport(path, kind)
+    report.add_error(ErrorInfo.from_exception(error, path))
+    return report
+
+
+def check_domain(item: dict, cwd: str, flat: bool, max_errors: int | None):
+    """
+    Verifica o domínio, reaproveitando o resultado guardado em `_domains`.
+
+    Só domínios sem erros são guardados. Em um acerto, o registro devolvido é
+    o da primeira verificação, marcado como ``cached``.
+    """
+    from . import cache, report
+
+    try:
+        path, source = read_source(item, cwd)
+    except OSError as e:
+        return unreadable(item, "domain", e), None
+
+    key = (cache.make_key(source), flat)
+    if (entry := _domains.get(key)) is not None:
+        domain_report, ctx = entry
+        return dataclasses.replace(domain_report, file=path, cached=True, timings={}), ctx
+
+    domain_report, ctx = report.check_domain(path, flat, max_errors, source)
+    if ctx is not None:
+        _domains.put(key, (domain_report, ctx))
+    return domain_report, ctx
+
+
+def verify(
+    domain: dict,
+    problem: dict | None,
+    cwd: str,
+    flat: bool,
+    max_errors: int | None,
+) -> tuple[dict, dict | None]:
+    """
+    Verifica um problema (se houver) contra o domínio. Executada nos processos
+    de trabalho; retorna os registros do domínio e do problema como
+    dicionários.
+    """
+    from .report import check_problem
+
+    domain_report, ctx = check_domain(domain, cwd, flat, max_errors)
+    if ctx is None or problem is None:
+        return domain_report.to_dict(), None
+    try:
+        path, source = read_source(problem, cwd)
+    except OSError as e:
+        return domain_report.to_dict(), unreadable(problem, "problem", e).to_dict()
+    problem_report = check_problem(path, ctx.snapshot(), max_errors, source=source)
+    return domain_report.to_dict(), problem_report.to_dict()
+
+
+#
+# Servidor
+#
+
+class Server:
+    """
+    Recebe requisições em um laço de eventos e as executa em um
+    `ProcessPoolExecutor` com `jobs` processos de trabalho.
+    """
+
+    def __init__(
+        self,
+        jobs: int | None = None,
+        engine: str = "lark",
+        no_cache: bool = False,
+        domains: int = DEFAULT_DOMAINS,
+    ):
+        from concurrent.futures import ProcessPoolExecutor
+
+        self.executor = ProcessPoolExecutor(
+            max_workers=jobs or os.cpu_count() or 1,
+            initializer=init_worker,
+            initargs=(engine, no_cache, domains),
+        )
+        self.requests = 0
+        # Em TCP, arquivos só podem ser enviados pelo conteúdo (veja `serve`)
+        self.read_files = True
+
+    async def handle(self, reader: "asyncio.StreamReader", writer: "asyncio.StreamWriter") -> None:
+        """
+        Atende uma conexão: lê uma requisição por linha e responde na mesma
+        ordem. Uma requisição maior que `MAX_REQUEST` recebe um erro e
+        encerra a conexão.
+        """
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # Linha maior que `MAX_REQUEST`: o restante da requisição
+                    # ainda não foi lido, então a conexão é encerrada
+                    response = {"error": f"requisição inválida: maior que {MAX_REQUEST} bytes"}
+                    writer.write(json.dumps(response, ensure_ascii=False).encode() + b"\n")
+                    await writer.drain()
+                    break
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise TypeError("a requisição deve ser um objeto JSON")
+                    response = await self.dispatch(request)
+                except (ValueError, KeyError, TypeError, AttributeError) as e:
+                    response = {"error": f"requisição inválida: {e}"}
+                writer.write(json.dumps(response, ensure_ascii=False).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, request: dict) -> dict:
+        import asyncio
+
+        op = request.get("op", "verify")
+        if op == "ping":
+            return {"ok": True, "requests": self.requests}
+        if op != "verify":
+            raise ValueError(f"operação desconhecida: {op}")
+
+        domain = as_item(request["domain"])
+        problems = request.get("problems", [])
+        if not isinstance(problems, list):
+            raise TypeError("'problems' deve ser uma lista")
+        problems = [as_item(problem) for problem in problems]
+        if not self.read_files:
+            for item in [domain, *problems]:
+                if not isinstance(item.get("source"), str):
+                    raise ValueError("conexões TCP aceitam apenas arquivos enviados com 'source'")
+        cwd = request.get("cwd") or os.getcwd()
+        if not isinstance(cwd, str):
+            raise TypeError(f"'cwd' inválido: {cwd!r}")
+        if (ctx := request.get("ctx")) not in CTX_VARIANTS:
+            raise ValueError(f"'ctx' deve ser 'chain' ou 'flat', não {ctx!r}")
+        max_errors = request.get("max_errors")
+        if max_errors is not None and (type(max_errors) is not int or max_errors < 0):
+            raise ValueError(f"'max_errors' deve ser um inteiro não negativo, não {max_errors!r}")
+        args = (cwd, ctx == "flat", max_errors)
+        self.requests += 1
+
+        # Cada problema é uma tarefa separada, de modo que os problemas de uma
+        # mesma requisição são verificados em paralelo
+        loop = asyncio.get_running_loop()
+        results = await asyncio.gather(*(
+            loop.run_in_executor(self.executor, verify, domain, problem, *args)
+            for problem in problems or [None]
+        ))
+        reports = [results[0][0], *(report for _, report in results if report is not None)]
+        return {"ok": all(report["status"] == "ok" for report in reports), "reports": reports}
+
+    async def serve(self, address: str, allow_remote: bool = False) -> None:
+        """
+        Escuta em `address` até o processo ser interrompido (SIGINT ou
+        SIGTERM).
+
+        Levanta `OSError` se `address` for um endereço TCP que não é de
+        loopback e `allow_remote` for falso.
+        """
+        import asyncio
+
+        target = parse_address(address)
+        if isinstance(target, tuple):
+            if not allow_remote and not is_loopback(target[0]):
+                raise OSError(f"{target[0]} não é um endereço de loopback (use --allow-remote)")
+            self.read_files = False
+            server = await asyncio.start_server(self.handle, *target, limit=MAX_REQUEST)
+        else:
+            remove_stale_socket(target)
+            # O socket já é criado só com permissão para o dono
+            umask = os.umask(0o177)
+            try:
+                server = await asyncio.start_unix_server(self.handle, target, limit=MAX_REQUEST)
+            finally:
+                os.umask(umask)
+        task = asyncio.current_task()
+        loop = asyncio.get_running_loop()
+        loop.add_signal_handler(signal.SIGTERM, task.cancel)
+        print(f"Servidor PDDL ouvindo em {address}", flush=True)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            if isinstance(target, str) and os.path.exists(target):
+                os.unlink(target)
+
+    def close(self) -> None:
+        self.executor.shutdown(cancel_futures=True)
+
+
+def as_item(item: str | dict) -> dict:
+    """
+    Normaliza um arquivo da requisição: um caminho ou um dicionário com
+    ``path`` e, opcionalmente, ``source``.
+    """
+    if isinstance(item, str):
+        return {"path": item}
+    if not isinstance(item, dict):
+        raise TypeError(f"arquivo inválido: {item!r}")
+    if not isinstance(item.get("path") or "", str) or not isinstance(item.get("source") or "", str):
+        raise TypeError(f"arquivo inválido: {item!r}")
+    return item
+
+
+def inline(path: str) -> dict:
+    """
+    Lê um arquivo e o descreve pelo conteúdo, como exigido em conexões TCP.
+    """
+    with open(path, "r") as fd:
+        return {"path": path, "source": fd.read()}
+
+
+def remove_stale_socket(path: str) -> None:
+    """
+    Remove o arquivo de um socket Unix deixado por um servidor que não está
+    mais no ar. Levanta `OSError` se outro servidor estiver usando o socket.
+    """
+    if not os.path.exists(path):
+        return
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(path)
+        except OSError:
+            os.unlink(path)
+            return
+    raise OSError(f"já existe um servidor ouvindo em {path}")
+
+
+def serve(
+    address: str,
+    jobs: int | None = None,
+    engine: str = "lark",
+    no_cache: bool = False,
+    domains: int = DEFAULT_DOMAINS,
+    allow_remote: bool = False,
+) -> None:
+    """
+    Inicia o servidor e o mantém no ar até ser interrompido (Ctrl+C ou
+    SIGTERM).
+    """
+    import asyncio
+
+    server = Server(jobs, engine, no_cache, domains)
+    try:
+        asyncio.run(server.serve(address, allow_remote))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
+    finally:
+        server.close()
+
+
+#
+# Cliente
+#
+
+def request(address: str, payload: dict, timeout: float | None = None) -> dict:
+    """
+    Envia uma requisição ao servidor em `address` e retorna a resposta.
+
+    Levanta `OSError` se não for possível conectar ao servidor.
+    """
+    target = parse_address(address)
+    if isinstance(target, tuple):
+        sock = socket.create_connection(target, timeout)
+    else:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(timeout)
+        try:
+            sock.connect(target)
+        except OSError:
+            sock.close()
+            raise
+    with sock, sock.makefile("rwb") as stream:
+        stream.write(json.dumps(payload, ensure_ascii=False).encode() + b"\n")
+        stream.flush()
+        line = stream.readline()
+    if not line:
+        raise ConnectionError("o servidor fechou a conexão")
+    return json.loads(line)
@@ -0,0 +1,500 @@
+"""
+Verificação de problemas em modo streaming.
+
+Em vez de construir a árvore sintática completa do problema antes de avaliá-lo,
+o arquivo é lido em blocos e dividido em formas (expressões entre parênteses)
+por um scanner de parênteses. Cada fato de ``:init`` é analisado, validado e
+descartado em seguida, de modo que o pico de memória não cresce com o tamanho
+da seção ``:init``.
+
+As demais seções (``:objects``, ``:goal``, etc.) são analisadas inteiras, pois
+os objetos precisam ficar no contexto de qualquer forma.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import IO, TYPE_CHECKING, Iterable, Iterator
+
+from .ast import PROBLEM_OK, Call, Identifier, Node, Object, eval_all
+from .ctx import Ctx
+from .errors import ParseError, PDDLError
+from .facts import FactStore
+from .parser import parse_text
+
+if TYPE_CHECKING:
+    from .diagnostics import Diagnostics
+
+CHUNK_SIZE = 1 << 16
+TOKEN_RE = re.compile(r"[()]|;[^\n]*")
+SYMBOL_RE = re.compile(r"[^\s();]+")
+NONSPACE_RE = re.compile(r"\S")
+
+# Palavras-chave que iniciam as formas de um arquivo. Como no analisador
+# léxico do Lark, a palavra-chave é reconhecida como prefixo do símbolo: em
+# ``(:domaincasa)``, ``casa`` já é o nome do domínio.
+KEYWORDS = (
+    "define", "domain", "problem", ":domain", ":objects", ":init", ":goal",
+    ":requirements", ":types", ":constants", ":predicates", ":action",
+)
+KEYWORD_RE = re.compile(
+    r"\(\s*(?:;[^\n]*\s*)*(" + "|".join(map(re.escape, KEYWORDS)) + r"|[^\s();]*)"
+)
+BLANK_RE = re.compile(r"(?:\s|;[^\n]*)*")
+
+# Seções do problema, na ordem exigida pela gramática, e a regra usada para
+# analisar cada uma delas.
+SECTIONS = {
+    "problem": "define_problem",
+    ":domain": "domain_ref",
+    ":objects": "objects",
+    ":init": "call",
+    ":goal": "goal",
+}
+
+
+@dataclass
+class Form:
+    """
+    Uma forma entre parênteses encontrada pelo scanner.
+
+    `section` é a palavra-chave da seção de nível superior em que a forma se
+    encontra. Para seções divididas (como ``:init``), cada filho da seção é
+    uma forma separada; para as demais, a forma é a seção inteira. `line` e
+    `column` indicam a posição do parêntese de abertura no arquivo.
+    """
+
+    section: str
+    text: str
+    line: int
+    column: int
+
+
+class SectionOrder:
+    """
+    Verifica, à medida que as formas são lidas, se as seções de nível
+    superior são conhecidas, estão na ordem de `sections` e se nenhuma seção
+    obrigatória foi omitida.
+
+    Seções em `repeated` podem aparecer várias vezes seguidas (como os fatos
+    de uma seção dividida); seções em `optional` podem ser omitidas.
+    """
+
+    def __init__(
+        self,
+        sections: Iterable[str] = SECTIONS,
+        repeated: Iterable[str] = (":init",),
+        optional: Iterable[str] = (),
+    ):
+        self.order = list(sections)
+        self.repeated = frozenset(repeated)
+        self.optional = frozenset(optional)
+        self.known = frozenset(self.order)
+        self.seen: set[str] = set()
+
+    def check(self, form: Form) -> tuple[bool, list[PDDLError]]:
+        """
+        Registra a forma e retorna se ela pertence a uma seção válida e os
+        erros encontrados. Uma forma inválida não altera a ordem esperada.
+        """
+        if form.section not in self.known:
+            return False, [PDDLError(f"seção {form.section} inesperada", form.line, form.column)]
+        if form.section not in self.order:
+            return False, [PDDLError(f"seção {form.section} fora de ordem", form.line, form.column)]
+        index = self.order.index(form.section)
+        errors = self.missing(self.order[:index], form.line, form.column)
+        # Seções repetidas continuam aceitas até surgir a seção seguinte
+        del self.order[: index if form.section in self.repeated else index + 1]
+        self.seen.add(form.section)
+        return True, errors
+
+    def finish(self, line: int, column: int) -> list[PDDLError]:
+        """
+        Retorna os erros das seções obrigatórias que não apareceram, na
+        posição dada.
+        """
+        return self.missing(self.order, line, column)
+
+    def missing(self, sections: Iterable[str], line: int, column: int) -> list[PDDLError]:
+        return [
+            PDDLError(f"seção {section} ausente", line, column)
+            for section in sections
+            if section not in self.optional and section not in self.seen
+        ]
+
+
+class FormScanner:
+    """
+    Divide o código de um arquivo ``(define ...)`` em formas de nível
+    superior, processando o texto de forma incremental.
+
+    O texto deve ser passado ao método `feed` em pedaços que terminem em uma
+    quebra de linha (com exceção do último), para que comentários nunca sejam
+    divididos ao meio.
+
+    Fora das formas, e entre os filhos de uma seção dividida, só são aceitos
+    espaços e comentários. Um símbolo nessas posições é um erro de sintaxe,
+    levantado como `ParseError` ou, se `errors` for dado, registrado nessa
+    lista sem interromper a leitura.
+    """
+
+    def __init__(self, split: Iterable[str] = (":init",), errors: list[PDDLError] | None = None):
+        self.split = frozenset(split)
+        self.errors = errors
+        self.depth = 0
+        self.line = 1
+        self.section: str | None = None
+        self.splitting = False
+        self.parts: list[str] = []
+        self.start: tuple[int, int] | None = None
+        self.open_positions: list[tuple[int, int]] = []
+        # Texto lido da forma externa até a primeira seção, para verificar se
+        # ela começa com "(define"
+        self.head: list[str] | None = None
+        self.closed = False
+
+    def feed(self, text: str) -> Iterator[Form]:
+        """
+        Processa um pedaço do texto e retorna as formas completadas nele.
+        """
+        line = self.line
+        line_start = 0
+        last = 0
+        end = 0  # fim do último token
+        mark = 0  # início do trecho ainda não copiado para self.parts
+        head_mark = 0
+
+        for m in TOKEN_RE.finditer(text):
+            pos = m.start()
+            if end < pos and self._outside():
+                self._check_blank(text, end, pos, line, last)
+            end = m.end()
+            newlines = text.count("\n", last, pos)
+            if newlines:
+                line += newlines
+                line_start = text.rfind("\n", last, pos) + 1
+            last = pos
+            token = m.group()
+            if token[0] == ";":
+                continue
+            column = pos - line_start + 1
+
+            if token == "(":
+                if self.depth == 0 and self.closed:
+                    self._error(ParseError("símbolo '(' inesperado após o fim do arquivo", line, column))
+                self.depth += 1
+                self.open_positions.append((line, column))
+                if self.depth == 1:
+                    self.head = []
+                    head_mark = pos
+                elif self.depth == 2 and self.head is not None:
+                    self.head.append(text[head_mark:pos])
+                    self._check_head()
+                if self.depth == 2:
+                    # Início de uma seção: (problem ...), (:init ...), etc.
+                    self.start = (line, column)
+                    self.parts = []
+                    mark = pos
+                elif self.depth == 3 and self.section is None:
+                    # Primeiro filho da seção: decide se ela será dividida
+                    self.parts.append(text[mark:pos])
+                    mark = pos
+                    self.section = self._keyword("".join(self.parts))
+                    if self.section in self.split:
+                        self.splitting = True
+                        self.start = (line, column)
+                        self.parts = []
+                elif self.depth == 3 and self.splitting:
+                    self.start = (line, column)
+                    self.parts = []
+                    mark = pos
+            else:
+                if self.depth == 0:
+                    raise PDDLError("parêntese ')' sem correspondente", line, column)
+                self.depth -= 1
+                position = self.open_positions.pop()
+                if self.depth == 0:
+                    self.closed = True
+                    if self.head is not None:
+                        self.head.append(text[head_mark:pos])
+                        self._check_head(position)
+                if self.depth == 2 and self.splitting:
+                    self.parts.append(text[mark : pos + 1])
+                    mark = pos + 1
+                    yield self._emit()
+                elif self.depth == 1:
+                    if self.splitting:
+                        self.splitting = False
+                    else:
+                        self.parts.append(text[mark : pos + 1])
+                        mark = pos + 1
+                        if self.section is None:
+                            self.section = self._keyword("".join(self.parts))
+                        yield self._emit()
+                    self.section = None
+                    self.start = None
+
+        if end < len(text) and self._outside():
+            self._check_blank(text, end, len(text), line, last)
+        # Guarda o trecho da forma corrente que ainda não foi completado
+        if self.start is not None:
+            self.parts.append(text[mark:])
+        if self.head is not None:
+            self.head.append(text[head_mark:])
+        self.line = line + text.count("\n", last)
+
+    def close(self) -> None:
+        """
+        Verifica se todos os parênteses abertos foram fechados.
+        """
+        if self.depth:
+            line, column = self.open_positions[-1]
+            raise PDDLError("parêntese '(' não fechado", line, column)
+
+    def _outside(self) -> bool:
+        # Posições em que o texto não faz parte de nenhuma forma
+        return (
+            self.depth == 0
+            or (self.depth == 1 and self.head is None)
+            or (self.depth == 2 and self.splitting)
+        )
+
+    def _check_blank(self, text: str, start: int, stop: int, line: int, last: int) -> None:
+        """
+        Verifica se `text[start:stop]` contém apenas espaços. `line` é a linha
+        da posição `last`, anterior a `start`.
+        """
+        m = NONSPACE_RE.search(text, start, stop)
+        if m is None:
+            return
+        pos = m.start()
+        line += text.count("\n", last, pos)
+        column = pos - text.rfind("\n", 0, pos)
+        self._error(unexpected(SYMBOL_RE.match(text, pos).group(), line, column))
+
+    def _check_head(self, position: tuple[int, int] | None = None) -> None:
+        head = "".join(self.head or ())
+        self.head = None
+        line, column = position or self.open_positions[0]
+        word, rest = split_keyword(head)
+        if word != "define":
+            raise PDDLError(f"esperado '(define', encontrado '({word}'", line, column)
+        if rest is not None:
+            self._error(unexpected_at(head, rest, line, column))
+
+    def _keyword(self, text: str) -> str:
+        """
+        Retorna a palavra-chave da seção que começa em `text`. Em uma seção
+        dividida, nada além dela pode vir antes do primeiro filho.
+        """
+        word, rest = split_keyword(text)
+        if word in self.split and rest is not None:
+            self._error(unexpected_at(text, rest, *self.start))  # type: ignore[misc]
+        return word
+
+    def _error(self, error: PDDLError) -> None:
+        if self.errors is None:
+            raise error
+        self.errors.append(error)
+
+    def _emit(self) -> Form:
+        line, column = self.start  # type: ignore[misc]
+        form = Form(self.section or "", "".join(self.parts), line, column)
+        self.parts = []
+        self.start = None
+        return form
+
+
+def keyword(text: str) -> str:
+    """
+    Retorna a palavra-chave após o parêntese de abertura de uma forma (ou a
+    primeira palavra, se não for uma palavra-chave).
+    """
+    return split_keyword(text)[0]
+
+
+def split_keyword(text: str) -> tuple[str, int | None]:
+    """
+    Retorna a palavra-chave de uma forma e a posição, em `text`, do primeiro
+    símbolo que a segue antes do próximo parêntese (`None` se não houver).
+    """
+    m = KEYWORD_RE.search(text)
+    if m is None:
+        return "", None
+    end = BLANK_RE.match(text, m.end()).end()
+    if end < len(text) and text[end] not in "()":
+        return m.group(1), end
+    return m.group(1), None
+
+
+def unexpected(symbol: str, line: int, column: int) -> ParseError:
+    return ParseError(f"símbolo '{symbol}' inesperado", line, column)
+
+
+def unexpected_at(text: str, offset: int, line: int, column: int) -> ParseError:
+    """
+    Erro para o símbolo na posição `offset` de `text`, um trecho que começa
+    na linha e coluna dadas.
+    """
+    newlines = text.count("\n", 0, offset)
+    if newlines:
+        line += newlines
+        column = offset - text.rfind("\n", 0, offset)
+    else:
+        column += offset
+    return unexpected(SYMBOL_RE.match(text, offset).group(), line, column)
+
+
+def is_whole_section(form: Form) -> bool:
+    """
+    Verifica se a forma é a seção inteira, e não um de seus filhos. Acontece
+    com seções divididas vazias, como ``(:init)``.
+    """
+    return keyword(form.text) == form.section
+
+
+def iter_forms(
+    fd: IO[str], split: Iterable[str] = (":init",), chunk_size: int = CHUNK_SIZE
+) -> Iterator[Form]:
+    """
+    Lê o arquivo em blocos e retorna as formas de nível superior.
+
+    Apenas linhas completas são entregues ao scanner, de modo que a memória
+    usada é proporcional ao tamanho do bloco e da maior forma do arquivo.
+    """
+    scanner = FormScanner(split)
+    carry = ""
+    while chunk := fd.read(chunk_size):
+        chunk = carry + chunk
+        end = chunk.rfind("\n") + 1
+        if end == 0:
+            carry = chunk
+            continue
+        carry = chunk[end:]
+        yield from scanner.feed(chunk[:end])
+    if carry:
+        yield from scanner.feed(carry)
+    scanner.close()
+
+
+def parse_form(form: Form, start: str):
+    """
+    Analisa o texto de uma forma a partir da regra `start` da gramática.
+
+    As posições dos identificadores são corrigidas para refletir a posição da
+    forma no arquivo original. Levanta `ParseError` se a árvore tiver nomes
+    que a avaliação não espera (veja `stray_argument`).
+    """
+    tree = parse_text(form.text, start)
+    # Um `FactStore` cria os nós sob demanda: corrigimos uma lista de nós
+    if isinstance(tree, FactStore):
+        tree = list(tree)
+    # Um mesmo identificador pode aparecer em vários nós (como o tipo em
+    # ``a b - t``) e deve ser corrigido uma única vez
+    seen = set()
+    stray = None
+    for node in iter_nodes(tree):
+        if isinstance(node, Identifier):
+            if id(node) not in seen:
+                seen.add(id(node))
+                move(node, form)
+        elif stray is None and type(node) is Call:
+            stray = stray_argument(node)
+    if stray is None and isinstance(tree, list):
+        stray = untyped_object(tree)
+    if stray is not None:
+        ident, msg = stray
+        if ident is None:
+            raise ParseError(msg, form.line, form.column)
+        if id(ident) not in seen:
+            move(ident, form)
+        raise ParseError(msg, ident.line, ident.column)
+    return tree
+
+
+def move(ident: Identifier, form: Form) -> None:
+    if ident.line == 1:
+        ident.column += form.column - 1
+    ident.line += form.line - 1
+
+
+# A gramática aceita construções que a avaliação não espera: objetos sem tipo
+# em ``:objects`` e nomes soltos entre os argumentos de uma chamada, como em
+# ``(and (at a b) at c)``. Na análise do arquivo inteiro, elas só causam erros
+# na avaliação; aqui, poderiam ser avaliadas antes de um erro de sintaxe mais
+# adiante no arquivo, e por isso são tratadas como erros de sintaxe. As
+# funções abaixo retornam o nome encontrado (`None` se ele não tiver posição)
+# e a mensagem de erro.
+
+def stray_argument(call: Call) -> tuple[Identifier | None, str] | None:
+    for arg in call.args:
+        if type(arg) is list:
+            if not arg:
+                return None, "símbolo '-' inesperado"
+            ident = arg[0].name if isinstance(arg[0], Object) else arg[0]
+            return ident, f"símbolo '{ident.name}' inesperado"
+    return None
+
+
+def untyped_object(items: list) -> tuple[Identifier, str] | None:
+    for item in items:
+        if isinstance(item, Identifier):
+            return item, f"objeto {item.name} sem tipo"
+    return None
+
+
+def iter_nodes(tree) -> Iterator[Node]:
+    """
+    Percorre os nós de uma árvore ou lista de árvores.
+    """
+    if isinstance(tree, list):
+        for item in tree:
+            yield from iter_nodes(item)
+    elif isinstance(tree, Node):
+        yield from tree.descendants()
+
+
+def eval_problem(
+    fd: IO[str],
+    ctx: Ctx,
+    file_path: str | None = None,
+    diagnostics: "Diagnostics | None" = None,
+) -> Ctx:
+    """
+    Avalia um problema lido de `fd` em modo streaming.
+
+    Produz os mesmos erros que `Problem.eval`, mas cada fato de ``:init`` é
+    validado logo após ser lido e então descartado. Com `diagnostics`, erros
+    nas declarações são registrados e a leitura continua, como em
+    `Problem.eval`; erros na estrutura das seções continuam fatais.
+    """
+    errors = 0 if diagnostics is None else len(diagnostics)
+    # Seções de :init chegam um fato por vez; as demais, uma única vez
+    order = SectionOrder()
+    position = (1, 1)
+    try:
+        for form in iter_forms(fd):
+            _, structure = order.check(form)
+            if structure:
+                raise structure[0]
+            position = (form.line, form.column)
+
+            match form.section:
+                case "problem" | ":domain":
+                    eval_all([parse_form(form, SECTIONS[form.section])], ctx, diagnostics, file_path)
+                case ":objects":
+                    objects = parse_form(form, "objects")
+                    for obj in objects:
+                        ctx.var_def(obj.name.name, obj)
+                    eval_all(objects, ctx, diagnostics, file_path)
+                case ":init":
+                    if not is_whole_section(form):
+                        eval_all([parse_form(form, "call")], ctx, diagnostics, file_path)
+                case ":goal":
+                    eval_all(parse_form(form, "goal"), ctx, diagnostics, file_path)
+        if structure := order.finish(*position):
+            raise structure[0]
+    except PDDLError as p:
+        raise p.__class__(msg=p.msg, line=p.line, column=p.column, file_path=file_path)
+    if diagnostics is None or len(diagnostics) == errors:
+        print(PROBLEM_OK)
+    return ctx
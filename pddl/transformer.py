@@ -7,9 +7,12 @@ A resolução de vários exercícios requer a modificação ou implementação d
 métodos desta classe.
 """
 
-from lark import Transformer, Token, v_args
+from typing import NamedTuple
+
+from lark import Transformer, Token, Tree, v_args
 
 from .ast import *
+from .facts import FactStore
 
 @v_args(inline=True)
 class PDDLTransformer(Transformer):
@@ -35,11 +38,29 @@ class PDDLTransformer(Transformer):
     def requirements(self, *reqs: Identifier):
         return list(Requirement(req) for req in reqs)
     
-    def types(self, *types: Type):
-        return list(types)
+    def types(self, *items: "Type | TypeParent"):
+        # Em ``a b - c``, o pai ``c`` vale para todos os tipos declarados
+        # desde o último pai
+        types: list[Type] = []
+        pending: list[Type] = []
+        for item in items:
+            if isinstance(item, TypeParent):
+                for type in pending:
+                    type.parent = item.type
+                pending = []
+            else:
+                types.append(item)
+                pending.append(item)
+        return types
     
     def type(self, name: Identifier):
         return Type(name)
+
+    def type_parent(self, type: "Identifier | Either"):
+        return TypeParent(type)
+
+    def either(self, either: Identifier, *types: Identifier):
+        return Either(either, list(types))
     
     def constants_def(self, *consts: Constant) -> list[Constant]:
         return list(obj for const in consts for obj in const)
@@ -95,21 +116,65 @@ class PDDLTransformer(Transformer):
     def objects(self, *args):
         return list(obj for arg in args for obj in arg)
     
-    def init(self, *args):
-        return list(args)
+    def init(self, facts: FactStore):
+        return facts
     
-    def goal(self, *args):
-        return list(args)
+    def goal(self, facts: FactStore):
+        return facts
+
+    def facts(self, facts: FactStore | None = None, call: Node | None = None):
+        # A regra é recursiva à esquerda: cada fato é guardado no
+        # armazenamento assim que é reduzido, e seus nós podem ser liberados
+        if facts is None:
+            return FactStore()
+        facts.append(call)
+        return facts
     
     # TERMINAIS
+    #
+    # Ao montar a mensagem de um erro de sintaxe, o Lark testa os terminais
+    # aceitos com tokens sem posição (linha e coluna None), que também passam
+    # por estes métodos.
 
     def IDENTIFIER(self, token: Token) -> Identifier:
         name = str(token)
-        return Identifier(name, token.line, token.column)
+        return Identifier(name, token.line or 0, token.column or 0)
     
     def WHEN_IDENTIFIER(self, token: Token) -> Identifier:
         name = str(token)
-        return Identifier(name, token.line, token.column)
+        return Identifier(name, token.line or 0, token.column or 0)
+
+    def EITHER_IDENTIFIER(self, token: Token) -> Identifier:
+        name = str(token)
+        return Identifier(name, token.line or 0, token.column or 0)
+
+class CSTTransformer(Transformer):
+    """
+    Usado pelo parser "cst": desfaz a recursão da regra ``facts``, de modo que
+    os fatos aparecem como filhos diretos de ``init`` e ``goal``.
+    """
+
+    def facts(self, children):
+        if not children:
+            return []
+        facts, call = children
+        facts.append(call)
+        return facts
+
+    def init(self, children):
+        return Tree("init", children[0])
+
+    def goal(self, children):
+        return Tree("goal", children[0])
+
+
+class TypeParent(NamedTuple):
+    """
+    Marca ``- pai`` na seção ``:types``, usada apenas durante a transformação.
+    """
+
+    type: "Identifier | Either"
+
 
 def fix_list(elements: list):
     aux = []
@@ -0,0 +1,31 @@
+"""
+A verificação vetorizada de :init (`pddl.batch`) não deve importar o NumPy
+em problemas nos quais a importação custa mais do que economiza.
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from pddl.batch import MIN_FACTS_IMPORT, has_numpy
+
+EXAMPLE = Path(__file__).parent.parent / "exemplos" / "valido2_visit_all_sequential"
+
+SCRIPT = """
+import sys
+from pddl.runner import verify_pair
+assert verify_pair({domain!r}, {problem!r}).ok
+print("numpy" in sys.modules)
+"""
+
+
+@pytest.mark.skipif(not has_numpy(), reason="NumPy não instalado")
+def test_small_problem_skips_numpy():
+    # Milhares de fatos: avaliá-los um a um é mais rápido que importar o NumPy
+    problem = EXAMPLE / "problem.pddl"
+    assert problem.read_text().count("(") < MIN_FACTS_IMPORT
+    script = SCRIPT.format(domain=str(EXAMPLE / "domain.pddl"), problem=str(problem))
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "False"
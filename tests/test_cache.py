@@ -0,0 +1,30 @@
+"""
+Configuração do cache em disco (`pddl.cache`) pelo ambiente.
+"""
+
+import pytest
+
+from pddl import cache
+
+
+@pytest.mark.parametrize("value, expected", [("", cache.DOMAIN_CACHE_MAX_SIZE), ("1024", 1024), ("0", 0)])
+def test_max_size(monkeypatch, value, expected):
+    monkeypatch.setenv("PDDL_CACHE_MAX_SIZE", value)
+    assert cache.domain_cache_max_size() == expected
+
+
+@pytest.mark.parametrize("value", ["64M", "1e6", "-1"])
+def test_invalid_max_size(monkeypatch, value):
+    monkeypatch.setenv("PDDL_CACHE_MAX_SIZE", value)
+    with pytest.warns(RuntimeWarning, match="PDDL_CACHE_MAX_SIZE"):
+        assert cache.domain_cache_max_size() == cache.DOMAIN_CACHE_MAX_SIZE
+
+
+def test_invalid_max_size_does_not_fail(monkeypatch, tmp_path):
+    # Um valor inválido não pode impedir a verificação do domínio
+    monkeypatch.setenv("PDDL_CACHE_DIR", str(tmp_path))
+    monkeypatch.setenv("PDDL_CACHE_MAX_SIZE", "64M")
+    monkeypatch.delenv("PDDL_NO_CACHE", raising=False)
+    with pytest.warns(RuntimeWarning):
+        cache.store_domain("(define (domain d))", None, None)
+    assert list((tmp_path / "domain").glob("*.pickle"))
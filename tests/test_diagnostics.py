@@ -0,0 +1,34 @@
+"""
+Com ``--max-errors`` (`pddl.diagnostics`), um tipo não declarado deve ser
+reportado uma única vez, na declaração, e não em cada uso do objeto ou do
+predicado.
+"""
+
+import contextlib
+import io
+from pathlib import Path
+
+from pddl.diagnostics import collect_errors
+from pddl.runner import domain_ctx
+
+EXAMPLE = Path(__file__).parent.parent / "exemplos" / "valido1_simples"
+
+
+def check(domain: str, problem: str | None = None) -> list[str]:
+    ctx = domain_ctx()
+    with contextlib.redirect_stdout(io.StringIO()):
+        errors = collect_errors(domain, ctx)
+        if problem is not None:
+            errors += collect_errors(problem, ctx)
+    return [error.msg for error in errors]
+
+
+def test_object_with_undeclared_type():
+    problem = (EXAMPLE / "problem.pddl").read_text().replace("box - item", "box - caixa")
+    problem = problem.replace("(at box warehouse)", "(at box warehouse) (at box store)")
+    assert check((EXAMPLE / "domain.pddl").read_text(), problem) == ["tipo caixa não declarado"]
+
+
+def test_predicate_with_undeclared_type():
+    domain = (EXAMPLE / "domain.pddl").read_text().replace("(at ?x - item", "(at ?x - coisa")
+    assert check(domain) == ["tipo coisa não declarado"]
@@ -0,0 +1,22 @@
+"""
+Teste diferencial do analisador ``fast`` (`pddl.fastparser`) contra o Lark,
+nos exemplos, nas variantes sintéticas e em uma amostra fixa de mutações
+(veja ``benchmarks/parser_diff.py``, que roda a mesma comparação em escala).
+"""
+
+import pytest
+
+from parser_diff import compare_ast, inputs, outcome
+
+MUTATIONS = 200
+SEED = 0
+
+CASES = inputs(MUTATIONS, SEED)
+
+
+@pytest.mark.parametrize("domain, problem", [case[1:] for case in CASES], ids=[case[0] for case in CASES])
+def test_fast_matches_lark(domain, problem):
+    for src in (domain, problem):
+        compare_ast(src)
+    for stream in (False, True):
+        assert outcome(domain, problem, "fast", stream) == outcome(domain, problem, "lark", stream)
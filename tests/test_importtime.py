@@ -0,0 +1,16 @@
+"""
+O orçamento de inicialização do CLI (``benchmarks/importtime.py``) deve ser
+respeitado: a importação de `pddl.cli` não pode carregar módulos pesados nem
+os usados só por alguns modos.
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+SCRIPT = Path(__file__).parent.parent / "benchmarks" / "importtime.py"
+
+
+def test_import_budget():
+    result = subprocess.run([sys.executable, str(SCRIPT)], capture_output=True, text=True)
+    assert result.returncode == 0, result.stdout + result.stderr
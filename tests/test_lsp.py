@@ -0,0 +1,112 @@
+"""
+A verificação incremental de ``pddl lsp`` (`pddl.lsp`) deve produzir os
+mesmos erros que a verificação de um documento novo com o mesmo texto (veja
+``benchmarks/lsp_incremental.py``), e um par de arquivos só pode ficar sem
+diagnósticos se o CLI o aceitar.
+"""
+
+import pytest
+
+from generate import GRID_DOMAIN, grid_problem
+from lsp_incremental import errors, replace
+from parser_diff import inputs, outcome
+from pddl.lsp import Document, Workspace, path_to_uri
+
+MUTATIONS = 200
+SEED = 2
+
+CASES = inputs(MUTATIONS, SEED)
+
+PROBLEM_URI = "file:///grid/problem.pddl"
+
+EDITS = [
+    ("(visited loc-x0-y0)", "(visited loc-x0-yy)"),
+    ("(define", "; comentário\n(define"),
+    ("(and", "(and (visited loc-x1-y1)"),
+    ("(:objects", "(:objects extra - place"),
+    ("(:objects", "(:objects extra - lugar"),
+    ("(:init", "(:init (connected"),
+    ("(:goal", "(:goa"),
+]
+
+
+@pytest.fixture
+def workspace():
+    workspace = Workspace()
+    domain = Document(path_to_uri(str(GRID_DOMAIN)), GRID_DOMAIN.read_text())
+    workspace.documents[domain.uri] = domain
+    domain.check(workspace)
+    return workspace
+
+
+@pytest.mark.parametrize("old, new", EDITS)
+def test_incremental_matches_fresh(workspace, old, new):
+    document = Document(PROBLEM_URI, grid_problem(6))
+    workspace.documents[PROBLEM_URI] = document
+    document.check(workspace)
+    # A edição é aplicada e desfeita, como nas repetições do benchmark
+    for a, b in ((old, new), (new, old)):
+        document.apply_change(replace(document.text, a, b))
+        assert errors(document, workspace) == errors(Document(PROBLEM_URI, document.text), workspace)
+
+
+def test_domain_change_rechecks_problem(workspace):
+    document = Document(PROBLEM_URI, grid_problem(4))
+    workspace.documents[PROBLEM_URI] = document
+    assert errors(document, workspace) == []
+    # O domínio continua válido, mas `visited` passa a ter dois argumentos
+    domain = workspace.documents[path_to_uri(str(GRID_DOMAIN))]
+    domain.apply_change(replace(domain.text, "(visited ?x - place)", "(visited ?x ?y - place)"))
+    domain.apply_change(replace(domain.text, "(visited ?nextpos)", "(visited ?nextpos ?nextpos)"))
+    assert errors(domain, workspace) == []
+    assert errors(document, workspace) == errors(Document(PROBLEM_URI, document.text), workspace)
+    assert errors(document, workspace)
+
+
+def test_untyped_objects(workspace):
+    # Objetos sem tipo não podem derrubar o servidor: o erro é reportado na
+    # própria seção
+    source = grid_problem(3)
+    start = source.index("(:objects")
+    end = source.index(")", start)
+    source = source[:start] + "(:objects box warehouse store" + source[end:]
+    document = Document(PROBLEM_URI, source)
+    workspace.documents[PROBLEM_URI] = document
+    result = errors(document, workspace)
+    line = source.count("\n", 0, start) + 1
+    assert result and result[0][0] == line
+
+
+@pytest.mark.parametrize("domain, problem", [case[1:] for case in CASES], ids=[case[0] for case in CASES])
+def test_matches_cli_verdict(domain, problem):
+    workspace = Workspace()
+    documents = [Document("file:///par/domain.pddl", domain), Document("file:///par/problem.pddl", problem)]
+    for document in documents:
+        workspace.documents[document.uri] = document
+    diagnostics = [error for document in documents for error in errors(document, workspace)]
+    expected = outcome(domain, problem, "lark", False)
+    assert (not diagnostics) == (expected == "ok"), f"CLI: {expected}\nLSP: {diagnostics}"
+
+
+@pytest.mark.parametrize(
+    "old, new",
+    [
+        ("(:goal", "lixo (:goal"),
+        ("(:init", "(:init lixo"),
+        ("(define (problem", "(define (coisa"),
+    ],
+)
+def test_stray_symbols(workspace, old, new):
+    source = grid_problem(3)
+    document = Document(PROBLEM_URI, source.replace(old, new, 1))
+    workspace.documents[PROBLEM_URI] = document
+    assert errors(document, workspace)
+
+
+def test_trailing_symbol(workspace):
+    source = grid_problem(3).rstrip() + " trailing\n"
+    document = Document(PROBLEM_URI, source)
+    workspace.documents[PROBLEM_URI] = document
+    line = source.count("\n")
+    column = source.splitlines()[-1].index("trailing") + 1
+    assert errors(document, workspace) == [(line, column, "símbolo 'trailing' inesperado")]
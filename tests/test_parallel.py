@@ -0,0 +1,49 @@
+"""
+A análise paralela de :init (`pddl.parallel`) deve produzir a mesma árvore e
+os mesmos erros que a análise normal (veja ``benchmarks/parallel_parse.py``).
+"""
+
+import pytest
+
+from generate import grid_problem
+from pddl.parallel import parse_problem
+from pddl.parser import parse, set_engine
+
+# Trechos pequenos, para que mesmo um problema pequeno seja dividido
+CHUNK_SIZE = 512
+
+
+@pytest.fixture(params=["lark", "fast"])
+def engine(request):
+    set_engine(request.param)
+    yield request.param
+    set_engine("lark")
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_same_tree(tmp_path, engine, jobs):
+    path = tmp_path / "problem.pddl"
+    path.write_text(grid_problem(8))
+    assert parse_problem(str(path), jobs, CHUNK_SIZE) == parse(path.read_text())
+
+
+def test_comments_and_goal_positions(tmp_path, engine):
+    # Comentários com parênteses no corpo de :init e :goal em outra linha
+    source = grid_problem(6).replace("(:init", "(:init ; (\n  ; )) (\n", 1)
+    path = tmp_path / "problem.pddl"
+    path.write_text(source)
+    assert parse_problem(str(path), 2, CHUNK_SIZE) == parse(source)
+
+
+def test_syntax_error(tmp_path, engine):
+    # Erro no último trecho de :init: o arquivo é analisado novamente inteiro
+    source = grid_problem(6)
+    index = source.rindex("(connected")
+    source = source[:index] + "(visited ?)" + source[index:]
+    path = tmp_path / "problem.pddl"
+    path.write_text(source)
+    with pytest.raises(Exception) as expected:
+        parse(source)
+    with pytest.raises(type(expected.value)) as result:
+        parse_problem(str(path), 2, CHUNK_SIZE)
+    assert str(result.value) == str(expected.value)
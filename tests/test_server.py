@@ -0,0 +1,89 @@
+"""
+Servidor de verificação (`pddl.server`): requisições maiores que o limite
+padrão de linha do asyncio (64 KiB) devem ser atendidas, e as que passam de
+`MAX_REQUEST` devem receber um erro em vez de derrubar a conexão.
+"""
+
+import asyncio
+import json
+import os
+import socket
+import stat
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from pddl.server import Server, inline, request
+
+EXAMPLE = Path(__file__).parent.parent / "exemplos" / "valido2_visit_all_sequential"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture(params=["unix", "tcp"])
+def address(request, tmp_path):
+    address = str(tmp_path / "pddl.sock") if request.param == "unix" else f"127.0.0.1:{free_port()}"
+    process = subprocess.Popen(
+        [sys.executable, "-m", "pddl", "serve", "--listen", address, "-j", "1"],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    try:
+        assert "ouvindo" in process.stdout.readline()
+        yield address
+    finally:
+        process.terminate()
+        process.wait(10)
+
+
+def test_large_request(address):
+    payload = {
+        "domain": inline(str(EXAMPLE / "domain.pddl")),
+        "problems": [inline(str(EXAMPLE / "problem.pddl"))],
+    }
+    assert len(json.dumps(payload)) > 64 * 1024
+    response = request(address, payload, timeout=60)
+    assert response["ok"], response
+    assert [report["kind"] for report in response["reports"]] == ["domain", "problem"]
+    if not address.startswith("127.0.0.1:"):
+        assert stat.S_IMODE(os.stat(address).st_mode) == 0o600
+
+
+class Writer:
+    def __init__(self):
+        self.data = b""
+        self.closed = False
+
+    def write(self, data: bytes) -> None:
+        self.data += data
+
+    async def drain(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+
+def test_request_too_large():
+    async def run():
+        reader = asyncio.StreamReader(limit=1024)
+        reader.feed_data(b'{"op": "ping", "x": "' + b"x" * 4096 + b'"}\n{"op": "ping"}\n')
+        reader.feed_eof()
+        writer = Writer()
+        await server.handle(reader, writer)
+        return writer
+
+    server = Server(jobs=1)
+    try:
+        writer = asyncio.run(run())
+    finally:
+        server.close()
+    responses = [json.loads(line) for line in writer.data.splitlines()]
+    assert len(responses) == 1 and "error" in responses[0]
+    assert writer.closed
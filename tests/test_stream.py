@@ -0,0 +1,54 @@
+"""
+O modo streaming (`pddl.stream`) deve aceitar e rejeitar os mesmos arquivos
+que a análise do arquivo inteiro, nos exemplos e em uma amostra fixa de
+mutações (veja ``benchmarks/parser_diff.py``).
+"""
+
+import io
+
+import pytest
+
+from parser_diff import inputs, outcome
+from pddl.errors import ParseError
+from pddl.stream import iter_forms, keyword
+
+MUTATIONS = 300
+SEED = 1
+
+CASES = inputs(MUTATIONS, SEED)
+
+# Erros internos que indicam uma árvore com forma inesperada
+CRASHES = ("AttributeError", "IndexError", "KeyError")
+
+
+@pytest.mark.parametrize("domain, problem", [case[1:] for case in CASES], ids=[case[0] for case in CASES])
+def test_stream_matches_normal(domain, problem):
+    expected = outcome(domain, problem, "lark", False)
+    result = outcome(domain, problem, "lark", True)
+    assert (result == "ok") == (expected == "ok"), f"normal: {expected}\nstreaming: {result}"
+    if result.startswith(CRASHES):
+        assert result == expected
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        "(define (problem p) lixo (:domain d) (:objects a - t) (:init (f a)) (:goal (f a)))",
+        "(define (problem p) (:domain d) (:objects a - t) (:init (f a) lixo) (:goal (f a)))",
+        "(define (problem p) (:domain d) (:objects a - t) (:init lixo (f a)) (:goal (f a)))",
+        "(define (problem p) (:domain d) (:objects a - t) (:init lixo) (:goal (f a)))",
+        "(define (problem p) (:domain d) (:objects a - t) (:init (f a)) (:goal (f a))) lixo",
+        "lixo (define (problem p) (:domain d) (:objects a - t) (:init (f a)) (:goal (f a)))",
+        "(define lixo (problem p) (:domain d) (:objects a - t) (:init (f a)) (:goal (f a)))",
+    ],
+)
+def test_stray_symbols(source):
+    with pytest.raises(ParseError, match="símbolo 'lixo' inesperado"):
+        list(iter_forms(io.StringIO(source)))
+
+
+def test_keyword_prefix():
+    # Como no Lark, a palavra-chave termina onde termina o texto conhecido
+    assert keyword("(:domaincasa-simples)") == ":domain"
+    assert keyword("( ; comentário\n :init (f a))") == ":init"
+    assert keyword("(visited a)") == "visited"